@@ -1,13 +1,16 @@
 """ Controller API for communication throughout the application """
 
-from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager
 import uvicorn
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
-from app.routes import health, calculation
+from app.routes import health, calculation, session, profiling, dataset, jobs
 from app.config.documentation import DESCRIPTION, APP_VERSION
 from app.config.logging_config import create_logger
+from app.services.execution import solver_pool
+from app.services.jobs import job_queue
+from app.services.metrics import MetricsMiddleware
 
 
 """ Logging Function """
@@ -16,10 +19,15 @@ Logger = create_logger()
 Logger.info("=> Logging initialized.")
 
 
-""" Multithreading Option """
+""" Multiprocessing Option """
 
-executor = ThreadPoolExecutor(1)
-Logger.info("=> Thread Pool established.")
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """ Start the solver pool with the app and shut it and the job queue down cleanly afterwards. """
+    solver_pool.start()
+    yield
+    job_queue.shutdown()
+    solver_pool.shutdown()
 
 
 """ API """
@@ -32,17 +40,23 @@ app = FastAPI(
         "email": ""
     },
     summary="React Frontend with a FastAPI for handling the Facility Location Problem.",
-    description=DESCRIPTION
+    description=DESCRIPTION,
+    lifespan=lifespan
 )
 app.add_middleware(
     CORSMiddleware,
     allow_origins=["*"],
-    allow_methods=["GET", "POST"],
+    allow_methods=["GET", "POST", "DELETE"],
     allow_headers=["*"]
 )
+app.add_middleware(MetricsMiddleware)
 
 app.include_router(health.router)
 app.include_router(calculation.router)
+app.include_router(session.router)
+app.include_router(profiling.router)
+app.include_router(dataset.router)
+app.include_router(jobs.router)
 
 
 """ Testing """
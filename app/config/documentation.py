@@ -15,7 +15,22 @@ This FastAPI implements some optimization algorithms such as the **Meyerson algo
 | / | GET | Welcome entry point | None |
 | /ping |	GET |	Health check | log_lvl (optional) |
 | /versions |	GET |	API version info |	log_lvl (optional) |
+| /health |	GET |	Liveness check with solver pool, cache and session state |	None |
+| /metrics |	GET |	Request, latency and solver phase metrics (Prometheus text format) |	None |
 | /online_facility_location |	POST |	Solver for the Online Facility Location Problem using the Meyerson Algorithm |	log_lvl (optional) |
 | /offline_facility_location |	POST |	Solver for the Offline Facility Location Problem using the k-Means Clustering Algorithm |	log_lvl (optional) |
+| /online_facility_location/batch |	POST |	Replay an ordered list (JSON) or stream (NDJSON) of Demands through one Meyerson solver |	log_lvl (optional) |
+| /online_facility_location/ensemble |	POST |	Replay Demands under many seeds (optionally shuffled) and return mean, percentiles and the best run |	log_lvl (optional) |
+| /online_sessions |	POST |	Create a server-side Online Facility Location session |	log_lvl (optional) |
+| /online_sessions/{sessionID}/demand |	POST |	Run a single Demand through the Meyerson Algorithm of a session |	log_lvl (optional) |
+| /online_sessions/{sessionID} |	GET / DELETE |	Get the full instance of / close a session |	log_lvl (optional) |
+| /online_sessions/ws |	WebSocket |	Keep one Meyerson solver per connection and exchange one message per Demand |	log_lvl (optional) |
+| /profiles/{profileID} |	GET |	Stored profile report of a profiled request (`pstats` suffix for the raw dump) |	None |
+| /datasets |	POST |	Store Demand Points once and get a dataset ID for the calculation endpoints |	log_lvl (optional) |
+| /datasets/{datasetID} |	GET / DELETE |	Get the size of / delete a stored dataset |	log_lvl (optional) |
+| /jobs/offline_facility_location |	POST |	Queue an Offline Facility Location Problem and get a job ID right away |	log_lvl (optional) |
+| /jobs/{jobID} |	GET / DELETE |	Get the status, progress and result of / cancel a job |	log_lvl (optional) |
+
+Both calculation endpoints also accept and return a columnar JSON (`application/vnd.facility.columnar+json`) and a NumPy `.npz` (`application/x-npz`) encoding, negotiated via `Content-Type` and `Accept`. With profiling enabled (`PROFILING`), they accept `profile=inline|store` to return or store a `cProfile` breakdown of the solve. Instead of inline `demands`, both accept a `dataset` ID from `/datasets`. Long offline solves can be queued under `/jobs` and polled for their progress.
 
 """
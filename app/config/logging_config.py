@@ -1,7 +1,70 @@
 """ Default Logging Config """
 import logging
+from contextlib import contextmanager
+from contextvars import ContextVar
 
-def create_logger() -> logging.Logger:
+# request-scoped log level, copied into every request task and worker thread.
+LOG_LEVEL = ContextVar('log_level', default=logging.INFO)
+
+
+def resolve_level(level: int | str) -> int:
+    """ Function to convert a level name (e.g. 'debug') or number into a logging level.
+
+    Args:
+        level (int | str): Level name or number.
+
+    Raises:
+        ValueError: Unknown level name.
+
+    Returns:
+        int: logging level.
+    """
+    if isinstance(level, int):
+        return level
+
+    resolved = logging.getLevelName(str(level).upper())
+    if not isinstance(resolved, int):
+        raise ValueError(f"Unknown level: {level!r}")
+    return resolved
+
+@contextmanager
+def log_level(level: int | str):
+    """ Context manager to set the log level of the current context and restore it afterwards. """
+    token = LOG_LEVEL.set(resolve_level(level))
+    try:
+        yield
+    finally:
+        LOG_LEVEL.reset(token)
+
+
+class ContextLogger(logging.LoggerAdapter):
+    """ Logger reading its level from the request-scoped LOG_LEVEL context variable.
+
+    setLevel only changes the level of the current context (request), so concurrent
+    requests with different log levels no longer overwrite each other's level on the
+    shared module logger. Disabled calls return before any message is formatted.
+    """
+    def __init__(self, logger: logging.Logger):
+        super().__init__(logger, {})
+
+    def process(self, msg, kwargs):
+        return msg, kwargs
+
+    def setLevel(self, level: int | str) -> None:
+        LOG_LEVEL.set(resolve_level(level))
+
+    def getEffectiveLevel(self) -> int:
+        return LOG_LEVEL.get()
+
+    def isEnabledFor(self, level: int) -> bool:
+        return level >= LOG_LEVEL.get() and not self.logger.manager.disable >= level
+
+
+def create_logger() -> ContextLogger:
     """ Generate Default Logging Setup """
     logging.basicConfig(level=logging.INFO)
-    return logging.getLogger(__name__)
+
+    # the context level does the filtering, the shared logger passes everything on.
+    logger = logging.getLogger(__name__)
+    logger.setLevel(logging.DEBUG)
+    return ContextLogger(logger)
@@ -0,0 +1,53 @@
+""" Default Application Settings, overridable through environment variables. """
+
+import os
+import tempfile
+
+
+""" Online Sessions """
+
+SESSION_LIMIT = int(os.getenv('SESSION_LIMIT', '1000'))
+SESSION_TTL = float(os.getenv('SESSION_TTL', '1800'))
+
+
+""" Dataset Store """
+
+DATASET_DIR = os.getenv('DATASET_DIR', os.path.join(tempfile.gettempdir(), 'facility-datasets'))
+DATASET_LIMIT = int(os.getenv('DATASET_LIMIT', '64'))
+
+
+""" Distance Kernel """
+
+DISTANCE_MEMORY = int(os.getenv('DISTANCE_MEMORY', str(64 * 1024 * 1024)))
+
+
+""" Solver Pool """
+
+WORKER_PROCESSES = int(os.getenv('WORKER_PROCESSES', str(os.cpu_count() or 1)))
+WORKER_START_METHOD = os.getenv('WORKER_START_METHOD', 'spawn')
+SOLVER_TIMEOUT = float(os.getenv('SOLVER_TIMEOUT', '120'))
+
+
+""" Offline Jobs """
+
+JOB_WORKERS = int(os.getenv('JOB_WORKERS', '2'))
+JOB_QUEUE = int(os.getenv('JOB_QUEUE', '16'))
+JOB_TTL = float(os.getenv('JOB_TTL', '3600'))
+JOB_RESULTS = int(os.getenv('JOB_RESULTS', '64'))
+JOB_BYTES = int(os.getenv('JOB_BYTES', str(64 * 1024 * 1024)))
+
+
+""" Offline Result Cache """
+
+CACHE_ENTRIES = int(os.getenv('CACHE_ENTRIES', '256'))
+CACHE_BYTES = int(os.getenv('CACHE_BYTES', str(64 * 1024 * 1024)))
+CACHE_TTL = float(os.getenv('CACHE_TTL', '600'))
+
+
+""" Request Profiling """
+
+PROFILING = os.getenv('PROFILING', 'false').lower() in ('1', 'true', 'yes')
+PROFILE_TOP = int(os.getenv('PROFILE_TOP', '20'))
+PROFILE_ENTRIES = int(os.getenv('PROFILE_ENTRIES', '32'))
+PROFILE_TTL = float(os.getenv('PROFILE_TTL', '3600'))
+PROFILE_BYTES = int(os.getenv('PROFILE_BYTES', str(16 * 1024 * 1024)))
@@ -0,0 +1,368 @@
+""" File for the columnar (array-backed) Instances """
+
+import random
+import itertools
+import numpy as np
+
+from app.model.model import Demand, Facility
+from app.model.counters import count
+from app.model.index import create_index
+from app.model.distance import paired_distances
+from app.model.offline_facility import cluster_instance, restart_count
+from app.model.ufl import locate_instance, site_ids
+from app.model.online_facility import opening_probability
+from app.config.logging_config import create_logger
+from app.validation.messages import DemandModel, FacilityModel, DemandColumns, FacilityColumns
+
+
+""" Logger Function """
+
+Logger = create_logger()
+Logger.info("Logger initialized.")
+
+
+""" Classes """
+
+class ColumnarInstance:
+    """ Facility Location instance held in coordinate arrays instead of Demand and Facility objects.
+
+    The connections are stored row-compressed: Facility j serves the demandIDs
+    connection_ids[offsets[j]:offsets[j + 1]] with offsets = [0, *cumsum(connection_counts)].
+    """
+    def __init__(self,
+                 demand_ids: np.ndarray,
+                 points: np.ndarray,
+                 facility_ids: np.ndarray,
+                 centers: np.ndarray,
+                 opening_costs: np.ndarray = None,
+                 connection_ids: np.ndarray = None,
+                 connection_counts: np.ndarray = None):
+        self.demand_ids = np.asarray(demand_ids, dtype=np.int64).reshape(-1)
+        self.points = np.asarray(points, dtype=np.float64).reshape(-1, 2)
+        self.facility_ids = np.asarray(facility_ids, dtype=np.int64).reshape(-1)
+        self.centers = np.asarray(centers, dtype=np.float64).reshape(-1, 2)
+
+        k = self.facility_ids.shape[0]
+        self.opening_costs = np.zeros(k) if opening_costs is None else np.asarray(opening_costs, dtype=np.float64).reshape(-1)
+        self.connection_ids = np.zeros(0, dtype=np.int64) if connection_ids is None else np.asarray(connection_ids, dtype=np.int64).reshape(-1)
+        self.connection_counts = np.zeros(k, dtype=np.int64) if connection_counts is None else np.asarray(connection_counts, dtype=np.int64).reshape(-1)
+
+        # checking the column lengths.
+        if self.points.shape[0] != self.demand_ids.shape[0]:
+            raise ValueError("Demand columns must have the same length")
+        if not self.centers.shape[0] == self.opening_costs.shape[0] == self.connection_counts.shape[0] == k:
+            raise ValueError("Facility columns must have the same length")
+        if np.any(self.connection_counts < 0) or self.connection_counts.sum() != self.connection_ids.shape[0]:
+            raise ValueError("Connection counts must add up to the number of connections")
+
+    @classmethod
+    def from_columns(cls, demands: DemandColumns, facilities: FacilityColumns) -> 'ColumnarInstance':
+        """ Method to initialize the instance from validated columns.
+
+        Args:
+            demands (DemandColumns): Demand columns.
+            facilities (FacilityColumns): Facility columns.
+
+        Returns:
+            ColumnarInstance: instance.
+        """
+        connection = facilities.connection or [[] for _ in facilities.ids]
+        return cls(
+            demand_ids=demands.ids,
+            points=np.column_stack([demands.xs, demands.ys]),
+            facility_ids=facilities.ids,
+            centers=np.column_stack([facilities.xs, facilities.ys]),
+            opening_costs=facilities.openingCosts or None,
+            connection_ids=np.fromiter(itertools.chain.from_iterable(connection), dtype=np.int64),
+            connection_counts=[len(x) for x in connection]
+        )
+
+    @classmethod
+    def from_models(cls, demands: list[DemandModel], facilities: list[FacilityModel]) -> 'ColumnarInstance':
+        """ Method to initialize the instance from validated Demand and Facility models.
+
+        Args:
+            demands (list[DemandModel]): Demand models.
+            facilities (list[FacilityModel]): Facility models.
+
+        Returns:
+            ColumnarInstance: instance.
+        """
+        return cls(
+            demand_ids=[x.demandID for x in demands],
+            points=[x.location for x in demands],
+            facility_ids=[x.facilityID for x in facilities],
+            centers=[x.location for x in facilities],
+            opening_costs=[x.openingCosts for x in facilities],
+            connection_ids=np.fromiter(itertools.chain.from_iterable(x.connection for x in facilities), dtype=np.int64),
+            connection_counts=[len(x.connection) for x in facilities]
+        )
+
+    @classmethod
+    def from_instances(cls, demands: list[Demand], facilities: list[Facility]) -> 'ColumnarInstance':
+        """ Method to initialize the instance from Demand and Facility instances.
+
+        Args:
+            demands (list[Demand]): Demand instances.
+            facilities (list[Facility]): Facility instances.
+
+        Returns:
+            ColumnarInstance: instance.
+        """
+        return cls(
+            demand_ids=[x.demandID for x in demands],
+            points=[x.location for x in demands],
+            facility_ids=[x.facilityID for x in facilities],
+            centers=[x.location for x in facilities],
+            opening_costs=[x.openingCosts for x in facilities],
+            connection_ids=[x.demandID for facility in facilities for x in facility.demands],
+            connection_counts=[len(x.demands) for x in facilities]
+        )
+
+    def connection_pairs(self) -> tuple[np.ndarray, np.ndarray]:
+        """ Method to resolve the connections to (Facility, Demand) positions.
+
+        Like Facility.from_request, unknown demandIDs and repeated connections of a
+        Facility are dropped and duplicate demandIDs resolve to the last Demand.
+
+        Returns:
+            tuple[np.ndarray, np.ndarray]: Facility and Demand positions in connection order.
+        """
+        facility = np.repeat(np.arange(self.facility_ids.shape[0]), self.connection_counts)
+
+        # resolving the demandIDs through a sorted index.
+        order = np.argsort(self.demand_ids, kind='stable')
+        position = np.searchsorted(self.demand_ids[order], self.connection_ids, side='right') - 1
+        valid = position >= 0
+        valid[valid] = self.demand_ids[order[position[valid]]] == self.connection_ids[valid]
+        facility, demand = facility[valid], order[position[valid]]
+
+        # keeping the first connection of every (Facility, Demand) pair.
+        _, first = np.unique(facility * max(self.demand_ids.shape[0], 1) + demand, return_index=True)
+        first = np.sort(first)
+        return facility[first], demand[first]
+
+    def recalculate_costs(self, metric: str = 'euclidean') -> tuple[float, float]:
+        """ Method to compute the opening and distance costs of the connections.
+
+        Args:
+            metric (str, optional): Type of Metric to use. Defaults to 'euclidean'.
+
+        Returns:
+            tuple[float, float]: Total opening costs and total distance costs.
+        """
+        facility, demand = self.connection_pairs()
+        distances = paired_distances(self.points[demand], self.centers[facility], metric)
+        return float(np.sum(self.opening_costs)), float(np.sum(distances))
+
+    def cluster(self, parameter: dict, costs: tuple[float, float] = None, seed: np.random.SeedSequence = None) -> dict:
+        """ Method to run the k-Means Clustering algorithm on the arrays (see OfflineFacilitySolver).
+
+        Args:
+            parameter (dict): Config for the Facility Location Problem.
+            costs (tuple[float, float], optional): Opening and distance costs of the request (see recalculate_costs). Defaults to None.
+            seed (np.random.SeedSequence, optional): Seed of a single restart (see cluster_instance). Defaults to None.
+
+        Returns:
+            dict: costs, restarts, iterations and trace of the run.
+        """
+        if parameter.get('engine', 'kmeans') == 'ufl':
+            return self.locate(parameter, costs)
+
+        opening_costs, distance_costs = costs or self.recalculate_costs(parameter['metric'])
+        previous = opening_costs + distance_costs
+        engine = cluster_instance(self.points, self.centers, parameter, opening_costs, seed)
+
+        if engine.iterations > 0:
+            # writing the labels back as connections in Demand order.
+            self.centers = engine.centers
+            self.connection_ids = self.demand_ids[np.argsort(engine.labels, kind='stable')]
+            self.connection_counts = np.bincount(engine.labels, minlength=self.facility_ids.shape[0])
+            distance_costs = float(np.sum(engine.distances()))
+        else:
+            facility, demand = self.connection_pairs()
+            self.connection_ids = self.demand_ids[demand]
+            self.connection_counts = np.bincount(facility, minlength=self.facility_ids.shape[0])
+
+        current = opening_costs + distance_costs
+        return {
+            'costs': {'current': current, 'previous': previous, 'delta': current - previous},
+            'restarts': restart_count(parameter),
+            'iterations': engine.iterations,
+            'trace': engine.trace,
+            'memory': engine.memory()
+        }
+
+    def locate(self, parameter: dict, costs: tuple[float, float] = None) -> dict:
+        """ Method to choose the open Facilities on the arrays (see OfflineFacilitySolver.ufl_algorithm).
+
+        Args:
+            parameter (dict): Config for the Facility Location Problem.
+            costs (tuple[float, float], optional): Opening and distance costs of the request (see recalculate_costs). Defaults to None.
+
+        Returns:
+            dict: costs, iterations and trace of the run.
+        """
+        previous = sum(costs or self.recalculate_costs(parameter['metric']))
+        engine = locate_instance(self.points, self.centers, self.opening_costs, parameter)
+
+        # keeping the open candidates and writing the labels back as connections in Demand order.
+        labels = (np.cumsum(engine.open) - 1)[engine.labels]
+        self.facility_ids = site_ids(self.facility_ids, engine.open)
+        self.centers = engine.sites[engine.open]
+        self.opening_costs = engine.opening_costs[engine.open]
+        self.connection_ids = self.demand_ids[np.argsort(labels, kind='stable')]
+        self.connection_counts = np.bincount(labels, minlength=self.facility_ids.shape[0])
+
+        current = engine.cost
+        return {
+            'costs': {'current': current, 'previous': previous, 'delta': current - previous},
+            'iterations': engine.iterations,
+            'trace': engine.trace,
+            'memory': engine.memory()
+        }
+
+    def meyerson(self, demand_id: int, location: tuple, parameter: dict, rng: random.Random = None, costs: tuple[float, float] = None) -> dict:
+        """ Method to run a single Demand through the Meyerson algorithm on the arrays (see OnlineFacilitySolver.meyerson_algorithm).
+
+        The connections are resolved like Facility.from_request, the nearest Facility is
+        queried from the parameter's index and the Demand opens a new Facility
+        (ID = number of Facilities) or joins the connections of the nearest one.
+
+        Args:
+            demand_id (int): ID of the new Demand.
+            location (tuple): Location of the new Demand.
+            parameter (dict): Config for the Facility Location Problem.
+            rng (random.Random, optional): Generator of the coin flip. Defaults to None.
+            costs (tuple[float, float], optional): Opening and distance costs of the request (see recalculate_costs). Defaults to None.
+
+        Returns:
+            dict: decision (like OnlineFacilitySolver.decision), costs and coin.
+        """
+        count('arrivals')
+        rng = rng or random.Random()
+        previous = sum(costs or self.recalculate_costs(parameter['metric']))
+        facility, demand = self.connection_pairs()
+        self.connection_ids = self.demand_ids[demand]
+        self.connection_counts = np.bincount(facility, minlength=self.facility_ids.shape[0])
+        point = np.asarray(location, dtype=np.float64).reshape(1, 2)
+        k = self.facility_ids.shape[0]
+
+        # flipping the coin against the nearest Facility, the first Demand always opens.
+        if k == 0:
+            nearest, distance, probability, coin = 0, None, 1.0, True
+        else:
+            index = create_index(parameter, metric=parameter['metric'])
+            index.extend(self.centers)
+            nearest, distance = index.nearest(tuple(location))
+            distance = float(distance)
+            probability = float(opening_probability(distance, parameter))
+            coin = bool(rng.random() < probability)
+        opened = k == 0 or coin
+
+        # opening or assigning (a Demand already served by the Facility adds no costs).
+        offsets = np.cumsum(self.connection_counts)
+        if opened:
+            self.facility_ids = np.append(self.facility_ids, k)
+            self.centers = np.concatenate([self.centers, point])
+            self.opening_costs = np.append(self.opening_costs, float(parameter['openingCosts']))
+            self.connection_ids = np.append(self.connection_ids, demand_id)
+            self.connection_counts = np.append(self.connection_counts, 1)
+            current, nearest = previous + float(parameter['openingCosts']), k
+        elif demand_id in self.connection_ids[offsets[nearest] - self.connection_counts[nearest]:offsets[nearest]]:
+            current = previous
+        else:
+            self.connection_ids = np.insert(self.connection_ids, offsets[nearest], demand_id)
+            self.connection_counts[nearest] += 1
+            current = previous + distance
+
+        self.demand_ids = np.append(self.demand_ids, demand_id)
+        self.points = np.concatenate([self.points, point])
+
+        return {
+            'decision': {
+                'demandID': demand_id,
+                'facilityID': int(self.facility_ids[nearest]),
+                'opened': opened,
+                'coin': coin,
+                'probability': probability,
+                'distance': distance
+            },
+            'costs': {'current': current, 'previous': previous, 'delta': current - previous},
+            'coin': coin
+        }
+
+    def to_instances(self) -> tuple[list[Demand], list[Facility]]:
+        """ Method to create the Demand and Facility instances (e.g. for the online solver).
+
+        Returns:
+            tuple[list[Demand], list[Facility]]: Demand and Facility instances.
+        """
+        demands = [Demand(i, (x, y)) for i, (x, y) in zip(self.demand_ids.tolist(), self.points.tolist())]
+        facilities = [Facility(i, (x, y), openingCosts=c) for i, (x, y), c in
+                      zip(self.facility_ids.tolist(), self.centers.tolist(), self.opening_costs.tolist())]
+
+        for facility, demand in zip(*self.connection_pairs()):
+            facilities[facility].add_demand(demands[demand])
+
+        return demands, facilities
+
+    def connections(self) -> list[list[int]]:
+        """ Method to split the connections per Facility.
+
+        Returns:
+            list[list[int]]: served demandIDs per Facility.
+        """
+        ids = self.connection_ids.tolist()
+        offsets = [0, *np.cumsum(self.connection_counts).tolist()]
+        return [ids[start:stop] for start, stop in zip(offsets[:-1], offsets[1:])]
+
+    def to_columns(self) -> tuple[dict, dict]:
+        """ Method to export the instance as columns.
+
+        Returns:
+            tuple[dict, dict]: Demand and Facility columns.
+        """
+        demands = {
+            'ids': self.demand_ids.tolist(),
+            'xs': self.points[:, 0].tolist(),
+            'ys': self.points[:, 1].tolist()
+        }
+        facilities = {
+            'ids': self.facility_ids.tolist(),
+            'xs': self.centers[:, 0].tolist(),
+            'ys': self.centers[:, 1].tolist(),
+            'openingCosts': self.opening_costs.tolist(),
+            'connection': self.connections()
+        }
+        return demands, facilities
+
+    def to_json(self) -> tuple[list[dict], list[dict]]:
+        """ Method to export the instance in the default Demand and Facility format.
+
+        Returns:
+            tuple[list[dict], list[dict]]: Demand and Facility dicts.
+        """
+        demands = [{'demandID': i, 'location': (x, y)} for i, (x, y) in zip(self.demand_ids.tolist(), self.points.tolist())]
+        facilities = [{'facilityID': i, 'location': (x, y), 'connection': connection, 'openingCosts': c}
+                      for i, (x, y), c, connection in zip(self.facility_ids.tolist(), self.centers.tolist(),
+                                                          self.opening_costs.tolist(), self.connections())]
+        return demands, facilities
+
+    def to_arrays(self) -> dict:
+        """ Method to export the instance as named arrays (see app.services.encoding).
+
+        Returns:
+            dict: arrays by name.
+        """
+        return {
+            'demands.ids': self.demand_ids,
+            'demands.xs': self.points[:, 0],
+            'demands.ys': self.points[:, 1],
+            'facilities.ids': self.facility_ids,
+            'facilities.xs': self.centers[:, 0],
+            'facilities.ys': self.centers[:, 1],
+            'facilities.openingCosts': self.opening_costs,
+            'facilities.connection': self.connection_ids,
+            'facilities.connectionCounts': self.connection_counts
+        }
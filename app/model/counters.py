@@ -0,0 +1,35 @@
+""" File for the opt-in Solver Counters (distance evaluations, iterations, ...) """
+
+import contextvars
+from contextlib import contextmanager
+
+
+""" Counters """
+
+# counters of the current context, None while nobody is counting.
+COUNTERS = contextvars.ContextVar('COUNTERS', default=None)
+
+def count(name: str, n: int = 1) -> None:
+    """ Function to add to a counter of the current context (no-op unless counting).
+
+    Args:
+        name (str): Counter name, e.g. 'distanceEvaluations'.
+        n (int, optional): Increment. Defaults to 1.
+    """
+    counters = COUNTERS.get()
+    if counters is not None:
+        counters[name] = counters.get(name, 0) + n
+
+@contextmanager
+def counting():
+    """ Context manager collecting the counters of the enclosed solver calls.
+
+    Yields:
+        dict: counters by name, filled while the context is open.
+    """
+    counters = {}
+    token = COUNTERS.set(counters)
+    try:
+        yield counters
+    finally:
+        COUNTERS.reset(token)
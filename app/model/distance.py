@@ -0,0 +1,257 @@
+""" File for the shared Distance Kernels """
+
+import math
+import numpy as np
+
+from app.model.counters import count
+from app.config.logging_config import create_logger
+from app.config.settings import DISTANCE_MEMORY
+
+
+""" Logger Function """
+
+Logger = create_logger()
+Logger.info("Logger initialized.")
+
+
+""" Constants """
+
+PLANAR_METRICS = ('euclidean', 'manhattan')
+METRICS = PLANAR_METRICS + ('haversine',)
+
+# mean earth radius in km, haversine locations are (longitude, latitude) in degrees.
+EARTH_RADIUS = 6371.0088
+
+# float64 (rows, K) buffers of the NearestKernel tiles.
+SCRATCH_BUFFERS = 2
+
+
+""" Distance Functions """
+
+def pairwise_distances(points: np.ndarray, centers: np.ndarray, metric: str = 'euclidean') -> np.ndarray:
+    """ Function to calculate the distances between all points and all centers.
+
+    Args:
+        points (np.ndarray): (N, 2) array of Demand locations.
+        centers (np.ndarray): (K, 2) array of Facility locations.
+        metric (str, optional): Type of Metric to use. Defaults to 'euclidean'.
+
+    Returns:
+        np.ndarray: (N, K) distance matrix.
+    """
+    count('distanceEvaluations', points.shape[0] * centers.shape[0])
+
+    # calculating distance.
+    match metric:
+        case 'euclidean':
+            difference = centers[np.newaxis, :, :] - points[:, np.newaxis, :]
+            return np.sqrt(np.sum(difference * difference, axis=-1))
+        case 'manhattan':
+            return np.sum(np.abs(centers[np.newaxis, :, :] - points[:, np.newaxis, :]), axis=-1)
+        case 'haversine':
+            difference = unit_vectors(centers)[np.newaxis, :, :] - unit_vectors(points)[:, np.newaxis, :]
+            return chord_to_arc(np.sqrt(np.sum(difference * difference, axis=-1)))
+        case _:
+            Logger.warning(f"Could not match case [{metric}]")
+            return np.full((points.shape[0], centers.shape[0]), -1.0)
+
+def paired_distances(points: np.ndarray, centers: np.ndarray, metric: str = 'euclidean') -> np.ndarray:
+    """ Function to calculate the row-wise distances between points[i] and centers[i] (the arrays broadcast).
+
+    Args:
+        points (np.ndarray): (N, 2) array of Demand locations.
+        centers (np.ndarray): (N, 2) array of Facility locations.
+        metric (str, optional): Type of Metric to use. Defaults to 'euclidean'.
+
+    Returns:
+        np.ndarray: (N,) distance vector.
+    """
+    count('distanceEvaluations', math.prod(np.broadcast_shapes(points.shape, centers.shape)[:-1]))
+
+    # calculating distance.
+    match metric:
+        case 'euclidean':
+            difference = centers - points
+            return np.sqrt(np.sum(difference * difference, axis=-1))
+        case 'manhattan':
+            return np.sum(np.abs(centers - points), axis=-1)
+        case 'haversine':
+            return haversine(points, centers)
+        case _:
+            Logger.warning(f"Could not match case [{metric}]")
+            return np.full(points.shape[0], -1.0)
+
+
+""" Spherical Functions """
+
+def unit_vectors(locations: np.ndarray) -> np.ndarray:
+    """ Function to map (longitude, latitude) locations in degrees onto the unit sphere.
+
+    Args:
+        locations (np.ndarray): (..., 2) array of (longitude, latitude) locations.
+
+    Returns:
+        np.ndarray: (..., 3) array of unit vectors.
+    """
+    locations = np.asarray(locations, dtype=np.float64)
+    longitude, latitude = np.radians(locations[..., 0]), np.radians(locations[..., 1])
+    cos_latitude = np.cos(latitude)
+    return np.stack([cos_latitude * np.cos(longitude), cos_latitude * np.sin(longitude), np.sin(latitude)], axis=-1)
+
+def spherical_locations(vectors: np.ndarray) -> np.ndarray:
+    """ Function to map (not necessarily normalized) vectors back to (longitude, latitude) in degrees.
+
+    Args:
+        vectors (np.ndarray): (..., 3) array of non-zero vectors.
+
+    Returns:
+        np.ndarray: (..., 2) array of (longitude, latitude) locations.
+    """
+    x, y, z = vectors[..., 0], vectors[..., 1], vectors[..., 2]
+    return np.stack([np.degrees(np.arctan2(y, x)), np.degrees(np.arctan2(z, np.hypot(x, y)))], axis=-1)
+
+def chord_to_arc(chord: np.ndarray) -> np.ndarray:
+    """ Function to convert chord lengths on the unit sphere into great-circle distances in km. """
+    return 2.0 * EARTH_RADIUS * np.arcsin(np.minimum(chord / 2.0, 1.0))
+
+def arc_to_chord(distance: float) -> float:
+    """ Function to convert a great-circle distance in km into the chord length on the unit sphere. """
+    return 2.0 * math.sin(min(distance / (2.0 * EARTH_RADIUS), math.pi / 2))
+
+def haversine(points: np.ndarray, centers: np.ndarray) -> np.ndarray:
+    """ Function to calculate the great-circle distances between points[i] and centers[i] (or two single locations).
+
+    The distance is taken from the chord between the unit vectors, which stays accurate
+    for nearby locations like the haversine formula and shares its arithmetic with
+    pairwise_distances.
+
+    Args:
+        points (np.ndarray): (..., 2) array of (longitude, latitude) locations.
+        centers (np.ndarray): (..., 2) array of (longitude, latitude) locations.
+
+    Returns:
+        np.ndarray: (...) great-circle distances in km.
+    """
+    difference = unit_vectors(centers) - unit_vectors(points)
+    return chord_to_arc(np.sqrt(np.sum(difference * difference, axis=-1)))
+
+
+""" Blocked Nearest Kernel """
+
+class NearestKernel:
+    """ Memory-bounded nearest-center kernel.
+
+    The points are processed in tiles of rows sized so the scratch buffers stay within
+    the memory budget, and only the argmin and the min-distance vectors are returned.
+    The scratch buffers are allocated once and reused by every call with the same
+    number of centers (e.g. across the k-Means rounds).
+    """
+    def __init__(self, metric: str = 'euclidean', budget: int = DISTANCE_MEMORY):
+        self.metric = metric
+        self.budget = budget
+        self.scratch = None
+        self.rows = 0
+        self.peak = 0
+
+    def __getstate__(self) -> dict:
+        # the scratch buffers are not shipped between processes.
+        return {**self.__dict__, 'scratch': None}
+
+    def tile_rows(self, k: int) -> int:
+        """ Method to size the tiles to the memory budget.
+
+        Args:
+            k (int): Number of centers.
+
+        Returns:
+            int: rows per tile (at least 1).
+        """
+        return max(1, self.budget // (SCRATCH_BUFFERS * 8 * max(k, 1)))
+
+    def buffers(self, rows: int, k: int) -> np.ndarray:
+        """ Method to get (and on a shape change allocate) the scratch buffers.
+
+        Args:
+            rows (int): Rows per tile.
+            k (int): Number of centers.
+
+        Returns:
+            np.ndarray: (SCRATCH_BUFFERS, rows, k) scratch buffers.
+        """
+        if self.scratch is None or self.scratch.shape[1] < rows or self.scratch.shape[2] != k:
+            self.scratch = None
+            self.scratch = np.empty((SCRATCH_BUFFERS, rows, k), dtype=np.float64)
+        return self.scratch
+
+    def nearest(self, points: np.ndarray, centers: np.ndarray, vectors: np.ndarray = None) -> tuple[np.ndarray, np.ndarray]:
+        """ Method to find the nearest center of every point, tile by tile.
+
+        The distances match pairwise_distances. For 'haversine' the nearest center has
+        the largest dot product of the unit vectors.
+
+        Args:
+            points (np.ndarray): (N, 2) array of Demand locations.
+            centers (np.ndarray): (K, 2) array of Facility locations.
+            vectors (np.ndarray, optional): (N, 3) unit vectors of the points ('haversine'). Defaults to None.
+
+        Returns:
+            tuple[np.ndarray, np.ndarray]: (N,) labels and (N,) distances to the nearest centers.
+        """
+        n, k = points.shape[0], centers.shape[0]
+        labels = np.zeros(n, dtype=np.intp)
+        minimum = np.full(n, np.inf)
+        if n == 0 or k == 0:
+            return labels, minimum
+
+        self.rows = min(n, self.tile_rows(k))
+        scratch = self.buffers(self.rows, k)
+        index = np.arange(self.rows)
+        count('distanceEvaluations', n * k)
+
+        if self.metric == 'haversine':
+            vectors = unit_vectors(points) if vectors is None else vectors
+            centers_t = np.ascontiguousarray(unit_vectors(centers).T)
+        else:
+            xs, ys = np.ascontiguousarray(centers[:, 0]), np.ascontiguousarray(centers[:, 1])
+
+        for start in range(0, n, self.rows):
+            stop = min(start + self.rows, n)
+            first, second = scratch[0, :stop - start], scratch[1, :stop - start]
+
+            match self.metric:
+                case 'euclidean' | 'manhattan':
+                    np.subtract(xs, points[start:stop, 0, np.newaxis], out=first)
+                    np.subtract(ys, points[start:stop, 1, np.newaxis], out=second)
+                    if self.metric == 'euclidean':
+                        np.multiply(first, first, out=first)
+                        np.multiply(second, second, out=second)
+                    else:
+                        np.abs(first, out=first)
+                        np.abs(second, out=second)
+                    np.add(first, second, out=first)
+                    np.argmin(first, axis=1, out=labels[start:stop])
+                    minimum[start:stop] = first[index[:stop - start], labels[start:stop]]
+                case 'haversine':
+                    np.matmul(vectors[start:stop], centers_t, out=first)
+                    np.argmax(first, axis=1, out=labels[start:stop])
+                case _:
+                    Logger.warning(f"Could not match case [{self.metric}]")
+                    minimum[start:stop] = -1.0
+
+        # finishing the distances of the nearest centers only.
+        match self.metric:
+            case 'euclidean':
+                np.sqrt(minimum, out=minimum)
+            case 'haversine':
+                minimum = haversine(points, centers[labels])
+
+        self.peak = max(self.peak, scratch.nbytes + labels.nbytes + minimum.nbytes)
+        return labels, minimum
+
+    def memory(self) -> dict:
+        """ Method to report the memory of the kernel.
+
+        Returns:
+            dict: budget, rows per tile and the peak bytes of the scratch buffers and result vectors.
+        """
+        return {'budgetBytes': self.budget, 'tileRows': self.rows, 'peakBytes': self.peak}
@@ -0,0 +1,329 @@
+""" File for the array-backed Clustering Engine """
+
+import numpy as np
+
+from app.model.model import Demand, Facility
+from app.model.distance import NearestKernel, pairwise_distances, paired_distances, unit_vectors, spherical_locations
+from app.model.index import create_index
+from app.model.counters import count
+from app.model.progress import report
+from app.config.logging_config import create_logger
+from app.config.settings import DISTANCE_MEMORY
+
+
+""" Logger Function """
+
+Logger = create_logger()
+Logger.info("Logger initialized.")
+
+
+""" Seeding Functions """
+
+def kmeans_plusplus(points: np.ndarray,
+                    k: int,
+                    metric: str = 'euclidean',
+                    rng: np.random.Generator = None,
+                    centers: np.ndarray = None) -> np.ndarray:
+    """ Function to pick k centers with k-Means++ (D^2 weighted) sampling.
+
+    Args:
+        points (np.ndarray): (N, 2) array of Demand locations, N > 0.
+        k (int): Number of centers.
+        metric (str, optional): Type of Metric to use. Defaults to 'euclidean'.
+        rng (np.random.Generator, optional): Random generator. Defaults to None.
+        centers (np.ndarray, optional): Already chosen centers to continue from. Defaults to None.
+
+    Returns:
+        np.ndarray: (k, 2) array of centers.
+    """
+    rng = np.random.default_rng(rng)
+    n = points.shape[0]
+    chosen = [] if centers is None else list(centers[:k])
+
+    if not chosen:
+        chosen.append(points[rng.integers(n)])
+    closest = pairwise_distances(points, np.array(chosen), metric).min(axis=1)
+
+    while len(chosen) < k:
+        weights = closest * closest
+        total = weights.sum()
+        index = rng.choice(n, p=weights / total) if total > 0 else rng.integers(n)
+
+        chosen.append(points[index])
+        closest = np.minimum(closest, pairwise_distances(points, points[index:index + 1], metric)[:, 0])
+
+    return np.array(chosen, dtype=np.float64)
+
+def meyerson_centers(points: np.ndarray,
+                     k: int,
+                     metric: str = 'euclidean',
+                     rng: np.random.Generator = None,
+                     openingCosts: float = 1.0,
+                     probability: float = 1.0) -> np.ndarray:
+    """ Function to pick k centers from one Meyerson pass over the points in random order.
+
+    The k facilities serving the most points are kept. If the pass opens fewer than k
+    facilities, the remaining centers are added with k-Means++.
+
+    Args:
+        points (np.ndarray): (N, 2) array of Demand locations, N > 0.
+        k (int): Number of centers.
+        metric (str, optional): Type of Metric to use. Defaults to 'euclidean'.
+        rng (np.random.Generator, optional): Random generator. Defaults to None.
+        openingCosts (float, optional): Facility opening costs of the pass. Defaults to 1.0.
+        probability (float, optional): Probability bias of the pass. Defaults to 1.0.
+
+    Returns:
+        np.ndarray: (k, 2) array of centers.
+    """
+    rng = np.random.default_rng(rng)
+    index = create_index({'openingCosts': openingCosts, 'probability': probability}, metric=metric)
+    served = []
+
+    # running the Meyerson pass.
+    for point in points[rng.permutation(points.shape[0])]:
+        key, distance = index.nearest(point)
+        if key is None or rng.random() < min(probability * distance / openingCosts, 1.0):
+            index.insert(point)
+            served.append(1)
+        else:
+            served[key] += 1
+
+    # keeping the busiest facilities.
+    order = np.argsort(-np.array(served), kind='stable')[:k]
+    centers = index.locations[np.sort(order)]
+    if centers.shape[0] < k:
+        centers = kmeans_plusplus(points, k, metric, rng, centers=centers)
+
+    return centers
+
+
+""" Clustering Engine """
+
+class ClusterEngine:
+    def __init__(self, points: np.ndarray, centers: np.ndarray, metric: str = 'euclidean', budget: int = DISTANCE_MEMORY):
+        self.points = np.ascontiguousarray(points, dtype=np.float64).reshape(-1, 2)
+        self.centers = np.ascontiguousarray(centers, dtype=np.float64).reshape(-1, 2)
+        self.metric = metric
+
+        # unit vectors of the points for the spherical assignment and centroids.
+        self.vectors = unit_vectors(self.points) if metric == 'haversine' else None
+
+        # memory-bounded assignment, the scratch buffers are reused by every round.
+        self.kernel = NearestKernel(metric, budget)
+
+        self.labels = np.zeros(self.points.shape[0], dtype=np.intp)
+        self.moved = np.zeros(self.centers.shape[0], dtype=bool)
+
+        # telemetry of the last run.
+        self.iterations = 0
+        self.trace = []
+        self.cost = np.inf
+
+    @classmethod
+    def from_instances(cls, demands: list[Demand], facilities: list[Facility], metric: str = 'euclidean') -> 'ClusterEngine':
+        """ Method to initialize the engine from Demand and Facility instances.
+
+        Args:
+            demands (list[Demand]): Demand instances.
+            facilities (list[Facility]): Facility instances.
+            metric (str, optional): Type of Metric to use. Defaults to 'euclidean'.
+
+        Returns:
+            ClusterEngine: engine instance.
+        """
+        points = np.array([x.location for x in demands], dtype=np.float64)
+        centers = np.array([x.location for x in facilities], dtype=np.float64)
+        return cls(points, centers, metric)
+
+    def assign(self) -> np.ndarray:
+        """ Method to assign each point to the nearest center (in tiles within the memory budget).
+
+        Returns:
+            np.ndarray: (N,) distances to the assigned centers.
+        """
+        self.labels, minimum = self.kernel.nearest(self.points, self.centers, self.vectors)
+        return minimum
+
+    def update(self) -> np.ndarray:
+        """ Method to move every non-empty center to the mean of its points.
+
+        Returns:
+            np.ndarray: (K,) boolean mask of the centers that were updated.
+        """
+        k = self.centers.shape[0]
+        counts = np.bincount(self.labels, minlength=k)
+        filled = counts > 0
+
+        if self.metric == 'haversine':
+            # moving to the spherical centroid (normalized mean of the unit vectors).
+            sums = np.stack([np.bincount(self.labels, weights=self.vectors[:, i], minlength=k) for i in range(3)], axis=1)
+            filled &= np.sum(sums * sums, axis=1) > 0
+            self.centers[filled] = spherical_locations(sums[filled])
+            self.moved |= filled
+            return filled
+
+        sum_x = np.bincount(self.labels, weights=self.points[:, 0], minlength=k)
+        sum_y = np.bincount(self.labels, weights=self.points[:, 1], minlength=k)
+
+        self.centers[filled, 0] = sum_x[filled] / counts[filled]
+        self.centers[filled, 1] = sum_y[filled] / counts[filled]
+        self.moved |= filled
+
+        return filled
+
+    def distances(self) -> np.ndarray:
+        """ Method to calculate the distance of each point to its assigned center.
+
+        Returns:
+            np.ndarray: (N,) distances to the assigned centers.
+        """
+        return paired_distances(self.points, self.centers[self.labels], self.metric)
+
+    def run(self, iterations: int, tolerance: float = None, opening_costs: float = 0.0) -> list[float]:
+        """ Method to run the k-Means rounds until convergence or the iteration cap.
+
+        A round in which no point changes its center is a fixed point and ends the run.
+        With a tolerance, the run also ends once the largest center shift or the cost
+        change of a round drops to or below it.
+
+        Args:
+            iterations (int): Maximum number of assignment/update rounds.
+            tolerance (float, optional): Threshold for the center shift and cost change. Defaults to None.
+            opening_costs (float, optional): Opening costs added to the traced costs. Defaults to 0.0.
+
+        Returns:
+            list[float]: Costs after each round.
+        """
+        self.trace = []
+        previous_labels = None
+
+        for i in range(1, iterations + 1):
+            Logger.debug("===== Clustering Round %s =====", i)
+
+            # assigning each point to the nearest center.
+            self.assign()
+            if previous_labels is not None and np.array_equal(previous_labels, self.labels):
+                self.trace.append(self.trace[-1])
+                Logger.debug("Converged after Round %s: assignments unchanged", i)
+                break
+            previous_labels = self.labels
+
+            # calculating new center locations.
+            previous_centers = self.centers.copy()
+            self.update()
+            self.trace.append(float(opening_costs + np.sum(self.distances())))
+            report(i, self.trace[-1])
+
+            # checking the tolerance.
+            if tolerance is None:
+                continue
+
+            shift = np.max(paired_distances(previous_centers, self.centers, self.metric), initial=0.0)
+            delta = abs(self.trace[-2] - self.trace[-1]) if len(self.trace) > 1 else np.inf
+            if shift <= tolerance or delta <= tolerance:
+                Logger.debug("Converged after Round %s: shift=%s, delta=%s", i, shift, delta)
+                break
+
+        self.iterations = len(self.trace)
+        count('iterations', self.iterations)
+        return self.trace
+
+    def run_minibatch(self,
+                      iterations: int,
+                      batch_size: int = 1024,
+                      seed: int = None,
+                      tolerance: float = None,
+                      opening_costs: float = 0.0) -> list[float]:
+        """ Method to run mini-batch k-Means followed by one full assignment.
+
+        Each round samples batch_size points and moves every hit center to the running
+        mean of all points it was assigned so far (per-center learning rate 1 / count),
+        so the working memory is bounded by batch_size and the number of centers.
+        The final assignment runs in tiles within the memory budget of the kernel.
+
+        Args:
+            iterations (int): Maximum number of mini-batch rounds.
+            batch_size (int, optional): Number of sampled points per round. Defaults to 1024.
+            seed (int, optional): Seed of the batch sampling. Defaults to None.
+            tolerance (float, optional): Threshold for the center shift. Defaults to None.
+            opening_costs (float, optional): Opening costs added to the traced costs. Defaults to 0.0.
+
+        Returns:
+            list[float]: Estimated costs (from the batch distances) after each round.
+        """
+        rng = np.random.default_rng(seed)
+        n, k = self.points.shape[0], self.centers.shape[0]
+        counts = np.zeros(k, dtype=np.float64)
+        self.trace = []
+
+        # sampling needs at least one point.
+        if n == 0:
+            iterations = 0
+
+        for i in range(1, iterations + 1):
+            Logger.debug("===== Mini-Batch Round %s =====", i)
+
+            # assigning a sampled batch to the nearest centers.
+            sample = rng.integers(0, n, size=min(batch_size, n))
+            batch = self.points[sample]
+            labels, distances = self.kernel.nearest(batch, self.centers, None if self.vectors is None else self.vectors[sample])
+
+            # moving the centers to the running means.
+            batch_counts = np.bincount(labels, minlength=k)
+            filled = batch_counts > 0
+            previous_centers = self.centers.copy()
+
+            if self.metric == 'haversine':
+                sums = np.stack([np.bincount(labels, weights=self.vectors[sample, i], minlength=k) for i in range(3)], axis=1)
+                sums = unit_vectors(self.centers) * counts[:, np.newaxis] + sums
+                filled &= np.sum(sums * sums, axis=1) > 0
+                self.centers[filled] = spherical_locations(sums[filled])
+            else:
+                sum_x = np.bincount(labels, weights=batch[:, 0], minlength=k)
+                sum_y = np.bincount(labels, weights=batch[:, 1], minlength=k)
+                total = counts[filled] + batch_counts[filled]
+                self.centers[filled, 0] = (self.centers[filled, 0] * counts[filled] + sum_x[filled]) / total
+                self.centers[filled, 1] = (self.centers[filled, 1] * counts[filled] + sum_y[filled]) / total
+            counts += batch_counts
+            self.moved |= filled
+
+            self.trace.append(float(opening_costs + n * np.mean(distances)))
+            report(i, self.trace[-1])
+
+            # checking the tolerance.
+            if tolerance is not None:
+                shift = np.max(paired_distances(previous_centers, self.centers, self.metric), initial=0.0)
+                if shift <= tolerance:
+                    Logger.debug("Converged after Round %s: shift=%s", i, shift)
+                    break
+
+        self.iterations = len(self.trace)
+        count('iterations', self.iterations)
+
+        # assigning all points to the final centers.
+        if self.iterations > 0:
+            self.assign()
+
+        return self.trace
+
+    def memory(self) -> dict:
+        """ Method to report the memory of the nearest-center kernel (see NearestKernel.memory). """
+        return self.kernel.memory()
+
+    def write_back(self, demands: list[Demand], facilities: list[Facility]) -> None:
+        """ Method to write labels and centers back to the Demand and Facility instances.
+
+        Args:
+            demands (list[Demand]): Demand instances in engine order.
+            facilities (list[Facility]): Facility instances in engine order.
+        """
+        for facility in facilities:
+            facility.reset_demand()
+
+        for demand, label in zip(demands, self.labels.tolist()):
+            facilities[label].add_demand(demand)
+
+        for index in np.flatnonzero(self.moved):
+            location = self.centers[index]
+            facilities[index].location = (location[0], location[1])
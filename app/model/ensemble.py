@@ -0,0 +1,205 @@
+""" File for the vectorized Monte-Carlo Ensemble of the Meyerson Solver """
+
+import numpy as np
+
+from app.model.columnar import ColumnarInstance
+from app.model.counters import count
+from app.model.progress import checkpoint
+from app.model.distance import paired_distances
+from app.model.online_facility import opening_probability
+from app.config.logging_config import create_logger
+
+
+""" Logger Function """
+
+Logger = create_logger()
+Logger.info("Logger initialized.")
+
+
+""" Constants """
+
+# runs solved together as one batch of array operations.
+CHUNK_RUNS = 64
+# arrivals per block of pre-drawn coins.
+BLOCK_ARRIVALS = 1024
+DEFAULT_PERCENTILES = (5.0, 25.0, 50.0, 75.0, 95.0)
+
+
+""" Ensemble Functions """
+
+def meyerson_runs(points: np.ndarray,
+                  centers: np.ndarray,
+                  parameter: dict,
+                  seeds: list[np.random.SeedSequence],
+                  shuffle: bool = False,
+                  record: bool = False) -> dict:
+    """ Function to run independent Meyerson passes over the same arrivals as batched array operations.
+
+    Every run draws its arrival order and coins from its own generator, so a run's
+    result only depends on its seed (and not on the other runs of the batch). The
+    decision rule is opening_probability, shared with OnlineFacilitySolver.meyerson_algorithm.
+
+    Args:
+        points (np.ndarray): (N, 2) array of Demand locations in arrival order.
+        centers (np.ndarray): (K, 2) array of the initially open Facility locations.
+        parameter (dict): Config of the Meyerson solver.
+        seeds (list[np.random.SeedSequence]): Seed per run.
+        shuffle (bool, optional): Draw a random arrival order per run. Defaults to False.
+        record (bool, optional): Return the orders, labels and Facility locations. Defaults to False.
+
+    Returns:
+        dict: 'costs' and 'facilities' per run (added costs and number of open Facilities),
+              with record also 'orders' (S, N), 'labels' (S, N) and 'locations' (S, max facilities, 2).
+    """
+    runs, n, k = len(seeds), points.shape[0], centers.shape[0]
+    openingCosts, metric = parameter['openingCosts'], parameter['metric']
+    rngs = [np.random.default_rng(seed) for seed in seeds]
+    orders = np.stack([rng.permutation(n) for rng in rngs]) if shuffle else np.broadcast_to(np.arange(n), (runs, n))
+
+    rows = np.arange(runs)
+    locations = np.empty((runs, max(16, 2 * k), 2), dtype=np.float64)
+    locations[:, :k] = centers
+    counts = np.full(runs, k, dtype=np.intp)
+    costs = np.zeros(runs, dtype=np.float64)
+    labels = np.empty((runs, n), dtype=np.intp) if record else None
+    count('arrivals', runs * n)
+
+    for start in range(0, n, BLOCK_ARRIVALS):
+        checkpoint()
+        stop = min(start + BLOCK_ARRIVALS, n)
+        coins = np.stack([rng.random(stop - start) for rng in rngs])
+
+        for t in range(start, stop):
+            arrival = points[orders[:, t]]
+
+            # finding the nearest open Facility of every run.
+            width = counts.max()
+            if width > 0:
+                distances = paired_distances(arrival[:, np.newaxis, :], locations[:, :width], metric)
+                distances[np.arange(width) >= counts[:, np.newaxis]] = np.inf
+                nearest = np.argmin(distances, axis=1)
+                distance = distances[rows, nearest]
+            else:
+                nearest = np.zeros(runs, dtype=np.intp)
+                distance = np.full(runs, np.inf)
+
+            # flipping the coins, the first arrival of a run without Facilities always opens.
+            chance = opening_probability(np.where(counts > 0, distance, 0.0), parameter)
+            chance[counts == 0] = 1.0
+            opened = coins[:, t - start] < chance
+
+            # opening and assigning.
+            if width == locations.shape[1]:
+                locations = np.concatenate([locations, np.empty_like(locations)], axis=1)
+            locations[rows[opened], counts[opened]] = arrival[opened]
+            if record:
+                labels[:, t] = np.where(opened, counts, nearest)
+            costs += np.where(opened, openingCosts, distance)
+            counts += opened
+
+    result = {'costs': costs, 'facilities': counts}
+    if record:
+        result.update(orders=np.asarray(orders), labels=labels, locations=locations[:, :counts.max()])
+    return result
+
+def summarize(values: np.ndarray, percentiles: list[float] = DEFAULT_PERCENTILES) -> dict:
+    """ Function to summarize a distribution over the runs.
+
+    Args:
+        values (np.ndarray): Value per run.
+        percentiles (list[float], optional): Percentiles to report. Defaults to DEFAULT_PERCENTILES.
+
+    Returns:
+        dict: mean, std, min, max and the percentiles (keyed by their string).
+    """
+    values = np.asarray(values, dtype=np.float64)
+    return {
+        'mean': float(np.mean(values)),
+        'std': float(np.std(values)),
+        'min': float(np.min(values)),
+        'max': float(np.max(values)),
+        'percentiles': {f"{q:g}": float(x) for q, x in zip(percentiles, np.percentile(values, percentiles))}
+    }
+
+def meyerson_ensemble(instance: ColumnarInstance,
+                      parameter: dict,
+                      runs: int = 100,
+                      seed: int = None,
+                      shuffle: bool = False,
+                      percentiles: list[float] = DEFAULT_PERCENTILES) -> dict:
+    """ Function to replay the Demands of an instance under many independent seeds.
+
+    The runs are spawned from one SeedSequence and solved in batches of CHUNK_RUNS,
+    one after another inside the calling (solver pool) worker. The cheapest run is
+    replayed to return its instance.
+
+    Args:
+        instance (ColumnarInstance): Arrivals (Demands in arrival order) and the initially open Facilities.
+        parameter (dict): Config of the Meyerson solver.
+        runs (int, optional): Number of runs. Defaults to 100.
+        seed (int, optional): Seed of the ensemble. Defaults to None.
+        shuffle (bool, optional): Draw a random arrival order per run. Defaults to False.
+        percentiles (list[float], optional): Percentiles to report. Defaults to DEFAULT_PERCENTILES.
+
+    Returns:
+        dict: cost and Facility count distributions and the best run.
+    """
+    seeds = np.random.SeedSequence(seed).spawn(runs)
+    chunks = [seeds[i:i + CHUNK_RUNS] for i in range(0, runs, CHUNK_RUNS)]
+
+    # running the batches of runs, parallelism comes from the solver pool serving several requests.
+    results = [meyerson_runs(instance.points, instance.centers, parameter, chunk, shuffle=shuffle) for chunk in chunks]
+
+    base = float(np.sum(instance.opening_costs))
+    costs = base + np.concatenate([x['costs'] for x in results])
+    facilities = np.concatenate([x['facilities'] for x in results])
+    best = int(np.argmin(costs))
+    Logger.info(f"Ensemble of [{runs}] runs: mean costs [{np.mean(costs):.3f}], best run [{best}]")
+
+    return {
+        'runs': runs,
+        'shuffle': shuffle,
+        'costs': summarize(costs, percentiles),
+        'facilities': summarize(facilities, percentiles),
+        'best': best_run(instance, parameter, seeds[best], shuffle, best, float(costs[best]))
+    }
+
+def best_run(instance: ColumnarInstance, parameter: dict, seed: np.random.SeedSequence, shuffle: bool, run: int, costs: float) -> dict:
+    """ Function to replay a single run and export its instance.
+
+    Args:
+        instance (ColumnarInstance): Arrivals and the initially open Facilities.
+        parameter (dict): Config of the Meyerson solver.
+        seed (np.random.SeedSequence): Seed of the run.
+        shuffle (bool): Random arrival order.
+        run (int): Index of the run.
+        costs (float): Costs of the run.
+
+    Returns:
+        dict: run, costs, arrival order (demandIDs), Demands and Facilities.
+    """
+    result = meyerson_runs(instance.points, instance.centers, parameter, [seed], shuffle=shuffle, record=True)
+    order, labels, locations = result['orders'][0], result['labels'][0], result['locations'][0]
+
+    # initially open Facilities keep their IDs, new ones are numbered like OnlineFacilitySolver.open_facility.
+    k = instance.facility_ids.shape[0]
+    opened = locations.shape[0] - k
+    arrivals = instance.demand_ids[order]
+    solved = ColumnarInstance(
+        demand_ids=arrivals,
+        points=instance.points[order],
+        facility_ids=np.concatenate([instance.facility_ids, np.arange(k, k + opened)]),
+        centers=locations,
+        opening_costs=np.concatenate([instance.opening_costs, np.full(opened, float(parameter['openingCosts']))]),
+        connection_ids=arrivals[np.argsort(labels, kind='stable')],
+        connection_counts=np.bincount(labels, minlength=locations.shape[0])
+    )
+    demands, facilities = solved.to_json()
+
+    return {
+        'run': run,
+        'costs': costs,
+        'order': arrivals.tolist(),
+        'demands': demands,
+        'facilities': facilities
+    }
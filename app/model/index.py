@@ -0,0 +1,291 @@
+""" File for the Nearest-Facility Spatial Indices """
+
+import math
+import numpy as np
+
+from app.model.counters import count
+from app.model.distance import METRICS, pairwise_distances, unit_vectors, chord_to_arc, arc_to_chord
+from app.config.logging_config import create_logger
+
+
+""" Logger Function """
+
+Logger = create_logger()
+Logger.info("Logger initialized.")
+
+
+""" Constants """
+
+INDICES = ('grid', 'linear')
+DEFAULT_CELL_SIZE = 1.0
+
+
+""" Linear Index """
+
+class LinearIndex:
+    """ Nearest-neighbour index scanning all locations in one vectorized pass. """
+    def __init__(self, metric: str = 'euclidean'):
+        self.metric = metric
+        self.locations = np.empty((16, 2), dtype=np.float64)
+        self.size = 0
+
+    def __len__(self) -> int:
+        return self.size
+
+    def insert(self, location: tuple) -> int:
+        """ Method to insert a new location.
+
+        Args:
+            location (tuple): (x, y) location.
+
+        Returns:
+            int: key of the location (insertion order).
+        """
+        if self.size == self.locations.shape[0]:
+            self.locations = np.concatenate([self.locations, np.empty_like(self.locations)])
+
+        self.locations[self.size] = location
+        self.size += 1
+        return self.size - 1
+
+    def extend(self, locations: np.ndarray) -> None:
+        """ Method to insert several locations in order.
+
+        Args:
+            locations (np.ndarray): (N, 2) array of locations.
+        """
+        for location in locations:
+            self.insert(location)
+
+    def nearest(self, location: tuple) -> tuple[int, float]:
+        """ Method to find the nearest location. Ties resolve to the lowest key.
+
+        Args:
+            location (tuple): (x, y) query location.
+
+        Returns:
+            tuple[int, float]: key and distance of the nearest location.
+        """
+        if self.size == 0:
+            return None, math.inf
+
+        query = np.array([location], dtype=np.float64)
+        distances = pairwise_distances(query, self.locations[:self.size], self.metric)[0]
+        key = int(np.argmin(distances))
+        return key, distances[key]
+
+
+""" Grid Index """
+
+class GridIndex(LinearIndex):
+    """ Nearest-neighbour index over a uniform hash grid with incremental inserts.
+
+    The query scans rings of cells around the query cell. Every location outside of
+    ring r is further than r * cell_size away in at least one coordinate, which bounds
+    both the euclidean and the manhattan distance from below.
+    """
+    def __init__(self, metric: str = 'euclidean', cell_size: float = DEFAULT_CELL_SIZE):
+        super().__init__(metric)
+        self.cell_size = float(cell_size)
+        self.cells = {}
+        self.bounds = None
+
+    def cell(self, location: tuple) -> tuple[int, int]:
+        return (math.floor(location[0] / self.cell_size), math.floor(location[1] / self.cell_size))
+
+    def insert(self, location: tuple) -> int:
+        key = super().insert(location)
+        cell = self.cell(location)
+        self.cells.setdefault(cell, []).append(key)
+
+        # updating the occupied cell bounds.
+        if self.bounds is None:
+            self.bounds = [cell[0], cell[0], cell[1], cell[1]]
+        else:
+            self.bounds = [min(self.bounds[0], cell[0]), max(self.bounds[1], cell[0]),
+                           min(self.bounds[2], cell[1]), max(self.bounds[3], cell[1])]
+        return key
+
+    def ring(self, center: tuple[int, int], radius: int) -> list[int]:
+        """ Method to collect all keys in the cells at Chebyshev distance radius.
+
+        Args:
+            center (tuple[int, int]): query cell.
+            radius (int): ring radius in cells.
+
+        Returns:
+            list[int]: keys within the ring.
+        """
+        cx, cy = center
+        if radius == 0:
+            return list(self.cells.get(center, []))
+
+        keys = []
+        for x in range(cx - radius, cx + radius + 1):
+            keys.extend(self.cells.get((x, cy - radius), []))
+            keys.extend(self.cells.get((x, cy + radius), []))
+        for y in range(cy - radius + 1, cy + radius):
+            keys.extend(self.cells.get((cx - radius, y), []))
+            keys.extend(self.cells.get((cx + radius, y), []))
+        return keys
+
+    def nearest(self, location: tuple) -> tuple[int, float]:
+        if self.size == 0:
+            return None, math.inf
+
+        center = self.cell(location)
+        max_radius = max(abs(center[0] - self.bounds[0]), abs(center[0] - self.bounds[1]),
+                         abs(center[1] - self.bounds[2]), abs(center[1] - self.bounds[3]))
+
+        # guarding the ring bound against rounding in the cell assignment.
+        slack = 1e-9 * (1.0 + abs(location[0]) + abs(location[1]))
+        query = np.array([location], dtype=np.float64)
+        best_key, best_distance = None, math.inf
+
+        for radius in range(0, max_radius + 1):
+            # scanning every location once the ring outgrows the occupied cells.
+            if (2 * radius + 1) ** 2 > len(self.cells):
+                return super().nearest(location)
+
+            keys = self.ring(center, radius)
+            if keys:
+                keys = np.array(keys, dtype=np.intp)
+                distances = pairwise_distances(query, self.locations[keys], self.metric)[0]
+                minimum = distances.min()
+                key = int(keys[distances == minimum].min())
+
+                if minimum < best_distance or (minimum == best_distance and key < best_key):
+                    best_key, best_distance = key, minimum
+
+            if best_distance < radius * self.cell_size - slack:
+                break
+
+        return best_key, best_distance
+
+
+""" Sphere Index """
+
+class SphereIndex(LinearIndex):
+    """ Nearest-neighbour index for the haversine metric over a 3-d hash grid of unit vectors.
+
+    The great-circle distance grows monotonically with the chord between the unit vectors,
+    so the query scans shells of cells around the query cell in 3-d like GridIndex does in
+    2-d: every vector outside of shell r is more than r * cell_size (chord) away.
+    """
+    def __init__(self, cell_size: float = DEFAULT_CELL_SIZE):
+        super().__init__('haversine')
+        self.cell_size = arc_to_chord(float(cell_size))
+        self.vectors = np.empty((16, 3), dtype=np.float64)
+        self.cells = {}
+        self.bounds = None
+
+    def cell(self, vector: np.ndarray) -> tuple[int, int, int]:
+        return tuple(math.floor(x / self.cell_size) for x in vector)
+
+    def insert(self, location: tuple) -> int:
+        key = super().insert(location)
+        if self.vectors.shape[0] < self.locations.shape[0]:
+            self.vectors = np.concatenate([self.vectors, np.empty_like(self.vectors)])
+
+        self.vectors[key] = unit_vectors(self.locations[key])
+        cell = self.cell(self.vectors[key])
+        self.cells.setdefault(cell, []).append(key)
+
+        # updating the occupied cell bounds.
+        if self.bounds is None:
+            self.bounds = [[x, x] for x in cell]
+        else:
+            self.bounds = [[min(low, x), max(high, x)] for (low, high), x in zip(self.bounds, cell)]
+        return key
+
+    def shell(self, center: tuple[int, int, int], radius: int) -> list[int]:
+        """ Method to collect all keys in the cells at Chebyshev distance radius.
+
+        Args:
+            center (tuple[int, int, int]): query cell.
+            radius (int): shell radius in cells.
+
+        Returns:
+            list[int]: keys within the shell.
+        """
+        cx, cy, cz = center
+        keys = []
+        for x in range(cx - radius, cx + radius + 1):
+            for y in range(cy - radius, cy + radius + 1):
+                # inner columns only touch the shell at the top and bottom.
+                if max(abs(x - cx), abs(y - cy)) == radius:
+                    zs = range(cz - radius, cz + radius + 1)
+                else:
+                    zs = (cz - radius, cz + radius) if radius > 0 else (cz,)
+                for z in zs:
+                    keys.extend(self.cells.get((x, y, z), []))
+        return keys
+
+    def nearest(self, location: tuple) -> tuple[int, float]:
+        if self.size == 0:
+            return None, math.inf
+
+        query = unit_vectors(np.array(location, dtype=np.float64))
+        center = self.cell(query)
+        max_radius = max(max(abs(x - low), abs(x - high)) for x, (low, high) in zip(center, self.bounds))
+
+        # guarding the shell bound against rounding in the cell assignment.
+        slack = 1e-9
+        best_key, best_chord = None, math.inf
+
+        for radius in range(0, max_radius + 1):
+            # scanning every location once the shell outgrows the occupied cells.
+            if (2 * radius + 1) ** 3 > len(self.cells):
+                return super().nearest(location)
+
+            keys = self.shell(center, radius)
+            if keys:
+                keys = np.array(keys, dtype=np.intp)
+                count('distanceEvaluations', keys.shape[0])
+                difference = self.vectors[keys] - query
+                chords = np.sqrt(np.sum(difference * difference, axis=-1))
+                minimum = chords.min()
+                key = int(keys[chords == minimum].min())
+
+                if minimum < best_chord or (minimum == best_chord and key < best_key):
+                    best_key, best_chord = key, minimum
+
+            if best_chord < radius * self.cell_size - slack:
+                break
+
+        return best_key, chord_to_arc(best_chord)
+
+
+""" Factory """
+
+def create_index(parameter: dict, metric: str = 'euclidean') -> LinearIndex:
+    """ Function to create the nearest-facility index selected in the parameter.
+
+    Args:
+        parameter (dict): Config for the Facility Location Problem.
+        metric (str, optional): Type of Metric to use. Defaults to 'euclidean'.
+
+    Returns:
+        LinearIndex: index instance.
+    """
+    index = parameter.get('index', 'grid')
+    if index not in INDICES:
+        Logger.warning(f"Could not match index [{index}]")
+
+    # the grid lower bound only holds for the known metrics.
+    if index != 'grid' or metric not in METRICS:
+        return LinearIndex(metric)
+
+    # facilities open roughly every openingCosts / probability units of distance.
+    cell_size = parameter.get('cellSize')
+    if cell_size is None:
+        probability = parameter.get('probability', 0.0)
+        openingCosts = parameter.get('openingCosts', 0.0)
+        cell_size = openingCosts / probability if probability > 0 and openingCosts > 0 else DEFAULT_CELL_SIZE
+    if cell_size <= 0:
+        Logger.warning(f"Invalid cell size [{cell_size}]")
+        cell_size = DEFAULT_CELL_SIZE
+
+    if metric == 'haversine':
+        return SphereIndex(cell_size=cell_size)
+    return GridIndex(metric, cell_size=cell_size)
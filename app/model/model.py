@@ -2,6 +2,8 @@
 
 import numpy as np
 
+from app.model.counters import count
+from app.model.distance import haversine
 from app.config.logging_config import create_logger
 
 
@@ -23,24 +25,17 @@ class Demand:
         Logger.debug(f"{cache}")
         return cache
 
-    def from_request(self, data: dict) -> 'Demand':
-        """ Method to initialize a Demand instance from a request.
+    def from_request(self, data) -> 'Demand':
+        """ Method to initialize a Demand instance from a validated request.
 
         Args:
-            data (dict): Demand instance data.
+            data (DemandModel): Demand instance data (any object with demandID and location).
         
         Returns:
             Demand: self instance.
         """
-        # checking data for keys.
-        for key in ['demandID', 'location']:
-            if key not in data.keys():
-                Logger.warning(f"Could not find [{key}] in Demand data.")
-                return
-        
-        # assigning values from request data.
-        self.demandID = data['demandID']
-        self.location = data['location']
+        self.demandID = data.demandID
+        self.location = data.location
 
         return self
 
@@ -55,6 +50,7 @@ class Facility:
         self.facilityID = facilityID
         self.location = location
         self.demands = demands if demands is not None else []
+        self.demandIDs = {x.demandID for x in self.demands}
         self.openingCosts = openingCosts
 
     def log_facility(self) -> str:
@@ -63,29 +59,29 @@ class Facility:
         Logger.debug(f"{cache}")
         return cache
 
-    def from_request(self, data: dict, demands: list[Demand] = None) -> 'Facility':
-        """ Method to initialize a Demand instance from a request.
+    def from_request(self, data, demands: list[Demand] | dict[int, Demand] = None) -> 'Facility':
+        """ Method to initialize a Facility instance from a validated request.
 
         Args:
-            data (dict): Demand instance data.
+            data (FacilityModel): Facility instance data (any object with facilityID, location, openingCosts and connection).
+            demands (list[Demand] | dict[int, Demand], optional): Demand instances or a demandID -> Demand index. Defaults to None.
 
         Returns:
             Facility: self instance.
         """
-        # checking data for keys.
-        for key in ['facilityID', 'location', 'connection', 'openingCosts']:
-            if key not in data.keys():
-                Logger.warning(f"Could not find [{key}] in Facility data.")
-                return
-        
-        # assigning values from request data.
-        self.facilityID = data['facilityID']
-        self.location = data['location']
-        self.openingCosts = data['openingCosts']
+        self.facilityID = data.facilityID
+        self.location = data.location
+        self.openingCosts = data.openingCosts
 
         if demands:
-            cache = [x for x in demands if x.demandID in data['connection']]
-            self.demands = cache
+            # resolving connections through a demandID -> Demand index.
+            index = demands if isinstance(demands, dict) else {x.demandID: x for x in demands}
+
+            self.reset_demand()
+            for demandID in data.connection:
+                demand = index.get(demandID)
+                if demand is not None:
+                    self.add_demand(demand)
 
         return self
 
@@ -107,32 +103,34 @@ class Facility:
             bool: True if self serves Demand. False otherwise.
         """
         # checking if Demand is already in self.demand.
-        current_demand = [x.demandID for x in self.demands]
+        return demand.demandID in self.demandIDs
 
-        if demand.demandID in current_demand:
-            return True
-        return False
-
-    def add_demand(self, demand: Demand) -> None:
+    def add_demand(self, demand: Demand) -> bool:
         """ Method to add a Demand to the Facility.
 
         Args:
             demand (Demand): Demand Instance.
+
+        Returns:
+            bool: True if the Demand was added. False if it was already served.
         """
         # checking Demand.
         if self.check_demand(demand):
             Logger.warning(f"Demand [{demand.demandID}] already served by Facility [{self.facilityID}]")
-            return
+            return False
         
         # adding Demand to self.
         self.demands.append(demand)
-        Logger.debug(f"Demand [{demand.demandID}] assigned to Facility [{self.facilityID}]")
+        self.demandIDs.add(demand.demandID)
+        Logger.debug("Demand [%s] assigned to Facility [%s]", demand.demandID, self.facilityID)
+        return True
 
     def reset_demand(self) -> None:
         """ Method to reset self.demands to [].
         """
         self.demands = []
-        Logger.debug(f"{self.demands=}")
+        self.demandIDs = set()
+        Logger.debug("self.demands=%s", self.demands)
 
     def calculate_distance(self, demand: Demand, metric: str = 'euclidean') -> float:
         """ Method to calculate the distance to a Demand.
@@ -145,16 +143,19 @@ class Facility:
             float: Distance from self to the Demand.
         """
         # defining variables.
-        demand_location = np.array(demand.location)
-        facility_location = np.array(self.location)
+        count('distanceEvaluations')
+        demand_location = np.array(demand.location, dtype=np.float64)
+        facility_location = np.array(self.location, dtype=np.float64)
         distance_location = facility_location - demand_location
         
-        # calculating distance.
+        # calculating distance (same arithmetic as app.model.distance).
         match metric:
             case 'euclidean':
-                return np.linalg.norm(distance_location)
+                return np.sqrt(np.sum(distance_location * distance_location))
             case 'manhattan':
-                return np.linalg.norm(distance_location, ord=1)
+                return np.sum(np.abs(distance_location))
+            case 'haversine':
+                return haversine(demand_location, facility_location)
             case _:
                 Logger.warning(f"Could not match case [{metric}]")
                 return -1.0
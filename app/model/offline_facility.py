@@ -4,6 +4,8 @@ import random as rnd
 import numpy as np
 
 from app.model.model import Demand, Facility
+from app.model.engine import ClusterEngine, kmeans_plusplus, meyerson_centers
+from app.model.ufl import locate_instance, site_ids
 from app.config.logging_config import create_logger
 
 
@@ -18,8 +20,156 @@ Logger.info("Logger initialized.")
 DEFAULT_PARAMETER = {
     'probability': 1.0,
     'costs': 100,
-    'iterations': 10
+    'iterations': 10,
+    'metric': 'euclidean'
 }
+ENGINES = ('kmeans', 'ufl')
+MODES = ('batch', 'minibatch')
+INITS = ('request', 'kmeans++', 'meyerson')
+DEFAULT_BATCH_SIZE = 1024
+
+
+""" Clustering Functions """
+
+def is_deterministic(parameter: dict) -> bool:
+    """ Function to check if a solve is fully determined by its request.
+
+    Args:
+        parameter (dict): Config for the Facility Location Problem.
+
+    Returns:
+        bool: False for randomized modes/inits without a seed. True otherwise.
+    """
+    if parameter.get('engine', 'kmeans') == 'ufl':
+        return True
+    randomized = parameter.get('mode', 'batch') == 'minibatch' or parameter.get('init', 'request') != 'request'
+    return not randomized or parameter.get('seed') is not None
+
+def solve_clustering(points: np.ndarray,
+                     centers: np.ndarray,
+                     parameter: dict,
+                     opening_costs: float,
+                     seed: np.random.SeedSequence) -> ClusterEngine:
+    """ Function to run one seeded clustering solve on plain arrays.
+
+    Args:
+        points (np.ndarray): (N, 2) array of Demand locations.
+        centers (np.ndarray): (K, 2) array of the requested Facility locations.
+        parameter (dict): Config for the Facility Location Problem.
+        opening_costs (float): Total Facility opening costs.
+        seed (np.random.SeedSequence): Seed of this solve.
+
+    Returns:
+        ClusterEngine: engine holding the final centers, labels, telemetry and costs.
+    """
+    rng = np.random.default_rng(seed)
+    engine = ClusterEngine(points, centers.copy(), metric=parameter['metric'])
+    iterations = int(parameter['iterations'])
+    tolerance = parameter.get('tolerance')
+    k = engine.centers.shape[0]
+
+    # seeding the Facility locations.
+    init = parameter.get('init', 'request')
+    if init not in INITS:
+        Logger.warning(f"Could not match init [{init}]")
+
+    if points.shape[0] > 0 and k > 0:
+        match init:
+            case 'kmeans++':
+                engine.centers = kmeans_plusplus(engine.points, k, engine.metric, rng)
+                engine.moved[:] = True
+            case 'meyerson':
+                openingCosts = parameter.get('openingCosts') or opening_costs / k
+                engine.centers = meyerson_centers(engine.points, k, engine.metric, rng,
+                                                  openingCosts=openingCosts,
+                                                  probability=parameter.get('probability', 1.0))
+                engine.moved[:] = True
+
+    # running the clustering rounds.
+    mode = parameter.get('mode', 'batch')
+    if mode not in MODES:
+        Logger.warning(f"Could not match mode [{mode}]")
+
+    match mode:
+        case 'minibatch':
+            engine.run_minibatch(iterations,
+                                 batch_size=int(parameter.get('batchSize', DEFAULT_BATCH_SIZE)),
+                                 seed=rng,
+                                 tolerance=tolerance,
+                                 opening_costs=opening_costs)
+        case _:
+            engine.run(iterations, tolerance=tolerance, opening_costs=opening_costs)
+
+    if engine.iterations > 0:
+        engine.cost = opening_costs + np.sum(engine.distances())
+
+    return engine
+
+
+def restart_count(parameter: dict) -> int:
+    """ Function to count the seeded solves of a request.
+
+    Without a randomized init or mode every restart is the same solve, so
+    parameter['restarts'] collapses to 1 (the result data reports the count).
+    The 'ufl' engine ignores the restarts.
+
+    Args:
+        parameter (dict): Config for the Facility Location Problem.
+
+    Returns:
+        int: Number of seeded solves.
+    """
+    restarts = max(1, int(parameter.get('restarts', 1)))
+    if parameter.get('engine', 'kmeans') == 'ufl':
+        return 1
+    if restarts > 1 and parameter.get('mode', 'batch') != 'minibatch' and parameter.get('init', 'request') == 'request':
+        Logger.debug("Collapsed [%s] deterministic restarts to one solve", restarts)
+        return 1
+    return restarts
+
+def restart_seeds(parameter: dict) -> list[np.random.SeedSequence]:
+    """ Function to spawn the seeds of the seeded solves of a request (see restart_count).
+
+    Args:
+        parameter (dict): Config for the Facility Location Problem.
+
+    Returns:
+        list[np.random.SeedSequence]: Seed per solve.
+    """
+    return np.random.SeedSequence(parameter.get('seed')).spawn(restart_count(parameter))
+
+def cluster_instance(points: np.ndarray,
+                     centers: np.ndarray,
+                     parameter: dict,
+                     opening_costs: float,
+                     seed: np.random.SeedSequence = None) -> ClusterEngine:
+    """ Function to run the seeded clustering solves of an instance and keep the cheapest one.
+
+    The API fans the restarts out across the solver pool and passes one of the
+    restart_seeds per call. Without a seed (e.g. in a job worker) the restarts run
+    one after another and only the cheapest engine is kept.
+
+    Args:
+        points (np.ndarray): (N, 2) array of Demand locations.
+        centers (np.ndarray): (K, 2) array of the requested Facility locations.
+        parameter (dict): Config for the Facility Location Problem.
+        opening_costs (float): Total Facility opening costs.
+        seed (np.random.SeedSequence, optional): Seed of a single restart. Defaults to None.
+
+    Returns:
+        ClusterEngine: engine of the lowest-cost solve.
+    """
+    seeds = restart_seeds(parameter) if seed is None else [seed]
+
+    # running the seeded solves.
+    best = None
+    for i, seed in enumerate(seeds):
+        engine = solve_clustering(points, centers, parameter, opening_costs, seed)
+        Logger.debug("Restart %s: costs=%s", i, engine.cost)
+        if best is None or engine.cost < best.cost:
+            best = engine
+
+    return best
 
 
 """ Offline Facility Location Solver """
@@ -28,31 +178,54 @@ class OfflineFacilitySolver:
     def __init__(self, 
                  demands: list[Demand] = None,
                  facilities: list[Facility] = None,
-                 parameter: dict = DEFAULT_PARAMETER,
-                 log_lvl: str = "info"):
-        Logger.setLevel(log_lvl.upper())
-
+                 parameter: dict = DEFAULT_PARAMETER):
         self.demands = demands if demands is not None else []
         self.facilities = facilities if facilities is not None else []
         self.parameter = parameter
 
         self.costs = {'current': 0.0, 'previous': 0.0, 'delta': 0.0}
 
-    def calculate_costs(self) -> dict:
-        # calculating costs.
-        previous = self.costs['current']
-        current = 0.0
+        # telemetry of the last cluster_algorithm run.
+        self.restarts = 1
+        self.iterations = 0
+        self.trace = []
+        self.memory = {}
+
+        # running cost totals, updated by open_facility and assign_facility.
+        self.opening_costs, self.distance_costs = self.recalculate_costs()
+
+    def recalculate_costs(self) -> tuple[float, float]:
+        """ Method to recompute the opening and distance costs from scratch.
+
+        Returns:
+            tuple[float, float]: Total opening costs and total distance costs.
+        """
+        opening_costs = 0.0
+        distance_costs = 0.0
         for facility in self.facilities:
-            current += facility.openingCosts
+            opening_costs += facility.openingCosts
 
             for demand in facility.demands:
-                current += facility.calculate_distance(demand, metric=self.parameter['metric'])
+                distance_costs += facility.calculate_distance(demand, metric=self.parameter['metric'])
+
+        return opening_costs, distance_costs
+
+    def calculate_costs(self) -> dict:
+        # calculating costs from the running totals.
+        previous = self.costs['current']
+        current = self.opening_costs + self.distance_costs
+
+        # cross-checking the running totals against a full recompute.
+        if self.parameter.get('debugCosts', False):
+            expected = sum(self.recalculate_costs())
+            if not np.isclose(current, expected):
+                Logger.warning(f"Running costs [{current}] differ from recomputed costs [{expected}]")
 
         # assigning costs.
         self.costs['current'] = current
         self.costs['previous'] = previous
         self.costs['delta'] = current - previous
-        Logger.debug(f"Updated: {self.costs=}")
+        Logger.debug("Updated: self.costs=%s", self.costs)
 
         return self.costs
 
@@ -65,55 +238,103 @@ class OfflineFacilitySolver:
         facility = Facility(facilityID=len(self.facilities),
                             location=demand.location,
                             openingCosts=openingCosts)
-        facility.add_demand(demand)
+        if facility.add_demand(demand):
+            self.distance_costs += facility.calculate_distance(demand, metric=self.parameter['metric'])
+        self.opening_costs += openingCosts
 
         self.facilities.append(facility)
         self.demands.append(demand)
-        Logger.info(f"Added Demand [{demand.demandID}] to new Facility [{facility.facilityID}]")
+        Logger.debug("Added Demand [%s] to new Facility [%s]", demand.demandID, facility.facilityID)
 
-    def assign_facility(self, facility: Facility, demand: Demand) -> None:
+    def assign_facility(self, facility: Facility, demand: Demand, distance: float = None) -> None:
         """ Method to assign a Demand instance to an existing Facility.
 
         Args:
             facility (Facility): Existing Facility from self.facility.
             demand (Demand): Demand instance.
+            distance (float, optional): Known distance from the Facility to the Demand. Defaults to None.
         """
-        facility.add_demand(demand)
+        if facility.add_demand(demand):
+            if distance is None:
+                distance = facility.calculate_distance(demand, metric=self.parameter['metric'])
+            self.distance_costs += distance
         self.demands.append(demand)
-        Logger.info(f"Assigned Demand [{demand.demandID}] to Facility [{facility.facilityID}]")
+        Logger.debug("Assigned Demand [%s] to Facility [%s]", demand.demandID, facility.facilityID)
 
     def cluster_algorithm(self) -> None:
-        for i in range(1, int(self.parameter['iterations']) + 1):
-            Logger.debug(f"{'='*5} Clustering Round {i} {'='*5}")
-
-            # resetting all connections.
-            for facility in self.facilities:
-                facility.reset_demand()
-
-            # assigning each Demand to the nearest Facility.
-            for demand in self.demands:
-                distances = {x: x.calculate_distance(demand, metric=self.parameter['metric']) for x in self.facilities}
-                Logger.debug(F"Distances: {distances}")
-
-                facility, distance = min(distances.items(), key=lambda item: item[1])
-                Logger.debug(f"Min: [{facility.facilityID}] -> {distance=}")
+        """ Method to run the k-Means Clustering algorithm on the array-backed engine.
+
+        Runs at most parameter['iterations'] rounds and stops early on convergence,
+        see ClusterEngine.run and parameter['tolerance']. parameter['mode'] selects
+        full-batch ('batch') or mini-batch ('minibatch', see parameter['batchSize']) rounds,
+        parameter['init'] the Facility seeding ('request', 'kmeans++' or 'meyerson').
+        With parameter['restarts'] > 1 the seeded solves run one after another and
+        the lowest-cost result is kept. parameter['engine'] == 'ufl' runs
+        ufl_algorithm instead.
+        """
+        engine = self.parameter.get('engine', 'kmeans')
+        if engine not in ENGINES:
+            Logger.warning(f"Could not match engine [{engine}]")
+        if engine == 'ufl':
+            return self.ufl_algorithm()
+
+        instance = ClusterEngine.from_instances(self.demands, self.facilities, metric=self.parameter['metric'])
+        engine = cluster_instance(instance.points, instance.centers, self.parameter, self.opening_costs)
+
+        self.restarts = restart_count(self.parameter)
+        self.iterations = engine.iterations
+        self.trace = engine.trace
+        self.memory = engine.memory()
+        Logger.debug("Clustering ran [%s] rounds", self.iterations)
+
+        # writing connections and locations back to the instances.
+        if engine.iterations > 0:
+            engine.write_back(self.demands, self.facilities)
+            self.distance_costs = np.sum(engine.distances())
 
-                facility.add_demand(demand)
-                Logger.debug(f"Added Demand [{demand.demandID}] to Facility [{facility.facilityID}]")
+        # checking for cost improvement.
+        costs = self.calculate_costs()
+        Logger.debug("Current costs: %s", costs['current'])
 
-            # calculating new Facility locations.
-            for facility in self.facilities:
-                if len(facility.demands) == 0:
-                    continue
+    def ufl_algorithm(self) -> None:
+        """ Method to choose the open Facilities by greedy opening and add/drop/swap local search.
 
-                cache = np.array([x.location for x in facility.demands])
-                location = np.mean(cache, axis=0)
-                facility.location = (location[0], location[1])
-                Logger.debug(F"Facility [{facility.facilityID}] new Location: {facility.location}")
+        The requested Facilities (and with parameter['candidates'] == 'demands' every
+        Demand location) are the candidate sites, see LocalSearchEngine. Only the open
+        Facilities are kept, parameter['iterations'] caps the local search moves.
+        """
+        points = np.array([x.location for x in self.demands], dtype=np.float64).reshape(-1, 2)
+        centers = np.array([x.location for x in self.facilities], dtype=np.float64).reshape(-1, 2)
+        opening_costs = np.array([x.openingCosts for x in self.facilities], dtype=np.float64)
+        engine = locate_instance(points, centers, opening_costs, self.parameter)
+
+        self.iterations = engine.iterations
+        self.trace = engine.trace
+        self.memory = engine.memory()
+        Logger.debug("Local search ran [%s] moves", self.iterations)
+
+        # keeping the open Facilities and adding the opened Demand sites.
+        k = len(self.facilities)
+        facilities = {}
+        ids = site_ids(np.array([x.facilityID for x in self.facilities], dtype=np.int64), engine.open)
+        for site, facilityID in zip(np.flatnonzero(engine.open).tolist(), ids.tolist()):
+            if site < k:
+                facilities[site] = self.facilities[site]
+                facilities[site].reset_demand()
+            else:
+                x, y = engine.sites[site].tolist()
+                facilities[site] = Facility(facilityID=facilityID, location=(x, y), openingCosts=float(engine.opening_costs[site]))
+
+        for demand, label in zip(self.demands, engine.labels.tolist()):
+            facilities[label].add_demand(demand)
+
+        self.facilities = list(facilities.values())
+        self.opening_costs = float(np.sum(engine.opening_costs[engine.open]))
+        self.distance_costs = float(np.sum(engine.nearest))
 
         # checking for cost improvement.
         costs = self.calculate_costs()
-        Logger.debug(F"Current costs: {costs['current']}")
+        Logger.debug("Current costs: %s", costs['current'])
 
     def current_instance(self) -> dict:
         return {
@@ -121,7 +342,11 @@ class OfflineFacilitySolver:
             'facilities': [x.to_json() for x in self.facilities],
             'parameter': self.parameter,
             'data': {
-                'costs': self.costs
+                'costs': self.costs,
+                'restarts': self.restarts,
+                'iterations': self.iterations,
+                'trace': self.trace,
+                'memory': self.memory
             }
         }
 
@@ -4,6 +4,9 @@ import random as rnd
 import numpy as np
 
 from app.model.model import Demand, Facility
+from app.model.index import create_index
+from app.model.counters import count
+from app.model.progress import checkpoint
 from app.config.logging_config import create_logger
 
 
@@ -22,6 +25,22 @@ DEFAULT_PARAMETER = {
 }
 
 
+""" Decision Rule """
+
+def opening_probability(distance: float | np.ndarray, parameter: dict) -> float | np.ndarray:
+    """ Function to compute the Meyerson probability of opening a new Facility.
+
+    Args:
+        distance (float | np.ndarray): Distance(s) to the nearest open Facility.
+        parameter (dict): Config with probability and openingCosts.
+
+    Returns:
+        float | np.ndarray: Probability (rounded to 3 decimals, at most 1).
+    """
+    probability = parameter['probability'] * (distance / parameter['openingCosts'])
+    return np.minimum(np.around(probability, decimals=3), 1)
+
+
 """ Online Facility Location Solver """
 
 class OnlineFacilitySolver:
@@ -29,16 +48,24 @@ class OnlineFacilitySolver:
                  demands: list[Demand] = None,
                  facilities: list[Facility] = None,
                  parameter: dict = DEFAULT_PARAMETER,
-                 log_lvl: str = "info"):
-        Logger.setLevel(log_lvl.upper())
-
+                 seed: int = None):
         self.demands = demands if demands is not None else []
         self.facilities = facilities if facilities is not None else []
         self.parameter = parameter
-        
+
+        # solver-local random generator, reproducible when seeded.
+        self.random = rnd.Random(seed)
+
+        # nearest-facility index over self.facilities (key == list position).
+        self.index = create_index(self.parameter, metric=self.parameter['metric'])
+        self.index.extend([x.location for x in self.facilities])
+
         self.coin_flip = True
         self.costs = {'current': 0.0, 'previous': 0.0, 'delta': 0.0}
 
+        # running cost totals, updated by open_facility and assign_facility.
+        self.opening_costs, self.distance_costs = self.recalculate_costs()
+
     def flip_coin(self, probability: float = 1.0) -> bool:
         """ Method to flip a (bias) coin.
 
@@ -48,27 +75,44 @@ class OnlineFacilitySolver:
         Returns:
             bool: True if coin hits heads. False otherwise.
         """
-        coin_flip = bool(rnd.random() < probability)
+        coin_flip = bool(self.random.random() < probability)
         self.coin_flip = coin_flip
-        Logger.debug(f"{coin_flip=}")
+        Logger.debug("coin_flip=%s", coin_flip)
 
         return coin_flip
 
-    def calculate_costs(self) -> dict:
-        # calculating costs.
-        previous = self.costs['current']
-        current = 0.0
+    def recalculate_costs(self) -> tuple[float, float]:
+        """ Method to recompute the opening and distance costs from scratch.
+
+        Returns:
+            tuple[float, float]: Total opening costs and total distance costs.
+        """
+        opening_costs = 0.0
+        distance_costs = 0.0
         for facility in self.facilities:
-            current += facility.openingCosts
+            opening_costs += facility.openingCosts
 
             for demand in facility.demands:
-                current += facility.calculate_distance(demand, metric=self.parameter['metric'])
+                distance_costs += facility.calculate_distance(demand, metric=self.parameter['metric'])
+
+        return opening_costs, distance_costs
+
+    def calculate_costs(self) -> dict:
+        # calculating costs from the running totals.
+        previous = self.costs['current']
+        current = self.opening_costs + self.distance_costs
+
+        # cross-checking the running totals against a full recompute.
+        if self.parameter.get('debugCosts', False):
+            expected = sum(self.recalculate_costs())
+            if not np.isclose(current, expected):
+                Logger.warning(f"Running costs [{current}] differ from recomputed costs [{expected}]")
 
         # assigning costs.
         self.costs['current'] = current
         self.costs['previous'] = previous
         self.costs['delta'] = current - previous
-        Logger.debug(f"Updated: {self.costs=}")
+        Logger.debug("Updated: self.costs=%s", self.costs)
 
         return self.costs
 
@@ -81,58 +125,106 @@ class OnlineFacilitySolver:
         facility = Facility(facilityID=len(self.facilities),
                             location=demand.location,
                             openingCosts=openingCosts)
-        facility.add_demand(demand)
+        if facility.add_demand(demand):
+            self.distance_costs += facility.calculate_distance(demand, metric=self.parameter['metric'])
+        self.opening_costs += openingCosts
 
         self.facilities.append(facility)
+        self.index.insert(facility.location)
         self.demands.append(demand)
-        Logger.info(f"Added Demand [{demand.demandID}] to new Facility [{facility.facilityID}]")
+        Logger.debug("Added Demand [%s] to new Facility [%s]", demand.demandID, facility.facilityID)
 
-    def assign_facility(self, facility: Facility, demand: Demand) -> None:
+    def assign_facility(self, facility: Facility, demand: Demand, distance: float = None) -> None:
         """ Method to assign a Demand instance to an existing Facility.
 
         Args:
             facility (Facility): Existing Facility from self.facility.
             demand (Demand): Demand instance.
+            distance (float, optional): Known distance from the Facility to the Demand. Defaults to None.
         """
-        facility.add_demand(demand)
+        if facility.add_demand(demand):
+            if distance is None:
+                distance = facility.calculate_distance(demand, metric=self.parameter['metric'])
+            self.distance_costs += distance
         self.demands.append(demand)
-        Logger.info(f"Assigned Demand [{demand.demandID}] to Facility [{facility.facilityID}]")
+        Logger.debug("Assigned Demand [%s] to Facility [%s]", demand.demandID, facility.facilityID)
 
-    def meyerson_algorithm(self, demand: Demand) -> None:
+    def meyerson_algorithm(self, demand: Demand) -> dict:
         """ Method to assign a Demand in the Meyerson algorithmic way.
 
         Args:
             demand (Demand): Demand instance.
+
+        Returns:
+            dict: Decision for the Demand (Facility, opened/assigned, coin, probability and distance).
         """
+        count('arrivals')
+
         # checking for facilities.
         if len(self.facilities) == 0:
             self.open_facility(demand, self.parameter['openingCosts'])
             self.calculate_costs()
-            return
+            return self.decision(demand, self.facilities[-1], True, 1.0, None)
 
         # finding nearest Facility.
-        distances = {x: x.calculate_distance(demand, metric=self.parameter['metric']) for x in self.facilities}
-        Logger.debug(f"Distance: {distances}")
-
-        facility, distance = min(distances.items(), key=lambda item: item[1])
-        Logger.debug(f"Min: [{facility.facilityID}] -> {distance=}")
+        key, distance = self.index.nearest(demand.location)
+        facility = self.facilities[key]
+        Logger.debug("Min: [%s] -> distance=%s", facility.facilityID, distance)
 
         # calculating probability.
-        probability = self.parameter['probability'] * (distance / self.parameter['openingCosts'])
-        probability = np.around(probability, decimals=3)
-        probability = np.min([probability, 1])
-        Logger.debug(f"Probability: {probability}")
+        probability = opening_probability(distance, self.parameter)
+        Logger.debug("Probability: %s", probability)
 
         # flipping the coin and assigning Demand.
         if self.flip_coin(probability):
             self.open_facility(demand, self.parameter['openingCosts'])
+            facility = self.facilities[-1]
 
         else:
-            self.assign_facility(facility, demand)
+            self.assign_facility(facility, demand, distance)
         
         # updating costs.
         costs = self.calculate_costs()
-        Logger.debug(F"Current costs: {costs['current']}")
+        Logger.debug("Current costs: %s", costs['current'])
+
+        return self.decision(demand, facility, self.coin_flip, probability, distance)
+
+    def meyerson_batch(self, demands: list[Demand]) -> list[dict]:
+        """ Method to run an ordered sequence of Demands through the Meyerson algorithm.
+
+        Args:
+            demands (list[Demand]): Demand instances in arrival order.
+
+        Returns:
+            list[dict]: Decision for each Demand.
+        """
+        decisions = []
+        for demand in demands:
+            checkpoint()
+            decisions.append(self.meyerson_algorithm(demand))
+        return decisions
+
+    def decision(self, demand: Demand, facility: Facility, opened: bool, probability: float, distance: float) -> dict:
+        """ Method to summarize the Meyerson decision for a single Demand.
+
+        Args:
+            demand (Demand): Demand instance.
+            facility (Facility): Facility the Demand was opened at or assigned to.
+            opened (bool): True if a new Facility was opened.
+            probability (float): Probability of opening a new Facility.
+            distance (float): Distance to the nearest Facility before the decision.
+
+        Returns:
+            dict: Decision for the Demand.
+        """
+        return {
+            'demandID': demand.demandID,
+            'facilityID': facility.facilityID,
+            'opened': opened,
+            'coin': self.coin_flip,
+            'probability': float(probability),
+            'distance': None if distance is None else float(distance)
+        }
 
     def current_instance(self) -> dict:
         return {
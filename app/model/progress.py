@@ -0,0 +1,78 @@
+""" File for the cooperative Solver Progress (job progress, cancellation and deadlines) """
+
+import time
+import contextvars
+from contextlib import contextmanager
+
+
+""" Classes """
+
+class Cancelled(BaseException):
+    """ Raised from report() once the job of the current context is cancelled.
+
+    Like asyncio.CancelledError it is no Exception, so the solve functions do not
+    turn a cancellation into an error response.
+    """
+
+class TimedOut(Cancelled):
+    """ Raised from checkpoint() once the deadline of the current context has passed. """
+
+
+""" Progress """
+
+# progress callback of the current context, None outside of a job.
+PROGRESS = contextvars.ContextVar('PROGRESS', default=None)
+# wall-clock deadline (time.time()) of the current context, None without a timeout.
+DEADLINE = contextvars.ContextVar('DEADLINE', default=None)
+
+def checkpoint() -> None:
+    """ Function marking a point where the solver may stop (no-op without a deadline).
+
+    Raises:
+        TimedOut: if the deadline of the current context has passed.
+    """
+    deadline = DEADLINE.get()
+    if deadline is not None and time.time() > deadline:
+        raise TimedOut()
+
+def report(iteration: int, cost: float) -> None:
+    """ Function to report a finished solver round (no-op outside of a job).
+
+    This is the cooperative cancellation point: it checks the deadline and the
+    callback raises Cancelled between two rounds if the job was cancelled.
+
+    Args:
+        iteration (int): Finished round.
+        cost (float): Costs after the round.
+    """
+    checkpoint()
+    callback = PROGRESS.get()
+    if callback is not None:
+        callback(iteration, float(cost))
+
+@contextmanager
+def tracking(callback):
+    """ Context manager routing the reports of the enclosed solver calls to a callback.
+
+    Args:
+        callback (callable): Called with (iteration, cost), may raise Cancelled.
+    """
+    token = PROGRESS.set(callback)
+    try:
+        yield
+    finally:
+        PROGRESS.reset(token)
+
+@contextmanager
+def until(deadline: float):
+    """ Context manager stopping the enclosed solver calls at their next checkpoint after a deadline.
+
+    Args:
+        deadline (float): Wall-clock deadline (time.time()).
+    """
+    token = DEADLINE.set(deadline)
+    try:
+        checkpoint()
+        yield
+    finally:
+        DEADLINE.reset(token)
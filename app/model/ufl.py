@@ -0,0 +1,331 @@
+""" File for the Uncapacitated Facility Location Engine (greedy opening and local search) """
+
+import numpy as np
+
+from app.model.counters import count
+from app.model.progress import report, checkpoint
+from app.model.distance import pairwise_distances
+from app.config.logging_config import create_logger
+from app.config.settings import DISTANCE_MEMORY
+
+
+""" Logger Function """
+
+Logger = create_logger()
+Logger.info("Logger initialized.")
+
+
+""" Constants """
+
+CANDIDATES = ('facilities', 'demands')
+# rows of a distance tile (at most).
+BLOCK_ROWS = 2048
+# (rows, M) temporaries per tile of the gain computations, incl. a recomputed tile.
+BLOCK_BUFFERS = 3
+# relative cost improvement a move needs to be applied.
+MIN_IMPROVEMENT = 1e-9
+
+
+""" Candidate Functions """
+
+def candidate_sites(points: np.ndarray, centers: np.ndarray, opening_costs: np.ndarray, parameter: dict) -> tuple[np.ndarray, np.ndarray]:
+    """ Function to collect the candidate sites of an instance.
+
+    With parameter['candidates'] == 'demands' every Demand location is a candidate
+    as well, opening at parameter['openingCosts'].
+
+    Args:
+        points (np.ndarray): (N, 2) array of Demand locations.
+        centers (np.ndarray): (K, 2) array of the requested Facility locations.
+        opening_costs (np.ndarray): (K,) opening costs of the requested Facilities.
+        parameter (dict): Config for the Facility Location Problem.
+
+    Returns:
+        tuple[np.ndarray, np.ndarray]: (M, 2) candidate locations and (M,) opening costs, requested Facilities first.
+    """
+    candidates = parameter.get('candidates', 'facilities')
+    if candidates not in CANDIDATES:
+        Logger.warning(f"Could not match candidates [{candidates}]")
+
+    if candidates != 'demands':
+        return centers, opening_costs
+
+    if parameter.get('openingCosts') is None:
+        raise ValueError("Demand candidates need parameter openingCosts")
+    return np.concatenate([centers, points]), np.concatenate([opening_costs, np.full(points.shape[0], float(parameter['openingCosts']))])
+
+
+""" Local Search Engine """
+
+class LocalSearchEngine:
+    """ Uncapacitated Facility Location solver on cached tiles of the Demand x candidate distances.
+
+    A greedy pass opens the candidate with the largest saving until no opening pays
+    off, then a best-improvement local search applies add, drop or swap moves. All
+    gains of a round come from one pass over the distance tiles using the nearest
+    and second nearest open candidate of every Demand.
+
+    The engine stays within the memory budget: the cached tiles may take half of it,
+    the tile temporaries and the swap savings a quarter each. The tiles are computed
+    on first use, the ones beyond the cache are recomputed on every pass. Rounds
+    whose swap savings do not fit only try add and drop moves.
+    """
+    def __init__(self, points: np.ndarray, sites: np.ndarray, opening_costs: np.ndarray, metric: str = 'euclidean', block_size: int = BLOCK_ROWS, budget: int = DISTANCE_MEMORY):
+        self.points = np.ascontiguousarray(points, dtype=np.float64).reshape(-1, 2)
+        self.sites = np.ascontiguousarray(sites, dtype=np.float64).reshape(-1, 2)
+        self.opening_costs = np.asarray(opening_costs, dtype=np.float64).reshape(-1)
+        self.metric = metric
+        self.budget = budget
+
+        n, m = self.points.shape[0], self.sites.shape[0]
+        if n > 0 and m == 0:
+            raise ValueError("Facility Location needs at least one candidate site")
+        self.block_size = max(1, min(block_size, budget // (4 * BLOCK_BUFFERS * 8 * max(m, 1))))
+
+        # the leading tiles that fit into half of the budget stay cached.
+        self.bounds = [(start, min(start + self.block_size, n)) for start in range(0, n, self.block_size)]
+        self.cached = min(len(self.bounds), (budget // 2) // (self.block_size * max(m, 1) * 8))
+        self.tiles = [None] * self.cached
+        self.cached_bytes = 0
+
+        # open candidates and the nearest / second nearest open candidate per Demand.
+        self.open = np.zeros(m, dtype=bool)
+        self.labels = np.zeros(n, dtype=np.intp)
+        self.nearest = np.full(n, np.inf)
+        self.second = np.full(n, np.inf)
+
+        # telemetry of the last run.
+        self.iterations = 0
+        self.trace = []
+        self.cost = 0.0 if n == 0 else np.inf
+        self.peak = 0
+
+    def tile(self, i: int) -> np.ndarray:
+        """ Method to return a tile of the distances, computed on first use.
+
+        Args:
+            i (int): Tile index, see self.bounds.
+
+        Returns:
+            np.ndarray: (rows, M) distances of the tile's Demands to the candidates.
+        """
+        if i < self.cached and self.tiles[i] is not None:
+            return self.tiles[i]
+
+        checkpoint()
+        start, stop = self.bounds[i]
+        tile = pairwise_distances(self.points[start:stop], self.sites, self.metric)
+        if i < self.cached:
+            self.tiles[i] = tile
+            self.cached_bytes += tile.nbytes
+        return tile
+
+    def distance_matrix(self) -> np.ndarray:
+        """ Method to assemble the full (N, M) distance matrix from the tiles (e.g. for checks).
+
+        Returns:
+            np.ndarray: (N, M) distances of the Demands to the candidates.
+        """
+        tiles = [self.tile(i) for i in range(len(self.bounds))]
+        return np.concatenate(tiles) if tiles else np.empty((0, self.sites.shape[0]), dtype=np.float64)
+
+    def connect(self) -> float:
+        """ Method to connect every Demand to its nearest open candidate.
+
+        Returns:
+            float: costs of the open candidates and connections.
+        """
+        n = self.points.shape[0]
+        columns = np.flatnonzero(self.open)
+
+        if columns.shape[0] > 1:
+            # one tile at a time, the open columns are copied per tile.
+            for i, (start, stop) in enumerate(self.bounds):
+                block = self.tile(i)[:, columns]
+                rows = np.arange(block.shape[0])
+                pair = np.argpartition(block, 1, axis=1)[:, :2]
+                first, second = block[rows, pair[:, 0]], block[rows, pair[:, 1]]
+                swap = second < first
+                pair[swap] = pair[swap][:, ::-1]
+                self.labels[start:stop] = columns[pair[:, 0]]
+                self.nearest[start:stop], self.second[start:stop] = np.minimum(first, second), np.maximum(first, second)
+        else:
+            self.labels = np.full(n, columns[0] if columns.shape[0] else 0, dtype=np.intp)
+            self.nearest = np.full(n, np.inf)
+            self.second = np.full(n, np.inf)
+            if columns.shape[0]:
+                for i, (start, stop) in enumerate(self.bounds):
+                    self.nearest[start:stop] = self.tile(i)[:, columns[0]]
+
+        self.cost = float(np.sum(self.opening_costs[self.open]) + np.sum(self.nearest))
+        return self.cost
+
+    def gains(self, swaps: bool = True) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """ Method to compute the cost savings of all add, drop and swap moves.
+
+        Closing candidate r and opening candidate i changes the connection costs of a
+        Demand j to min(d_ij, c1_j) or, if j is connected to r, to min(d_ij, c2_j).
+        The swap savings are therefore the add savings of i plus f_r minus the extra
+        costs of the Demands of r, which are summed per open candidate in Demand
+        order sorted by label.
+
+        Args:
+            swaps (bool, optional): Compute the swap savings. Defaults to True.
+
+        Returns:
+            tuple[np.ndarray, np.ndarray, np.ndarray]: (M,) add savings, (M,) drop savings and
+                                                       (K, M) swap savings for the K open candidates
+                                                       (None if they exceed their share of the budget).
+        """
+        m = self.sites.shape[0]
+        columns = np.flatnonzero(self.open)
+        swaps = swaps and 2 * columns.shape[0] * m * 8 <= self.budget // 4
+        position = np.zeros(m, dtype=np.intp)
+        position[columns] = np.arange(columns.shape[0])
+
+        added = np.zeros(m, dtype=np.float64)
+        extra = np.zeros((columns.shape[0], m), dtype=np.float64) if swaps else None
+
+        # one pass over the tiles, the Demands of a tile sorted by their open candidate.
+        for i, (start, stop) in enumerate(self.bounds):
+            order = start + np.argsort(self.labels[start:stop], kind='stable')
+            block = self.tile(i)[order - start]
+            nearest, second = self.nearest[order, np.newaxis], self.second[order, np.newaxis]
+            added += np.sum(np.maximum(nearest - block, 0), axis=0)
+
+            if swaps:
+                labels = position[self.labels[order]]
+                starts = np.flatnonzero(np.concatenate([[True], labels[1:] != labels[:-1]]))
+                extra[labels[starts]] += np.add.reduceat(np.minimum(block, second) - np.minimum(block, nearest), starts, axis=0)
+
+        add = np.where(self.open, -np.inf, added - self.opening_costs)
+
+        # closing the last open candidate disconnects the Demands (second == inf).
+        lost = np.bincount(self.labels, weights=self.second - self.nearest, minlength=m)
+        drop = np.where(self.open, self.opening_costs - lost, -np.inf)
+
+        swap = None
+        if swaps:
+            swap = added[np.newaxis, :] - self.opening_costs[np.newaxis, :] + self.opening_costs[columns, np.newaxis] - extra
+            swap[:, self.open] = -np.inf
+
+        # the cached tiles, the temporaries of one tile and the swap savings.
+        rows = min(self.block_size, self.points.shape[0])
+        self.peak = max(self.peak, self.cached_bytes + BLOCK_BUFFERS * rows * m * 8 + (2 * extra.nbytes if swaps else 0))
+        return add, drop, swap
+
+    def memory(self) -> dict:
+        """ Method to report the memory of the engine.
+
+        Returns:
+            dict: budget, rows per tile, number of (cached) tiles and the peak bytes of the cached tiles and the gain computations.
+        """
+        return {'budgetBytes': self.budget, 'tileRows': self.block_size, 'tiles': len(self.bounds),
+                'cachedTiles': self.cached, 'peakBytes': self.peak}
+
+    def greedy(self) -> float:
+        """ Method to open candidates greedily by their saving.
+
+        Returns:
+            float: costs after the greedy pass.
+        """
+        if self.points.shape[0] == 0:
+            return self.cost
+
+        # opening the single best candidate.
+        self.open[:] = False
+        totals = sum(np.sum(self.tile(i), axis=0) for i in range(len(self.bounds)))
+        self.open[np.argmin(self.opening_costs + totals)] = True
+        self.connect()
+
+        while not self.open.all():
+            add, _, _ = self.gains(swaps=False)
+            best = int(np.argmax(add))
+            if add[best] <= MIN_IMPROVEMENT * self.cost:
+                break
+            self.open[best] = True
+            self.connect()
+            report(0, self.cost)
+
+        Logger.debug("Greedy opened [%s] candidates: costs=%s", int(self.open.sum()), self.cost)
+        return self.cost
+
+    def run(self, iterations: int, tolerance: float = None) -> list[float]:
+        """ Method to run the greedy opening and the local search until no move improves or the move cap.
+
+        Args:
+            iterations (int): Maximum number of local search moves.
+            tolerance (float, optional): Minimum saving of a move. Defaults to None.
+
+        Returns:
+            list[float]: Costs after the greedy pass and after each move.
+        """
+        self.trace = [self.greedy()]
+        if self.points.shape[0] == 0:
+            self.iterations = 0
+            return self.trace
+
+        for i in range(1, iterations + 1):
+            add, drop, swap = self.gains()
+            moves = [np.max(add), np.max(drop), -np.inf if swap is None else np.max(swap, initial=-np.inf)]
+            best = int(np.argmax(moves))
+            threshold = max(tolerance or 0.0, MIN_IMPROVEMENT * self.cost)
+            if moves[best] <= threshold:
+                Logger.debug("Local search converged after [%s] moves", i - 1)
+                break
+
+            # applying the best move.
+            match best:
+                case 0:
+                    self.open[np.argmax(add)] = True
+                case 1:
+                    self.open[np.argmax(drop)] = False
+                case 2:
+                    closed, opened = np.unravel_index(np.argmax(swap), swap.shape)
+                    self.open[np.flatnonzero(self.open)[closed]] = False
+                    self.open[opened] = True
+
+            self.trace.append(self.connect())
+            report(i, self.cost)
+            Logger.debug("Move %s [%s]: costs=%s", i, ('add', 'drop', 'swap')[best], self.cost)
+
+        self.iterations = len(self.trace) - 1
+        count('iterations', self.iterations)
+        return self.trace
+
+
+""" Solver Functions """
+
+def locate_instance(points: np.ndarray, centers: np.ndarray, opening_costs: np.ndarray, parameter: dict) -> LocalSearchEngine:
+    """ Function to choose the open Facilities of an instance (parameter['engine'] == 'ufl').
+
+    Args:
+        points (np.ndarray): (N, 2) array of Demand locations.
+        centers (np.ndarray): (K, 2) array of the requested Facility locations.
+        opening_costs (np.ndarray): (K,) opening costs of the requested Facilities.
+        parameter (dict): Config for the Facility Location Problem.
+
+    Returns:
+        LocalSearchEngine: engine holding the open candidates, labels, telemetry and costs.
+    """
+    sites, costs = candidate_sites(points, centers, opening_costs, parameter)
+    engine = LocalSearchEngine(points, sites, costs, metric=parameter['metric'])
+    engine.run(int(parameter['iterations']), tolerance=parameter.get('tolerance'))
+    return engine
+
+def site_ids(facility_ids: np.ndarray, opened: np.ndarray) -> np.ndarray:
+    """ Function to number the open candidates, requested Facilities keep their IDs.
+
+    Args:
+        facility_ids (np.ndarray): (K,) IDs of the requested Facilities.
+        opened (np.ndarray): (M,) boolean mask of the open candidates.
+
+    Returns:
+        np.ndarray: IDs of the open candidates (new ones continue after the largest requested ID).
+    """
+    k = facility_ids.shape[0]
+    first = int(facility_ids.max()) + 1 if k > 0 else 0
+    sites = np.flatnonzero(opened)
+    ids = first + sites - k
+    ids[sites < k] = facility_ids[sites[sites < k]]
+    return ids
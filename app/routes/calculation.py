@@ -1,13 +1,27 @@
 """ Router for calculation Endpoints """
 
-from fastapi import APIRouter
+import json
+import asyncio
+from typing import Literal
+from functools import partial
+from fastapi import APIRouter, Request, Response
+from fastapi.concurrency import run_in_threadpool
+from fastapi.exceptions import RequestValidationError
+from pydantic import ValidationError
+from concurrent.futures.process import BrokenProcessPool
 
-from app.model.model import Demand, Facility
-from app.model.online_facility import OnlineFacilitySolver
-from app.model.offline_facility import OfflineFacilitySolver
+from app.model.offline_facility import is_deterministic, restart_seeds
+from app.services.execution import solver_pool
+from app.services.cache import offline_cache
+from app.services.encoding import ColumnarRequest, JSON_TYPE, negotiate, read_model, read_columnar, encoding_body
+from app.services.encoding import NumpyJSONResponse, dataset_request, dataset_size, dataset_error
+from app.services.metrics import phase, collect_phases, record_phases, record_instance, current_phases
+from app.services.profiling import profile_call, store_profile
+from app.services.solvers import solve_online, solve_offline, solve_online_columnar, solve_offline_columnar, solve_online_batch, solve_online_ensemble, solve_restart
 
 from app.config.logging_config import create_logger
-from app.validation.messages import OnlineFacility, OfflineFacility
+from app.config.settings import PROFILING, PROFILE_TOP
+from app.validation.messages import OnlineFacility, OfflineFacility, OnlineBatch, OnlineEnsemble, OnlineColumnar, OfflineColumnar
 from app.validation.messages import DataResponse, ErrorResponse
 
 
@@ -17,125 +31,321 @@ Logger = create_logger()
 Logger.info("=> Logging initialized.")
 
 
+""" Constants """
+
+NDJSON_TYPES = ('application/x-ndjson', 'application/jsonl')
+
+
+""" Solver Pool """
+
+async def run_pool(function, *args, profile: str = "off") -> tuple:
+    """ Function to run a function on the solver pool, collecting its phase timings and profile.
+
+    Args:
+        function (callable): Module-level function.
+        *args: Arguments of the function.
+        profile (str, optional): Profiling mode ('off', 'inline' or 'store'). Defaults to 'off'.
+
+    Returns:
+        tuple: result, phase timings, profile report and raw profile (None unless profiled).
+    """
+    if profile == 'off':
+        result, phases = await solver_pool.run(collect_phases, function, *args)
+        return result, phases, None, None
+
+    (result, phases), report, raw = await solver_pool.run(partial(profile_call, top=PROFILE_TOP), collect_phases, function, *args)
+    return result, phases, report, raw
+
+async def run_solver(function, data, log_lvl: str = "info", encoding: str = JSON_TYPE, profile: str = "off", seeds: list = None) -> Response | ErrorResponse:
+    """ Function to run a solve function on the solver pool with the per-request timeout.
+
+    Successful results (dicts) are rendered directly, skipping the re-validation
+    against DataResponse and the jsonable_encoder pass. The phase timings of the
+    worker are merged into the request metrics. With seeds, one seeded restart per
+    seed runs concurrently on the pool (see solve_restart) and the cheapest is kept.
+
+    Args:
+        function (callable): Module-level solve function taking (data, log_lvl).
+        data (BaseModel): Validated request data.
+        log_lvl (str, optional): Logger Level. Defaults to 'info'.
+        encoding (str, optional): Media type of encoded (bytes) results. Defaults to JSON_TYPE.
+        profile (str, optional): Profiling mode ('off', 'inline' or 'store'). Defaults to 'off'.
+        seeds (list, optional): Seeds of the restarts (see restart_seeds). Defaults to None.
+
+    Returns:
+        Response | ErrorResponse: Rendered result of the solve function.
+    """
+    try:
+        if seeds is None:
+            result, phases, report, raw = await run_pool(function, data, log_lvl, profile=profile)
+            record_phases(phases)
+        else:
+            runs = await asyncio.gather(*(run_pool(solve_restart, function, data, log_lvl, seed, profile=profile) for seed in seeds))
+            for _, phases, _, _ in runs:
+                record_phases(phases)
+            (result, costs), phases, report, raw = min(runs, key=lambda run: run[0][1])
+            Logger.info(f"Kept the cheapest of [{len(runs)}] restarts with costs [{costs}]")
+
+    except asyncio.TimeoutError:
+        Logger.warning(f"Solver timed out after [{solver_pool.timeout}]s")
+        return solver_error(f"Solver timed out after [{solver_pool.timeout}]s", 504)
+
+    except BrokenProcessPool as e:
+        Logger.warning(f"Solver worker failed: {e}")
+        return solver_error(f"Solver worker failed: {e}", 500)
+
+    if not isinstance(result, dict | bytes):
+        return result
+
+    # storing the profile and attaching it to JSON results on request.
+    headers = {}
+    if profile != 'off':
+        report['phases'] = current_phases()
+        headers['X-Profile-ID'] = store_profile(report, raw)
+        if profile == 'inline' and isinstance(result, dict):
+            result = {**result, 'profile': {'profileID': headers['X-Profile-ID'], **report}}
+
+    with phase('serialization'):
+        if isinstance(result, bytes):
+            return Response(content=result, media_type=encoding, headers=headers)
+        return NumpyJSONResponse(result, headers=headers)
+
+def solver_error(msg: str, code: int) -> Response:
+    """ Function to render a failure of the solver pool with its code as the HTTP status, so proxies and clients see it. """
+    return NumpyJSONResponse(ErrorResponse(msg=msg, code=code).model_dump(), status_code=code)
+
+def profiling_error(profile: str) -> ErrorResponse | None:
+    """ Function to reject profiled requests unless profiling is enabled (PROFILING). """
+    if profile != 'off' and not PROFILING:
+        Logger.warning("Rejected profiled request, profiling is disabled")
+        return ErrorResponse(msg="Profiling is disabled, see the PROFILING setting.", code=403)
+    return None
+
+
 """ API """
 
 router = APIRouter(tags=['calculation'])
 
-@router.post("/online_facility_location", response_model=DataResponse | ErrorResponse)
-def online_facility_location(data: OnlineFacility, log_lvl: str = "info") -> DataResponse | ErrorResponse:
+@router.post(
+    "/online_facility_location",
+    response_model=DataResponse | ErrorResponse,
+    openapi_extra=encoding_body(OnlineFacility, OnlineColumnar)
+)
+async def online_facility_location(request: Request, log_lvl: str = "info", profile: Literal['off', 'inline', 'store'] = "off") -> DataResponse | ErrorResponse:
     """ Endpoint for the online facility location problem.
 
     args:
-        data (OnlineFacility): BaseModel containing the needed data.
+        request (Request): OnlineFacility (JSON), OnlineColumnar (columnar JSON) or .npz body.
         log_lvl (str, optional): Logger Level. Defaults to 'info'.
+        profile (str, optional): Profile the solve and attach ('inline') or only store ('store') the report. Defaults to 'off'.
 
     Returns:
-        DataResponse: Dict containing msg, code and data.
+        DataResponse: Dict containing msg, code and data (encoded as negotiated via Accept).
     """
     Logger.setLevel(log_lvl.upper())
     Logger.info(f"{'='*10} Received new Online Facility Location Task {'='*10} ")
+    error = profiling_error(profile)
+    if error is not None:
+        return error
 
-    # initializing classes.
-    try:
-        demand = Demand().from_request(data.demand)
-        demands = [Demand().from_request(x) for x in data.demands]
-        facilities = [Facility().from_request(x, demands) for x in data.facilities]
-        Logger.info("Initialized Classes")
-
-    except Exception as e:
-        Logger.warning(f"Could not initialize Classes: {e}")
-        return ErrorResponse(msg=f"Could not initialize Classes: {e}")
-    
-    # initializing solver.
-    try:
-        solver = OnlineFacilitySolver(
-            demands=demands,
-            facilities=facilities,
-            parameter=data.parameter,
-            log_lvl=log_lvl
-        )
-        Logger.debug(f"{solver=}")
-        Logger.info("Initialized Solver")
-
-    except Exception as e:
-        Logger.warning(f"Could not initialize Solver: {e}")
-        return ErrorResponse(msg=f"Could not initialize Solver: {e}")
+    content, encoding = negotiate(request)
+    if content == JSON_TYPE and encoding == JSON_TYPE:
+        with phase('parse'):
+            data = await read_model(request, OnlineFacility)
+        if data.dataset is None:
+            record_instance(len(data.demands) + 1, len(data.facilities))
+            return await run_solver(solve_online, data, log_lvl, profile=profile)
+        data = dataset_request(data, encoding)
 
+    else:
+        with phase('parse'):
+            data = await read_columnar(request, content, encoding, OnlineFacility, OnlineColumnar)
 
-    # running Meyerson algorithm.
-    try:
-        solver.calculate_costs()
-        solver.meyerson_algorithm(demand)
-        result = solver.current_instance()
-        result.pop('parameter')
-        Logger.critical(f"{result=}")
-        Logger.info("Meyerson Solver completed")
-
-    except Exception as e:
-        Logger.warning(f"Could not run Meyerson algorithm: {e}")
-        return ErrorResponse(msg=f"Could not run Meyerson algorithm: {e}")
-
-    return {
-        "msg": "/online_facility_location successful.",
-        "code": 200,
-        "data": result
-    }
+    demands = dataset_size(data)
+    if demands is None:
+        return dataset_error(data.dataset)
+    record_instance(demands + 1, data.instance.facility_ids.shape[0])
+    return await run_solver(solve_online_columnar, data, log_lvl, encoding, profile)
 
-@router.post("/offline_facility_location", response_model=DataResponse | ErrorResponse)
-def offline_facility_location(data: OfflineFacility, log_lvl: str = "info") -> DataResponse | ErrorResponse:
+@router.post(
+    "/offline_facility_location",
+    response_model=DataResponse | ErrorResponse,
+    openapi_extra=encoding_body(OfflineFacility, OfflineColumnar)
+)
+async def offline_facility_location(request: Request, log_lvl: str = "info", profile: Literal['off', 'inline', 'store'] = "off") -> DataResponse | ErrorResponse:
     """ Endpoint for the offline facility location problem.
 
     args:
-        data (OfflineFacility): BaseModel containing the needed data.
+        request (Request): OfflineFacility (JSON), OfflineColumnar (columnar JSON) or .npz body.
         log_lvl (str, optional): Logger Level. Defaults to 'info'.
+        profile (str, optional): Profile the solve and attach ('inline') or only store ('store') the report. Defaults to 'off'.
 
     Returns:
-        DataResponse: Dict containing msg, code and data.
+        DataResponse: Dict containing msg, code and data (encoded as negotiated via Accept).
     """
     Logger.setLevel(log_lvl.upper())
-    Logger.info(f"{'='*10} Received new Online Facility Location Task {'='*10} ")
+    Logger.info(f"{'='*10} Received new Offline Facility Location Task {'='*10} ")
+    error = profiling_error(profile)
+    if error is not None:
+        return error
+
+    # running columnar, binary and dataset requests on the arrays (uncached).
+    content, encoding = negotiate(request)
+    if content != JSON_TYPE or encoding != JSON_TYPE:
+        with phase('parse'):
+            data = await read_columnar(request, content, encoding, OfflineFacility, OfflineColumnar)
+        return await run_offline_columnar(data, log_lvl, encoding, profile)
+
+    with phase('parse'):
+        data = await read_model(request, OfflineFacility)
+    if data.dataset is not None:
+        return await run_offline_columnar(dataset_request(data, encoding), log_lvl, encoding, profile)
+    record_instance(len(data.demands), len(data.facilities))
+
+    # serving deterministic requests from the result cache (profiled requests always solve),
+    # the key hashes the whole canonical payload and is computed off the event loop.
+    key = None
+    if is_deterministic(data.parameter.model_dump()) and profile == 'off':
+        key = await run_in_threadpool(offline_cache.key, data)
+    if key is not None:
+        cached = offline_cache.get(key)
+        if cached is not None:
+            Logger.info("Served Offline Facility Location from cache")
+            return Response(content=cached, media_type="application/json", headers={'X-Cache': 'HIT'})
+
+    result = await run_solver(solve_offline, data, log_lvl, profile=profile, seeds=restarts(data.parameter.model_dump()))
+    if key is None or not isinstance(result, NumpyJSONResponse):
+        return result
+
+    offline_cache.put(key, result.body)
+    result.headers['X-Cache'] = 'MISS'
+    return result
+
+async def run_offline_columnar(data: ColumnarRequest, log_lvl: str, encoding: str, profile: str) -> Response | ErrorResponse:
+    """ Function to run a decoded offline request on the arrays. """
+    demands = dataset_size(data)
+    if demands is None:
+        return dataset_error(data.dataset)
+    record_instance(demands, data.instance.facility_ids.shape[0])
+    return await run_solver(solve_offline_columnar, data, log_lvl, encoding, profile, restarts(data.parameter))
+
+def restarts(parameter: dict) -> list | None:
+    """ Function to spawn the seeds of a request's restarts (None for a single solve). """
+    seeds = restart_seeds(parameter)
+    return seeds if len(seeds) > 1 else None
+
+@router.post(
+    "/online_facility_location/batch",
+    response_model=DataResponse | ErrorResponse,
+    openapi_extra={
+        'requestBody': {
+            'required': True,
+            'content': {
+                'application/json': {'schema': OnlineBatch.model_json_schema()},
+                'application/x-ndjson': {'schema': {'type': 'string', 'description': "One Demand per line, optional first line with 'parameter' and 'seed'."}}
+            }
+        }
+    }
+)
+async def online_facility_location_batch(request: Request, log_lvl: str = "info", profile: Literal['off', 'inline', 'store'] = "off") -> DataResponse | ErrorResponse:
+    """ Endpoint for replaying many online arrivals through one Meyerson solver.
+
+    args:
+        request (Request): JSON body (OnlineBatch) or NDJSON stream of demands.
+        log_lvl (str, optional): Logger Level. Defaults to 'info'.
+        profile (str, optional): Profile the solve and attach ('inline') or only store ('store') the report. Defaults to 'off'.
+
+    Returns:
+        DataResponse: Dict containing msg, code and data incl. the decision per arrival.
+    """
+    Logger.setLevel(log_lvl.upper())
+    Logger.info(f"{'='*10} Received new Online Facility Location Batch {'='*10} ")
+    error = profiling_error(profile)
+    if error is not None:
+        return error
+
+    with phase('parse'):
+        data = await read_online_batch(request)
+    record_instance(len(data.demands), 0)
+    return await run_solver(solve_online_batch, data, log_lvl, profile=profile)
+
+async def read_online_batch(request: Request) -> OnlineBatch:
+    """ Function to read an OnlineBatch from a JSON body or an NDJSON stream.
+
+    The NDJSON stream holds one demand per line. A line containing 'parameter'
+    and/or 'seed' is read as the solver config instead.
+
+    Args:
+        request (Request): Incoming request.
+
+    Returns:
+        OnlineBatch: validated batch.
+    """
+    content_type = request.headers.get('content-type', '').split(';')[0].strip()
 
-    # initializing classes.
-    try:
-        demands = [Demand().from_request(x) for x in data.demands]
-        facilities = [Facility().from_request(x, demands) for x in data.facilities]
-        Logger.info("Initialized Classes")
-
-    except Exception as e:
-        Logger.warning(f"Could not initialize Classes: {e}")
-        return ErrorResponse(msg=f"Could not initialize Classes: {e}")
-    
-    # initializing solver.
     try:
-        solver = OfflineFacilitySolver(
-            demands=demands,
-            facilities=facilities,
-            parameter=data.parameter,
-            log_lvl=log_lvl
-        )
-        Logger.debug(f"{solver=}")
-        Logger.info("Initialized Solver")
+        if content_type not in NDJSON_TYPES:
+            return OnlineBatch.model_validate_json(await request.body())
+
+        # reading the stream line by line.
+        config, demands, buffer = {}, [], b''
+        async for chunk in request.stream():
+            buffer += chunk
+            *lines, buffer = buffer.split(b'\n')
+            for line in lines:
+                read_ndjson_line(line, config, demands)
+        read_ndjson_line(buffer, config, demands)
 
-    except Exception as e:
-        Logger.warning(f"Could not initialize Solver: {e}")
-        return ErrorResponse(msg=f"Could not initialize Solver: {e}")
+        return OnlineBatch(demands=demands, **config)
 
+    except ValidationError as e:
+        raise RequestValidationError(e.errors()) from e
+
+def read_ndjson_line(line: bytes, config: dict, demands: list[dict]) -> None:
+    """ Function to sort a single NDJSON line into the config or the demands.
+
+    Args:
+        line (bytes): Raw NDJSON line.
+        config (dict): Solver config to update.
+        demands (list[dict]): Demands to append to.
+    """
+    line = line.strip()
+    if not line:
+        return
 
-    # running Meyerson algorithm.
     try:
-        solver.calculate_costs()
-        solver.cluster_algorithm()
-        result = solver.current_instance()
-        result.pop('parameter')
-        Logger.critical(f"{result=}")
-        Logger.info("Meyerson Solver completed")
-
-    except Exception as e:
-        Logger.warning(f"Could not run Meyerson algorithm: {e}")
-        return ErrorResponse(msg=f"Could not run Clustering algorithm: {e}")
-
-    return {
-        "msg": "/offline_facility_location successful.",
-        "code": 200,
-        "data": result
-    }
+        item = json.loads(line)
+    except json.JSONDecodeError as e:
+        raise RequestValidationError([{'type': 'json_invalid', 'loc': ('body',), 'msg': f"Invalid NDJSON line: {e}", 'input': line.decode(errors='replace')}]) from e
+
+    if isinstance(item, dict) and ('parameter' in item or 'seed' in item):
+        config.update({key: item[key] for key in ('parameter', 'seed') if key in item})
+    else:
+        demands.append(item)
+
+@router.post(
+    "/online_facility_location/ensemble",
+    response_model=DataResponse | ErrorResponse,
+    openapi_extra={'requestBody': {'required': True, 'content': {'application/json': {'schema': OnlineEnsemble.model_json_schema()}}}}
+)
+async def online_facility_location_ensemble(request: Request, log_lvl: str = "info", profile: Literal['off', 'inline', 'store'] = "off") -> DataResponse | ErrorResponse:
+    """ Endpoint for replaying online arrivals under many independent seeds of the Meyerson solver.
+
+    args:
+        request (Request): JSON body (OnlineEnsemble).
+        log_lvl (str, optional): Logger Level. Defaults to 'info'.
+        profile (str, optional): Profile the solve and attach ('inline') or only store ('store') the report. Defaults to 'off'.
+
+    Returns:
+        DataResponse: Dict containing msg, code and data incl. the cost distribution and the best run.
+    """
+    Logger.setLevel(log_lvl.upper())
+    Logger.info(f"{'='*10} Received new Online Facility Location Ensemble {'='*10} ")
+    error = profiling_error(profile)
+    if error is not None:
+        return error
+
+    with phase('parse'):
+        data = await read_model(request, OnlineEnsemble)
+    record_instance(len(data.demands), len(data.facilities))
+    return await run_solver(solve_online_ensemble, data, log_lvl, profile=profile)
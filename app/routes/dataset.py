@@ -0,0 +1,114 @@
+""" Router for the stored Dataset Endpoints """
+
+from fastapi import APIRouter, Request
+from fastapi.concurrency import run_in_threadpool
+
+from app.services.datasets import datasets
+from app.services.encoding import NPZ_TYPE, JSON_TYPE, COLUMNAR_TYPE, negotiate, read_dataset
+
+from app.config.logging_config import create_logger
+from app.validation.messages import DatasetUpload, DatasetColumns
+from app.validation.messages import DataResponse, ErrorResponse
+
+
+""" Logging Function """
+
+Logger = create_logger()
+Logger.info("=> Logging initialized.")
+
+
+""" API """
+
+router = APIRouter(tags=['dataset'])
+
+@router.post(
+    "/datasets",
+    response_model=DataResponse | ErrorResponse,
+    openapi_extra={
+        'requestBody': {
+            'required': True,
+            'content': {
+                JSON_TYPE: {'schema': DatasetUpload.model_json_schema()},
+                COLUMNAR_TYPE: {'schema': DatasetColumns.model_json_schema()},
+                NPZ_TYPE: {'schema': {'type': 'string', 'format': 'binary', 'description': "Arrays named 'demands.ids', 'demands.xs' and 'demands.ys'."}}
+            }
+        }
+    }
+)
+async def create_dataset(request: Request, log_lvl: str = "info") -> DataResponse | ErrorResponse:
+    """ Endpoint to store Demand Points once for later requests (field 'dataset').
+
+    args:
+        request (Request): DatasetUpload (JSON), DatasetColumns (columnar JSON) or .npz body.
+        log_lvl (str, optional): Logger Level. Defaults to 'info'.
+
+    Returns:
+        DataResponse: Dict containing msg, code and the dataset info incl. its ID.
+    """
+    Logger.setLevel(log_lvl.upper())
+    Logger.info(f"{'='*10} Received new Dataset {'='*10} ")
+
+    # decoding and writing the arrays off the event loop.
+    content, _ = negotiate(request)
+    body = await request.body()
+    ids, points = await run_in_threadpool(read_dataset, body, content)
+
+    try:
+        datasetID = await run_in_threadpool(datasets.create, ids, points)
+
+    except OSError as e:
+        Logger.warning(f"Could not store dataset: {e}")
+        return ErrorResponse(msg=f"Could not store dataset: {e}", code=500)
+
+    return {
+        "msg": "/datasets successful.",
+        "code": 200,
+        "data": datasets.info(datasetID)
+    }
+
+@router.get("/datasets/{datasetID}", response_model=DataResponse | ErrorResponse)
+def get_dataset(datasetID: str, log_lvl: str = "info") -> DataResponse | ErrorResponse:
+    """ Endpoint to describe a stored dataset.
+
+    args:
+        datasetID (str): Dataset ID from /datasets.
+        log_lvl (str, optional): Logger Level. Defaults to 'info'.
+
+    Returns:
+        DataResponse: Dict containing msg, code and the dataset info.
+    """
+    Logger.setLevel(log_lvl.upper())
+
+    info = datasets.info(datasetID)
+    if info is None:
+        Logger.warning(f"Could not find dataset [{datasetID}]")
+        return ErrorResponse(msg=f"Could not find dataset [{datasetID}]", code=404)
+
+    return {
+        "msg": "/datasets successful.",
+        "code": 200,
+        "data": info
+    }
+
+@router.delete("/datasets/{datasetID}", response_model=DataResponse | ErrorResponse)
+def delete_dataset(datasetID: str, log_lvl: str = "info") -> DataResponse | ErrorResponse:
+    """ Endpoint to delete a stored dataset.
+
+    args:
+        datasetID (str): Dataset ID from /datasets.
+        log_lvl (str, optional): Logger Level. Defaults to 'info'.
+
+    Returns:
+        DataResponse: Dict containing msg, code and the dataset ID.
+    """
+    Logger.setLevel(log_lvl.upper())
+
+    if not datasets.delete(datasetID):
+        Logger.warning(f"Could not find dataset [{datasetID}]")
+        return ErrorResponse(msg=f"Could not find dataset [{datasetID}]", code=404)
+
+    return {
+        "msg": "/datasets successful.",
+        "code": 200,
+        "data": {'datasetID': datasetID}
+    }
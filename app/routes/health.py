@@ -1,10 +1,16 @@
 """ Router for default Endpoints """
 
+import time
 from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
 
 from app.config.logging_config import create_logger
 from app.validation.messages import MessageResponse
 from app.config.documentation import APP_VERSION
+from app.services import metrics
+from app.services.execution import solver_pool
+from app.services.cache import offline_cache
+from app.services.sessions import sessions
 
 """ Logging Function """
 
@@ -12,6 +18,11 @@ Logger = create_logger()
 Logger.info("=> Logging initialized.")
 
 
+""" Constants """
+
+STARTED = time.monotonic()
+
+
 """ API """
 
 router = APIRouter(tags=['health'])
@@ -60,3 +71,44 @@ def get_versions(log_lvl = "info") -> MessageResponse:
             'version': APP_VERSION
         }
     }
+
+@router.get("/health", response_model=MessageResponse)
+def get_health() -> MessageResponse:
+    """ Endpoint for the container healthcheck.
+
+    Returns:
+        MessageResponse: Dict containing msg, code and the state of the solver pool, cache and sessions.
+    """
+    return {
+        'msg': "/health success.",
+        'code': 200,
+        'data': {
+            'status': "ok",
+            'version': APP_VERSION,
+            'uptime': time.monotonic() - STARTED,
+            'inFlight': metrics.IN_FLIGHT.get(),
+            'solverPool': {'processes': solver_pool.processes, 'running': solver_pool.pool is not None},
+            'cache': offline_cache.stats(),
+            'sessions': len(sessions),
+            'sockets': sessions.sockets
+        }
+    }
+
+@router.get("/metrics", response_class=PlainTextResponse)
+def get_metrics() -> PlainTextResponse:
+    """ Endpoint exposing the request and solver metrics in the Prometheus text format.
+
+    Returns:
+        PlainTextResponse: Request counts, latency, phase and instance size histograms, in-flight requests, cache and session stats.
+    """
+    cache = offline_cache.stats()
+    extra = [
+        ('result_cache_hits_total', 'counter', "Offline result cache hits.", cache['hits']),
+        ('result_cache_misses_total', 'counter', "Offline result cache misses.", cache['misses']),
+        ('result_cache_entries', 'gauge', "Offline result cache entries.", cache['entries']),
+        ('result_cache_bytes', 'gauge', "Offline result cache size in bytes.", cache['bytes']),
+        ('online_sessions', 'gauge', "Open online sessions.", len(sessions)),
+        ('online_sockets', 'gauge', "Open online sockets.", sessions.sockets),
+        ('solver_pool_processes', 'gauge', "Configured solver pool processes (0 = threads).", solver_pool.processes)
+    ]
+    return PlainTextResponse(metrics.render(extra), media_type=metrics.CONTENT_TYPE)
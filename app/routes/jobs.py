@@ -0,0 +1,109 @@
+""" Router for the asynchronous offline Job Endpoints """
+
+from fastapi import APIRouter, Request
+from fastapi.concurrency import run_in_threadpool
+
+from app.services.encoding import JSON_TYPE, NumpyJSONResponse, read_model, dataset_request, dataset_size, dataset_error
+from app.services.solvers import solve_offline_job
+from app.services.jobs import job_queue
+
+from app.config.logging_config import create_logger
+from app.validation.messages import OfflineFacility
+from app.validation.messages import DataResponse, ErrorResponse
+
+
+""" Logging Function """
+
+Logger = create_logger()
+Logger.info("=> Logging initialized.")
+
+
+""" Errors """
+
+def job_error(jobID: str) -> ErrorResponse:
+    Logger.warning(f"Could not find job [{jobID}]")
+    return ErrorResponse(msg=f"Could not find job [{jobID}]", code=404)
+
+
+""" API """
+
+router = APIRouter(tags=['jobs'])
+
+@router.post(
+    "/jobs/offline_facility_location",
+    response_model=DataResponse | ErrorResponse,
+    openapi_extra={'requestBody': {'required': True, 'content': {JSON_TYPE: {'schema': OfflineFacility.model_json_schema()}}}}
+)
+async def submit_offline_job(request: Request, log_lvl: str = "info") -> DataResponse | ErrorResponse:
+    """ Endpoint to queue an offline facility location problem and return its job ID right away.
+
+    args:
+        request (Request): OfflineFacility (JSON) body.
+        log_lvl (str, optional): Logger Level. Defaults to 'info'.
+
+    Returns:
+        DataResponse: Dict containing msg, code (202) and the job status incl. its ID.
+    """
+    Logger.setLevel(log_lvl.upper())
+    Logger.info(f"{'='*10} Received new Offline Facility Location Job {'='*10} ")
+
+    data = await read_model(request, OfflineFacility)
+    if data.dataset is not None and dataset_size(dataset_request(data, JSON_TYPE)) is None:
+        return dataset_error(data.dataset)
+
+    # the submission may start the Manager and talks to it, so it runs off the event loop.
+    job = await run_in_threadpool(job_queue.submit, solve_offline_job, data, log_lvl, iterations=data.parameter.iterations)
+    if job is None:
+        return ErrorResponse(msg=f"Job queue is full, [{job_queue.limit}] jobs are waiting.", code=429)
+
+    return {
+        "msg": "/jobs/offline_facility_location accepted.",
+        "code": 202,
+        "data": {'jobID': job.jobID, 'status': job.status}
+    }
+
+@router.get("/jobs/{jobID}", response_model=DataResponse | ErrorResponse)
+def get_job(jobID: str, log_lvl: str = "info") -> DataResponse | ErrorResponse:
+    """ Endpoint to poll the status, progress and (once completed) the result of a job.
+
+    args:
+        jobID (str): Job ID from /jobs/offline_facility_location.
+        log_lvl (str, optional): Logger Level. Defaults to 'info'.
+
+    Returns:
+        DataResponse: Dict containing msg, code and the job.
+    """
+    Logger.setLevel(log_lvl.upper())
+
+    job = job_queue.get(jobID)
+    if job is None:
+        return job_error(jobID)
+
+    return NumpyJSONResponse({
+        "msg": "/jobs successful.",
+        "code": 200,
+        "data": job.to_json()
+    })
+
+@router.delete("/jobs/{jobID}", response_model=DataResponse | ErrorResponse)
+def cancel_job(jobID: str, log_lvl: str = "info") -> DataResponse | ErrorResponse:
+    """ Endpoint to cancel a job, a running job stops after its current solver round.
+
+    args:
+        jobID (str): Job ID from /jobs/offline_facility_location.
+        log_lvl (str, optional): Logger Level. Defaults to 'info'.
+
+    Returns:
+        DataResponse: Dict containing msg, code and the job status.
+    """
+    Logger.setLevel(log_lvl.upper())
+
+    job = job_queue.cancel(jobID)
+    if job is None:
+        return job_error(jobID)
+
+    return {
+        "msg": "/jobs successful.",
+        "code": 200,
+        "data": {'jobID': job.jobID, 'status': job.status}
+    }
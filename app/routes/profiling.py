@@ -0,0 +1,58 @@
+""" Router for the stored Request Profiles """
+
+import json
+from fastapi import APIRouter, Response
+
+from app.services.profiling import PSTATS_TYPE, profiles
+
+from app.config.logging_config import create_logger
+from app.validation.messages import DataResponse, ErrorResponse
+
+
+""" Logging Function """
+
+Logger = create_logger()
+Logger.info("=> Logging initialized.")
+
+
+""" API """
+
+router = APIRouter(tags=['profiling'])
+
+@router.get("/profiles/{profileID}", response_model=DataResponse | ErrorResponse)
+def get_profile(profileID: str) -> DataResponse | ErrorResponse:
+    """ Endpoint to get a stored profile report.
+
+    args:
+        profileID (str): Profile ID from the X-Profile-ID header of a profiled request.
+
+    Returns:
+        DataResponse: Dict containing msg, code and the report.
+    """
+    report = profiles.get(profileID)
+    if report is None:
+        Logger.warning(f"Could not find profile [{profileID}]")
+        return ErrorResponse(msg=f"Could not find profile [{profileID}]", code=404)
+
+    return {
+        "msg": "/profiles successful.",
+        "code": 200,
+        "data": json.loads(report)
+    }
+
+@router.get("/profiles/{profileID}/pstats", response_model=None)
+def get_profile_stats(profileID: str) -> Response | ErrorResponse:
+    """ Endpoint to download the raw pstats dump of a stored profile (e.g. for snakeviz).
+
+    args:
+        profileID (str): Profile ID from the X-Profile-ID header of a profiled request.
+
+    Returns:
+        Response: pstats file.
+    """
+    raw = profiles.get(f"{profileID}.pstats")
+    if raw is None:
+        Logger.warning(f"Could not find profile [{profileID}]")
+        return ErrorResponse(msg=f"Could not find profile [{profileID}]", code=404)
+
+    return Response(content=raw, media_type=PSTATS_TYPE, headers={'Content-Disposition': f'attachment; filename="{profileID}.prof"'})
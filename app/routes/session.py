@@ -0,0 +1,273 @@
+""" Router for online session Endpoints """
+
+import asyncio
+from fastapi import APIRouter, WebSocket, WebSocketDisconnect
+from fastapi.concurrency import run_in_threadpool
+from fastapi.exceptions import RequestValidationError
+from pydantic import ValidationError
+
+from app.model.model import Demand, Facility
+from app.model.online_facility import OnlineFacilitySolver
+from app.services.sessions import sessions
+
+from app.config.logging_config import create_logger, log_level
+from app.validation.messages import OnlineSession, OnlineDemand, check_geo_location
+from app.validation.messages import DataResponse, ErrorResponse
+
+
+""" Logging Function """
+
+Logger = create_logger()
+Logger.info("=> Logging initialized.")
+
+
+""" Solver """
+
+def create_solver(data: OnlineSession, log_lvl: str = "info") -> OnlineFacilitySolver:
+    """ Function to initialize the solver of a session from the previous points.
+
+    Args:
+        data (OnlineSession): BaseModel containing the parameter and optional initial points.
+        log_lvl (str, optional): Logger Level. Defaults to 'info'.
+
+    Returns:
+        OnlineFacilitySolver: solver with calculated costs.
+    """
+    with log_level(log_lvl):
+        demands = [Demand().from_request(x) for x in data.demands]
+        index = {x.demandID: x for x in demands}
+        facilities = [Facility().from_request(x, index) for x in data.facilities]
+        solver = OnlineFacilitySolver(
+            demands=demands,
+            facilities=facilities,
+            parameter=data.parameter.model_dump()
+        )
+        solver.calculate_costs()
+    return solver
+
+
+""" API """
+
+router = APIRouter(tags=['session'])
+
+@router.post("/online_sessions", response_model=DataResponse | ErrorResponse)
+def create_online_session(data: OnlineSession, log_lvl: str = "info") -> DataResponse | ErrorResponse:
+    """ Endpoint to create an online facility location session.
+
+    args:
+        data (OnlineSession): BaseModel containing the parameter and optional initial points.
+        log_lvl (str, optional): Logger Level. Defaults to 'info'.
+
+    Returns:
+        DataResponse: Dict containing msg, code and the session ID.
+    """
+    Logger.setLevel(log_lvl.upper())
+    Logger.info(f"{'='*10} Received new Online Session {'='*10} ")
+
+    # initializing classes and solver.
+    try:
+        solver = create_solver(data, log_lvl)
+        Logger.info("Initialized Solver")
+
+    except Exception as e:
+        Logger.warning(f"Could not initialize Solver: {e}")
+        return ErrorResponse(msg=f"Could not initialize Solver: {e}")
+
+    session = sessions.create(solver)
+    Logger.info(f"Created session [{session.sessionID}]")
+
+    return {
+        "msg": "/online_sessions successful.",
+        "code": 200,
+        "data": {
+            'sessionID': session.sessionID,
+            'costs': dict(solver.costs)
+        }
+    }
+
+@router.post("/online_sessions/{sessionID}/demand", response_model=DataResponse | ErrorResponse)
+def online_session_demand(sessionID: str, data: OnlineDemand, log_lvl: str = "info") -> DataResponse | ErrorResponse:
+    """ Endpoint to run a single demand through the Meyerson algorithm of a session.
+
+    args:
+        sessionID (str): Session ID from /online_sessions.
+        data (OnlineDemand): BaseModel containing the new demand.
+        log_lvl (str, optional): Logger Level. Defaults to 'info'.
+
+    Returns:
+        DataResponse: Dict containing msg, code, the decision and the costs.
+    """
+    Logger.setLevel(log_lvl.upper())
+
+    session = sessions.get(sessionID)
+    if session is None:
+        Logger.warning(f"Could not find session [{sessionID}]")
+        return ErrorResponse(msg=f"Could not find session [{sessionID}]", code=404)
+
+    # checking the demand against the metric of the session.
+    try:
+        check_geo_location(data.demand.location, session.solver.parameter['metric'])
+    except ValueError as e:
+        raise RequestValidationError([{'type': 'value_error', 'loc': ('body', 'demand', 'location'), 'msg': f"Value error, {e}", 'input': data.demand.location}]) from e
+
+    # running Meyerson algorithm.
+    try:
+        demand = Demand().from_request(data.demand)
+        with session.lock:
+            decision = session.solver.meyerson_algorithm(demand)
+            costs = dict(session.solver.costs)
+
+    except Exception as e:
+        Logger.warning(f"Could not run Meyerson algorithm: {e}")
+        return ErrorResponse(msg=f"Could not run Meyerson algorithm: {e}")
+
+    return {
+        "msg": "/online_sessions/demand successful.",
+        "code": 200,
+        "data": {
+            'decision': decision,
+            'costs': costs,
+            'coin': decision['coin']
+        }
+    }
+
+@router.get("/online_sessions/{sessionID}", response_model=DataResponse | ErrorResponse)
+def get_online_session(sessionID: str, log_lvl: str = "info") -> DataResponse | ErrorResponse:
+    """ Endpoint to get the full instance of a session.
+
+    args:
+        sessionID (str): Session ID from /online_sessions.
+        log_lvl (str, optional): Logger Level. Defaults to 'info'.
+
+    Returns:
+        DataResponse: Dict containing msg, code and the current instance.
+    """
+    Logger.setLevel(log_lvl.upper())
+
+    session = sessions.get(sessionID)
+    if session is None:
+        Logger.warning(f"Could not find session [{sessionID}]")
+        return ErrorResponse(msg=f"Could not find session [{sessionID}]", code=404)
+
+    with session.lock:
+        result = session.solver.current_instance()
+        result.pop('parameter')
+
+    return {
+        "msg": "/online_sessions successful.",
+        "code": 200,
+        "data": result
+    }
+
+@router.delete("/online_sessions/{sessionID}", response_model=DataResponse | ErrorResponse)
+def delete_online_session(sessionID: str, log_lvl: str = "info") -> DataResponse | ErrorResponse:
+    """ Endpoint to close a session.
+
+    args:
+        sessionID (str): Session ID from /online_sessions.
+        log_lvl (str, optional): Logger Level. Defaults to 'info'.
+
+    Returns:
+        DataResponse: Dict containing msg, code and the session ID.
+    """
+    Logger.setLevel(log_lvl.upper())
+
+    if not sessions.delete(sessionID):
+        Logger.warning(f"Could not find session [{sessionID}]")
+        return ErrorResponse(msg=f"Could not find session [{sessionID}]", code=404)
+
+    return {
+        "msg": "/online_sessions delete successful.",
+        "code": 200,
+        "data": {
+            'sessionID': sessionID
+        }
+    }
+
+@router.websocket("/online_sessions/ws")
+async def online_session_socket(websocket: WebSocket, log_lvl: str = "info") -> None:
+    """ WebSocket keeping one online facility location solver alive per connection.
+
+    The first message is an OnlineSession (previous points and parameter) and is
+    answered with the current costs. Every further message is an OnlineDemand and
+    is answered with the decision and costs only, like /online_sessions/{sessionID}/demand.
+    Invalid messages are answered with an error (code 422) and keep the connection
+    open. The solver is dropped with the connection. Open sockets count against
+    SESSION_LIMIT (code 429 beyond it) and are closed after SESSION_TTL seconds
+    without a message.
+
+    args:
+        websocket (WebSocket): Connection of the client.
+        log_lvl (str, optional): Logger Level. Defaults to 'info'.
+    """
+    Logger.setLevel(log_lvl.upper())
+    await websocket.accept()
+    Logger.info(f"{'='*10} Received new Online Socket {'='*10} ")
+
+    if not sessions.connect():
+        Logger.warning(f"Rejected Online Socket, [{sessions.limit}] sockets are open")
+        await websocket.send_json(ErrorResponse(msg=f"Too many online sockets, [{sessions.limit}] are open.", code=429).model_dump())
+        await websocket.close(code=1013)
+        return
+
+    try:
+        # initializing the solver off the event loop (it replays the previous points).
+        try:
+            message = await asyncio.wait_for(websocket.receive_text(), sessions.ttl)
+            solver = await run_in_threadpool(create_solver, OnlineSession.model_validate_json(message), log_lvl)
+            Logger.info("Initialized Solver")
+
+        except (WebSocketDisconnect, asyncio.TimeoutError):
+            raise
+
+        except Exception as e:
+            Logger.warning(f"Could not initialize Solver: {e}")
+            await websocket.send_json(ErrorResponse(msg=f"Could not initialize Solver: {e}", code=422 if isinstance(e, ValidationError) else 400).model_dump())
+            await websocket.close(code=1008)
+            return
+
+        await websocket.send_json({
+            "msg": "/online_sessions/ws connected.",
+            "code": 200,
+            "data": {
+                'costs': dict(solver.costs)
+            }
+        })
+
+        # a single decision is a nearest-facility lookup, so it runs inline.
+        while True:
+            message = await asyncio.wait_for(websocket.receive_text(), sessions.ttl)
+            try:
+                data = OnlineDemand.model_validate_json(message, context={'metric': solver.parameter['metric']})
+
+            except ValidationError as e:
+                await websocket.send_json(ErrorResponse(msg=f"Invalid demand: {e.errors(include_url=False)}", code=422).model_dump())
+                continue
+
+            try:
+                decision = solver.meyerson_algorithm(Demand().from_request(data.demand))
+
+            except Exception as e:
+                Logger.warning(f"Could not run Meyerson algorithm: {e}")
+                await websocket.send_json(ErrorResponse(msg=f"Could not run Meyerson algorithm: {e}").model_dump())
+                continue
+
+            await websocket.send_json({
+                "msg": "/online_sessions/ws successful.",
+                "code": 200,
+                "data": {
+                    'decision': decision,
+                    'costs': dict(solver.costs),
+                    'coin': decision['coin']
+                }
+            })
+
+    except WebSocketDisconnect:
+        Logger.info("Closed Online Socket")
+
+    except asyncio.TimeoutError:
+        Logger.info(f"Closed Online Socket idle for [{sessions.ttl}]s")
+        await websocket.close(code=1001)
+
+    finally:
+        sessions.disconnect()
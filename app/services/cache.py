@@ -0,0 +1,123 @@
+""" File for the content-addressed Result Cache """
+
+import json
+import time
+import hashlib
+import threading
+from collections import OrderedDict
+from pydantic import BaseModel
+
+from app.config.logging_config import create_logger
+from app.config.settings import CACHE_ENTRIES, CACHE_BYTES, CACHE_TTL
+
+
+""" Logger Function """
+
+Logger = create_logger()
+Logger.info("Logger initialized.")
+
+
+""" Classes """
+
+class ResultCache:
+    """ LRU cache of serialized results with an entry limit, a byte-size cap and a TTL. """
+    def __init__(self, max_entries: int = 256, max_bytes: int = 64 * 1024 * 1024, ttl: float = 600.0, clock=time.monotonic):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.clock = clock
+
+        self.entries = OrderedDict()
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+        self.lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    @staticmethod
+    def key(payload: BaseModel) -> str:
+        """ Method to hash a validated payload into a canonical cache key.
+
+        Args:
+            payload (BaseModel): Validated request data.
+
+        Returns:
+            str: SHA-256 hex digest of the canonical JSON payload.
+        """
+        canonical = json.dumps(payload.model_dump(mode='json'), sort_keys=True, separators=(',', ':'))
+        return hashlib.sha256(canonical.encode()).hexdigest()
+
+    def get(self, key: str) -> bytes | None:
+        """ Method to look up a cached result.
+
+        Args:
+            key (str): Cache key.
+
+        Returns:
+            bytes | None: cached result or None on a miss.
+        """
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is not None and entry[1] <= self.clock():
+                self.drop(key)
+                entry = None
+
+            if entry is None:
+                self.misses += 1
+                return None
+
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def put(self, key: str, value: bytes) -> None:
+        """ Method to store a result and evict the least recently used ones beyond the limits.
+
+        Args:
+            key (str): Cache key.
+            value (bytes): Serialized result.
+        """
+        if len(value) > self.max_bytes:
+            Logger.info(f"Result of [{len(value)}] bytes exceeds the cache size")
+            return
+
+        with self.lock:
+            if key in self.entries:
+                self.drop(key)
+
+            self.entries[key] = (value, self.clock() + self.ttl)
+            self.size += len(value)
+
+            while len(self.entries) > self.max_entries or self.size > self.max_bytes:
+                self.drop(next(iter(self.entries)))
+
+    def drop(self, key: str) -> None:
+        """ Method to remove an entry (caller holds the lock).
+
+        Args:
+            key (str): Cache key.
+        """
+        value, _ = self.entries.pop(key)
+        self.size -= len(value)
+
+    def clear(self) -> None:
+        """ Method to remove all entries.
+        """
+        with self.lock:
+            self.entries.clear()
+            self.size = 0
+
+    def stats(self) -> dict:
+        return {
+            'entries': len(self.entries),
+            'bytes': self.size,
+            'hits': self.hits,
+            'misses': self.misses
+        }
+
+
+""" Offline Result Cache """
+
+offline_cache = ResultCache(max_entries=CACHE_ENTRIES, max_bytes=CACHE_BYTES, ttl=CACHE_TTL)
@@ -0,0 +1,197 @@
+""" File for the on-disk Dataset Store """
+
+import os
+import re
+import time
+import uuid
+import shutil
+import tempfile
+import threading
+import numpy as np
+
+from app.config.logging_config import create_logger
+from app.config.settings import DATASET_DIR, DATASET_LIMIT
+
+
+""" Logger Function """
+
+Logger = create_logger()
+Logger.info("Logger initialized.")
+
+
+""" Constants """
+
+DATASET_ID = re.compile(r'[0-9a-f]{32}')
+ARRAYS = ('ids.npy', 'points.npy')
+STAGING = '.upload-'
+# seconds after which a staging directory is left over from a failed upload.
+STAGING_AGE = 3600.0
+
+
+""" Functions """
+
+def open_arrays(path: str) -> tuple[np.ndarray, np.ndarray]:
+    """ Function to open the arrays of a dataset directory memory-mapped (read-only).
+
+    Args:
+        path (str): Dataset directory.
+
+    Raises:
+        KeyError: Missing dataset.
+
+    Returns:
+        tuple[np.ndarray, np.ndarray]: (N,) Demand IDs and (N, 2) Demand locations.
+    """
+    try:
+        return tuple(np.load(os.path.join(path, name), mmap_mode='r', allow_pickle=False) for name in ARRAYS)
+    except (TypeError, FileNotFoundError) as e:
+        raise KeyError(path) from e
+
+
+""" Classes """
+
+class DatasetStore:
+    """ Directory of uploaded Demand sets with FIFO eviction (oldest upload first).
+
+    Every dataset is a directory holding ids.npy (N,) int64 and points.npy (N, 2)
+    float64. The arrays are opened memory-mapped, so solver processes read them
+    through the OS page cache instead of copies.
+    """
+    def __init__(self, directory: str = DATASET_DIR, limit: int = DATASET_LIMIT):
+        self.directory = directory
+        self.limit = limit
+        self.lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self.datasets())
+
+    def path(self, datasetID: str) -> str | None:
+        """ Method to resolve the directory of a dataset (None for malformed IDs). """
+        if not DATASET_ID.fullmatch(datasetID):
+            return None
+        return os.path.join(self.directory, datasetID)
+
+    def datasets(self) -> list[str]:
+        """ Method to list the stored dataset IDs, oldest first.
+
+        Returns:
+            list[str]: dataset IDs.
+        """
+        try:
+            entries = [x for x in os.scandir(self.directory) if x.is_dir() and DATASET_ID.fullmatch(x.name)]
+        except FileNotFoundError:
+            return []
+        return [x.name for x in sorted(entries, key=lambda x: x.stat().st_mtime)]
+
+    def create(self, ids: np.ndarray, points: np.ndarray) -> str:
+        """ Method to store the Demand arrays under a new dataset ID.
+
+        The arrays are written to a staging directory first and renamed into place,
+        so readers never see a partial dataset.
+
+        Args:
+            ids (np.ndarray): (N,) Demand IDs.
+            points (np.ndarray): (N, 2) Demand locations.
+
+        Returns:
+            str: dataset ID.
+        """
+        os.makedirs(self.directory, exist_ok=True)
+        datasetID = uuid.uuid4().hex
+        staging = tempfile.mkdtemp(prefix=STAGING, dir=self.directory)
+
+        try:
+            np.save(os.path.join(staging, 'ids.npy'), np.ascontiguousarray(ids, dtype=np.int64).reshape(-1))
+            np.save(os.path.join(staging, 'points.npy'), np.ascontiguousarray(points, dtype=np.float64).reshape(-1, 2))
+            os.replace(staging, self.path(datasetID))
+        except Exception:
+            shutil.rmtree(staging, ignore_errors=True)
+            raise
+
+        self.evict()
+        Logger.info(f"Stored dataset [{datasetID}]")
+        return datasetID
+
+    def evict(self) -> int:
+        """ Method to drop the oldest datasets beyond the limit and stale staging directories.
+
+        Staging directories older than STAGING_AGE are left over from crashed
+        uploads, younger ones may belong to an upload in progress.
+
+        Returns:
+            int: Number of dropped datasets.
+        """
+        with self.lock:
+            stored = self.datasets()
+            dropped = stored[:max(0, len(stored) - self.limit)]
+            for datasetID in dropped:
+                shutil.rmtree(self.path(datasetID), ignore_errors=True)
+                Logger.info(f"Evicted dataset [{datasetID}]")
+
+            try:
+                staging = [x for x in os.scandir(self.directory) if x.is_dir() and x.name.startswith(STAGING)]
+            except FileNotFoundError:
+                staging = []
+            for entry in staging:
+                if time.time() - entry.stat().st_mtime > STAGING_AGE:
+                    shutil.rmtree(entry.path, ignore_errors=True)
+                    Logger.info(f"Removed stale upload [{entry.name}]")
+        return len(dropped)
+
+    def open(self, datasetID: str) -> tuple[np.ndarray, np.ndarray]:
+        """ Method to open the arrays of a dataset memory-mapped (read-only).
+
+        Args:
+            datasetID (str): Dataset ID.
+
+        Raises:
+            KeyError: Unknown dataset.
+
+        Returns:
+            tuple[np.ndarray, np.ndarray]: (N,) Demand IDs and (N, 2) Demand locations.
+        """
+        return open_arrays(self.path(datasetID))
+
+    def info(self, datasetID: str) -> dict | None:
+        """ Method to describe a dataset.
+
+        Args:
+            datasetID (str): Dataset ID.
+
+        Returns:
+            dict | None: datasetID, number of demands, bytes on disk and upload time. None if unknown.
+        """
+        try:
+            ids, _ = self.open(datasetID)
+        except KeyError:
+            return None
+
+        path = self.path(datasetID)
+        return {
+            'datasetID': datasetID,
+            'demands': int(ids.shape[0]),
+            'bytes': sum(os.path.getsize(os.path.join(path, name)) for name in ARRAYS),
+            'created': time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime(os.path.getmtime(path)))
+        }
+
+    def delete(self, datasetID: str) -> bool:
+        """ Method to delete a dataset (already opened memory maps stay readable).
+
+        Args:
+            datasetID (str): Dataset ID.
+
+        Returns:
+            bool: True if the dataset existed.
+        """
+        path = self.path(datasetID)
+        if path is None or not os.path.isdir(path):
+            return False
+
+        shutil.rmtree(path, ignore_errors=True)
+        Logger.info(f"Deleted dataset [{datasetID}]")
+        return True
+
+
+""" Dataset Store """
+
+datasets = DatasetStore()
@@ -0,0 +1,343 @@
+""" File for the columnar and binary Request/Response Encodings """
+
+import io
+import json
+import orjson
+import numpy as np
+from fastapi import Request
+from fastapi.responses import JSONResponse
+from fastapi.exceptions import RequestValidationError
+from pydantic import BaseModel, ValidationError
+
+from app.model.columnar import ColumnarInstance
+from app.services.datasets import datasets, open_arrays
+from app.config.logging_config import create_logger
+from app.validation.messages import DatasetUpload, DatasetColumns, OnlineFacility, OfflineFacility, ErrorResponse
+
+
+""" Logger Function """
+
+Logger = create_logger()
+Logger.info("Logger initialized.")
+
+
+""" Constants """
+
+JSON_TYPE = 'application/json'
+COLUMNAR_TYPE = 'application/vnd.facility.columnar+json'
+NPZ_TYPE = 'application/x-npz'
+ENCODINGS = (JSON_TYPE, COLUMNAR_TYPE, NPZ_TYPE)
+
+# arrays of an .npz body, see ColumnarInstance.to_arrays.
+NPZ_DEMANDS = ('demands.ids', 'demands.xs', 'demands.ys')
+NPZ_COLUMNS = NPZ_DEMANDS + ('facilities.ids', 'facilities.xs', 'facilities.ys')
+NPZ_OPTIONAL = ('facilities.openingCosts', 'facilities.connection', 'facilities.connectionCounts')
+
+
+""" Classes """
+
+class ColumnarRequest:
+    """ Decoded request for the array-backed solve path. """
+    def __init__(self, instance: ColumnarInstance, parameter: dict, demand: BaseModel = None, encoding: str = JSON_TYPE, dataset: str = None):
+        self.instance = instance
+        self.parameter = parameter
+        self.demand = demand
+        self.encoding = encoding
+        self.dataset = dataset
+        self.dataset_path = None if dataset is None else datasets.path(dataset)
+
+    def attach_dataset(self) -> None:
+        """ Method to open the Demands of the referenced dataset memory-mapped (in the solver process).
+
+        Only the dataset path travels to the solver pool, so the arrays are read through
+        the OS page cache instead of being copied into every request.
+
+        Raises:
+            KeyError: Unknown dataset.
+        """
+        if self.dataset is None:
+            return
+        self.instance.demand_ids, self.instance.points = open_arrays(self.dataset_path)
+
+
+""" Responses """
+
+def encode_default(value):
+    """ Fallback of NumpyJSONResponse for the types orjson does not serialize natively. """
+    if isinstance(value, BaseModel):
+        return value.model_dump(mode='json')
+    raise TypeError(f"Type [{type(value).__name__}] is not JSON serializable")
+
+class NumpyJSONResponse(JSONResponse):
+    """ JSON response rendered by orjson, serializing NumPy arrays and scalars natively. """
+    def render(self, content) -> bytes:
+        return orjson.dumps(content, default=encode_default, option=orjson.OPT_SERIALIZE_NUMPY)
+
+
+""" Negotiation """
+
+def encoding_body(model: type[BaseModel], columnar: type[BaseModel]) -> dict:
+    """ Function to document the supported request encodings of an endpoint (openapi_extra).
+
+    Args:
+        model (type[BaseModel]): Request model of the default encoding.
+        columnar (type[BaseModel]): Request model of the columnar encoding.
+
+    Returns:
+        dict: OpenAPI request body.
+    """
+    return {
+        'requestBody': {
+            'required': True,
+            'content': {
+                JSON_TYPE: {'schema': model.model_json_schema()},
+                COLUMNAR_TYPE: {'schema': columnar.model_json_schema()},
+                NPZ_TYPE: {'schema': {'type': 'string', 'format': 'binary', 'description': "Arrays of the columnar format named 'demands.ids', 'demands.xs', ..., other fields as JSON strings."}}
+            }
+        }
+    }
+
+def media_type(value: str) -> str:
+    return value.split(';')[0].strip().lower()
+
+def negotiate(request: Request) -> tuple[str, str]:
+    """ Function to pick the request and response encoding from Content-Type and Accept.
+
+    Unknown request types are read as JSON. The response uses the first supported
+    type listed in Accept and otherwise mirrors the request encoding.
+
+    Args:
+        request (Request): Incoming request.
+
+    Returns:
+        tuple[str, str]: request and response encoding.
+    """
+    content = media_type(request.headers.get('content-type', JSON_TYPE))
+    if content not in ENCODINGS:
+        content = JSON_TYPE
+
+    for accepted in request.headers.get('accept', '').split(','):
+        if media_type(accepted) in ENCODINGS:
+            return content, media_type(accepted)
+
+    return content, content
+
+
+""" Decoding """
+
+def invalid_body(msg: str, *loc: str) -> RequestValidationError:
+    return RequestValidationError([{'type': 'value_error', 'loc': ('body', *loc), 'msg': msg, 'input': None}])
+
+async def read_model(request: Request, model: type[BaseModel]) -> BaseModel:
+    """ Function to validate a JSON body in one pass.
+
+    Args:
+        request (Request): Incoming request.
+        model (type[BaseModel]): Request model.
+
+    Returns:
+        BaseModel: validated request data.
+    """
+    try:
+        return model.model_validate_json(await request.body())
+
+    except ValidationError as e:
+        raise RequestValidationError(e.errors()) from e
+
+async def read_columnar(request: Request, content: str, encoding: str, model: type[BaseModel], columnar: type[BaseModel]) -> ColumnarRequest:
+    """ Function to decode a request of any encoding into coordinate arrays.
+
+    Args:
+        request (Request): Incoming request.
+        content (str): Request encoding.
+        encoding (str): Response encoding.
+        model (type[BaseModel]): Request model of the default encoding (e.g. OfflineFacility).
+        columnar (type[BaseModel]): Request model of the columnar encoding (e.g. OfflineColumnar).
+
+    Returns:
+        ColumnarRequest: decoded request.
+    """
+    body = await request.body()
+
+    try:
+        if content == NPZ_TYPE:
+            instance, data = read_npz(body, columnar)
+        elif content == COLUMNAR_TYPE:
+            data = columnar.model_validate_json(body)
+            instance = ColumnarInstance.from_columns(data.demands, data.facilities)
+        else:
+            data = model.model_validate_json(body)
+            instance = ColumnarInstance.from_models(data.demands, data.facilities)
+
+    except ValidationError as e:
+        raise RequestValidationError(e.errors()) from e
+
+    except ValueError as e:
+        raise invalid_body(str(e)) from e
+
+    return ColumnarRequest(instance, data.parameter.model_dump(), getattr(data, 'demand', None), encoding, data.dataset)
+
+def read_npz(body: bytes, columnar: type[BaseModel]) -> tuple[ColumnarInstance, BaseModel]:
+    """ Function to load an .npz body without creating per-point objects.
+
+    The archive holds the arrays named in NPZ_COLUMNS (and optionally NPZ_OPTIONAL),
+    the remaining request fields (e.g. 'parameter') are stored as JSON strings.
+
+    Args:
+        body (bytes): Raw .npz archive.
+        columnar (type[BaseModel]): Request model validating the JSON fields.
+
+    Returns:
+        tuple[ColumnarInstance, BaseModel]: instance and the validated JSON fields.
+    """
+    try:
+        with np.load(io.BytesIO(body), allow_pickle=False) as archive:
+            arrays = {key: archive[key] for key in archive.files}
+
+    except Exception as e:
+        raise invalid_body(f"Could not read .npz body: {e}") from e
+
+    # checking the columns, a referenced dataset replaces the Demand arrays.
+    if 'dataset' in arrays:
+        if any(key in arrays for key in NPZ_DEMANDS):
+            raise invalid_body("Use either demands or a dataset", 'dataset')
+        arrays.update({key: np.zeros(0, dtype=np.int64 if key.endswith('ids') else np.float64) for key in NPZ_DEMANDS})
+    for key in NPZ_COLUMNS:
+        if key not in arrays:
+            raise invalid_body(f"Missing array [{key}]", key)
+    for key in NPZ_COLUMNS + NPZ_OPTIONAL:
+        numeric = key.endswith(('xs', 'ys', 'openingCosts'))
+        if key in arrays and (arrays[key].ndim != 1 or arrays[key].dtype.kind not in ('iuf' if numeric else 'iu')):
+            raise invalid_body(f"Array [{key}] must be a 1-d {'numeric' if numeric else 'integer'} array", key)
+    for key in ('demands.xs', 'demands.ys', 'facilities.xs', 'facilities.ys'):
+        if not np.all(np.isfinite(arrays[key])):
+            raise invalid_body(f"Array [{key}] must be finite", key)
+    if np.any(arrays.get('facilities.openingCosts', 0.0) < 0):
+        raise invalid_body("Opening costs must be non-negative", 'facilities.openingCosts')
+
+    # reading the JSON fields (e.g. 'parameter').
+    fields = {}
+    for key in columnar.model_fields:
+        if key in arrays and arrays[key].ndim == 0:
+            try:
+                fields[key] = json.loads(str(arrays[key]))
+            except json.JSONDecodeError as e:
+                raise invalid_body(f"Invalid JSON in [{key}]: {e}", key) from e
+    data = columnar.model_validate(fields)
+    if data.parameter.metric == 'haversine':
+        for key in ('demands', 'facilities'):
+            if np.any(np.abs(arrays[f'{key}.xs']) > 180) or np.any(np.abs(arrays[f'{key}.ys']) > 90):
+                raise invalid_body("Locations are outside of longitude [-180, 180] / latitude [-90, 90] for metric 'haversine'", f'{key}.xs')
+
+    instance = ColumnarInstance(
+        demand_ids=arrays['demands.ids'],
+        points=np.column_stack([arrays['demands.xs'], arrays['demands.ys']]),
+        facility_ids=arrays['facilities.ids'],
+        centers=np.column_stack([arrays['facilities.xs'], arrays['facilities.ys']]),
+        opening_costs=arrays.get('facilities.openingCosts'),
+        connection_ids=arrays.get('facilities.connection'),
+        connection_counts=arrays.get('facilities.connectionCounts')
+    )
+    return instance, data
+
+
+def read_dataset(body: bytes, content: str) -> tuple[np.ndarray, np.ndarray]:
+    """ Function to decode the Demands of a dataset upload.
+
+    Args:
+        body (bytes): Raw request body.
+        content (str): Request encoding (DatasetUpload, DatasetColumns or an .npz with the NPZ_DEMANDS arrays).
+
+    Returns:
+        tuple[np.ndarray, np.ndarray]: (N,) Demand IDs and (N, 2) Demand locations.
+    """
+    if content != NPZ_TYPE:
+        try:
+            if content == COLUMNAR_TYPE:
+                demands = DatasetColumns.model_validate_json(body).demands
+                return np.array(demands.ids, dtype=np.int64), np.column_stack([demands.xs, demands.ys]).astype(np.float64)
+            demands = DatasetUpload.model_validate_json(body).demands
+            return np.array([x.demandID for x in demands], dtype=np.int64), np.array([x.location for x in demands], dtype=np.float64).reshape(-1, 2)
+
+        except ValidationError as e:
+            raise RequestValidationError(e.errors()) from e
+
+    try:
+        with np.load(io.BytesIO(body), allow_pickle=False) as archive:
+            arrays = {key: archive[key] for key in archive.files}
+
+    except Exception as e:
+        raise invalid_body(f"Could not read .npz body: {e}") from e
+
+    # checking the columns.
+    for key in NPZ_DEMANDS:
+        numeric = not key.endswith('ids')
+        if key not in arrays:
+            raise invalid_body(f"Missing array [{key}]", key)
+        if arrays[key].ndim != 1 or arrays[key].dtype.kind not in ('iuf' if numeric else 'iu'):
+            raise invalid_body(f"Array [{key}] must be a 1-d {'numeric' if numeric else 'integer'} array", key)
+        if numeric and not np.all(np.isfinite(arrays[key])):
+            raise invalid_body(f"Array [{key}] must be finite", key)
+    if not arrays['demands.ids'].shape[0] == arrays['demands.xs'].shape[0] == arrays['demands.ys'].shape[0]:
+        raise invalid_body("Demand columns must have the same length")
+
+    return arrays['demands.ids'].astype(np.int64), np.column_stack([arrays['demands.xs'], arrays['demands.ys']]).astype(np.float64)
+
+
+""" Datasets """
+
+def dataset_request(data: OnlineFacility | OfflineFacility, encoding: str) -> ColumnarRequest:
+    """ Function to move a JSON request referencing a dataset onto the array-backed solve path.
+
+    Args:
+        data (OnlineFacility | OfflineFacility): Validated request with a dataset ID.
+        encoding (str): Response encoding.
+
+    Returns:
+        ColumnarRequest: request without Demands, they are opened in the solver process.
+    """
+    instance = ColumnarInstance.from_models([], data.facilities)
+    return ColumnarRequest(instance, data.parameter.model_dump(), getattr(data, 'demand', None), encoding, data.dataset)
+
+def dataset_size(data: ColumnarRequest) -> int | None:
+    """ Function to count the Demands of a request (None if the referenced dataset is unknown). """
+    if data.dataset is None:
+        return data.instance.demand_ids.shape[0]
+    info = datasets.info(data.dataset)
+    return None if info is None else info['demands']
+
+def dataset_error(datasetID: str) -> ErrorResponse:
+    """ Function to answer a request referencing an unknown dataset. """
+    Logger.warning(f"Could not find dataset [{datasetID}]")
+    return ErrorResponse(msg=f"Could not find dataset [{datasetID}]", code=404)
+
+
+""" Encoding """
+
+def encode_instance(msg: str, instance: ColumnarInstance, data: dict, encoding: str) -> bytes:
+    """ Function to encode a solved instance in the response encoding.
+
+    Args:
+        msg (str): Response message.
+        instance (ColumnarInstance): Solved instance.
+        data (dict): Solver data (costs, ...).
+        encoding (str): Response encoding.
+
+    Returns:
+        bytes: response body.
+    """
+    if encoding == NPZ_TYPE:
+        buffer = io.BytesIO()
+        np.savez(buffer, **instance.to_arrays(), msg=np.array(msg), code=np.array(200), data=np.array(json.dumps(data)))
+        return buffer.getvalue()
+
+    demands, facilities = instance.to_columns() if encoding == COLUMNAR_TYPE else instance.to_json()
+    return orjson.dumps({
+        'msg': msg,
+        'code': 200,
+        'data': {
+            'demands': demands,
+            'facilities': facilities,
+            'data': data
+        }
+    }, option=orjson.OPT_SERIALIZE_NUMPY)
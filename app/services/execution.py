@@ -0,0 +1,125 @@
+""" File for the Solver Execution Layer """
+
+import time
+import asyncio
+import threading
+import contextvars
+import multiprocessing
+from functools import partial
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+from app.model.progress import TimedOut, until
+from app.config.logging_config import create_logger
+from app.config.settings import WORKER_PROCESSES, WORKER_START_METHOD, SOLVER_TIMEOUT
+
+
+""" Logger Function """
+
+Logger = create_logger()
+Logger.info("Logger initialized.")
+
+
+""" Deadline """
+
+def run_until(deadline: float, function, *args):
+    """ Function to run a solve function with a deadline (runs on the solver pool).
+
+    The solvers check the deadline between their rounds (see app.model.progress),
+    so a timed-out solve stops and frees its worker instead of running to the end.
+
+    Args:
+        deadline (float): Wall-clock deadline (time.time()).
+        function (callable): Module-level function.
+        *args: Arguments of the function.
+
+    Returns:
+        Any: return value of the function.
+    """
+    with until(deadline):
+        return function(*args)
+
+
+""" Classes """
+
+class SolverPool:
+    """ Process pool for CPU-bound solver work, started lazily and shut down on app lifespan.
+
+    With processes = 0 the work runs on the event loop's default thread pool instead.
+    """
+    def __init__(self, processes: int = 1, timeout: float = 120.0, start_method: str = 'spawn'):
+        self.processes = processes
+        self.timeout = timeout
+        self.start_method = start_method
+
+        self.pool = None
+        self.lock = threading.Lock()
+
+    def start(self) -> ProcessPoolExecutor | None:
+        """ Method to start the process pool if it is not running yet.
+
+        Returns:
+            ProcessPoolExecutor | None: process pool or None when running on threads.
+        """
+        with self.lock:
+            if self.pool is None and self.processes > 0:
+                context = multiprocessing.get_context(self.start_method)
+                self.pool = ProcessPoolExecutor(max_workers=self.processes, mp_context=context)
+                Logger.info(f"=> Solver Pool established with [{self.processes}] processes.")
+            return self.pool
+
+    def shutdown(self, wait: bool = True) -> None:
+        """ Method to shut the process pool down and cancel pending work.
+
+        Args:
+            wait (bool, optional): Wait for running work to finish. Defaults to True.
+        """
+        with self.lock:
+            pool, self.pool = self.pool, None
+
+        if pool is not None:
+            pool.shutdown(wait=wait, cancel_futures=True)
+            Logger.info("=> Solver Pool shut down.")
+
+    async def run(self, function, *args, timeout: float = None):
+        """ Method to run a picklable function on the pool without blocking the event loop.
+
+        Args:
+            function (callable): Module-level function.
+            *args: Picklable arguments of the function.
+            timeout (float, optional): Timeout in seconds. Defaults to the pool timeout.
+
+        Raises:
+            asyncio.TimeoutError: if the function does not finish within the timeout. The
+                                  function itself stops at its next deadline check.
+            BrokenProcessPool: if a worker process died. The pool is restarted on the next call.
+
+        Returns:
+            Any: return value of the function.
+        """
+        loop = asyncio.get_running_loop()
+        pool = self.start()
+        timeout = self.timeout if timeout is None else timeout
+        call = partial(run_until, time.time() + timeout, function, *args)
+        if pool is None:
+            # carrying the request context (e.g. the log level) over to the worker thread.
+            call = partial(contextvars.copy_context().run, call)
+        future = loop.run_in_executor(pool, call)
+
+        try:
+            return await asyncio.wait_for(future, timeout)
+
+        except TimedOut:
+            # the worker noticed the deadline before the event loop did.
+            raise asyncio.TimeoutError()
+
+        except BrokenProcessPool:
+            with self.lock:
+                if self.pool is pool:
+                    self.pool = None
+            raise
+
+
+""" Solver Pool """
+
+solver_pool = SolverPool(WORKER_PROCESSES, timeout=SOLVER_TIMEOUT, start_method=WORKER_START_METHOD)
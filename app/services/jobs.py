@@ -0,0 +1,341 @@
+""" File for the asynchronous offline Job Queue """
+
+import time
+import uuid
+import orjson
+import threading
+import multiprocessing
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+from app.model.progress import Cancelled, tracking
+from app.services.encoding import encode_default
+from app.config.logging_config import create_logger
+from app.config.settings import JOB_WORKERS, JOB_QUEUE, JOB_TTL, JOB_RESULTS, JOB_BYTES, WORKER_START_METHOD
+
+
+""" Logger Function """
+
+Logger = create_logger()
+Logger.info("Logger initialized.")
+
+
+""" Constants """
+
+STATES = ('queued', 'running', 'completed', 'failed', 'cancelled')
+FINISHED = ('completed', 'failed', 'cancelled')
+
+
+""" Worker """
+
+def run_job(progress, cancelled, function, *args) -> tuple[str, bytes | None, str | None]:
+    """ Function to run a solve function as a job (runs on the job pool).
+
+    The progress dict and the cancel event are Manager proxies shared with the API
+    process: every reported round is written to progress, and the report callback
+    raises Cancelled between two rounds once the job was cancelled.
+
+    Args:
+        progress (DictProxy): Shared progress of the job.
+        cancelled (EventProxy): Shared cancel flag of the job.
+        function (callable): Module-level solve function.
+        *args: Arguments of the function.
+
+    Returns:
+        tuple[str, bytes | None, str | None]: status, serialized result and error.
+    """
+    def report(iteration: int, cost: float) -> None:
+        progress.update(iteration=iteration, cost=cost)
+        if cancelled.is_set():
+            raise Cancelled()
+
+    if cancelled.is_set():
+        return 'cancelled', None, None
+    progress['started'] = time.time()
+
+    try:
+        with tracking(report):
+            result = function(*args)
+
+    except Cancelled:
+        return 'cancelled', None, None
+
+    except Exception as e:
+        return 'failed', None, str(e)
+
+    # solve functions return error responses instead of raising.
+    if not isinstance(result, dict):
+        return 'failed', None, getattr(result, 'msg', str(result))
+    return 'completed', orjson.dumps(result, default=encode_default, option=orjson.OPT_SERIALIZE_NUMPY), None
+
+
+""" Classes """
+
+class Job:
+    """ Single solver job with its status, progress and (serialized) result. """
+    def __init__(self, jobID: str, iterations: int = None):
+        self.jobID = jobID
+        self.status = 'queued'
+        self.progress = {'iteration': 0, 'iterations': iterations, 'cost': None}
+        self.result = None
+        self.error = None
+
+        self.created = time.time()
+        self.started = None
+        self.finished = None
+        self.expires = None
+
+        # Manager proxies shared with the job worker until the job is finished.
+        self.future = None
+        self.shared = None
+        self.cancelled = None
+
+    def sync(self) -> None:
+        """ Method to read the progress and start time reported by the job worker. """
+        shared = self.shared
+        if shared is None:
+            return
+        try:
+            snapshot = shared.copy()
+        except (OSError, EOFError):
+            return
+
+        self.progress.update(iteration=snapshot['iteration'], cost=snapshot['cost'])
+        if self.status == 'queued' and 'started' in snapshot:
+            self.status = 'running'
+            self.started = snapshot['started']
+
+    def to_json(self) -> dict:
+        self.sync()
+        return {
+            'jobID': self.jobID,
+            'status': self.status,
+            'progress': dict(self.progress),
+            'created': self.created,
+            'started': self.started,
+            'finished': self.finished,
+            'error': self.error,
+            'result': None if self.result is None else orjson.loads(self.result)
+        }
+
+class JobQueue:
+    """ Bounded job queue running on a process pool, with result retention and expiry.
+
+    At most workers jobs run at the same time and at most limit further jobs wait.
+    The jobs run in their own processes, so long solves do not hold the GIL of the
+    API process. Progress and cancellation travel through a multiprocessing Manager.
+    Finished jobs are kept for ttl seconds, and only the latest max_results of them
+    within max_bytes of serialized results.
+    """
+    def __init__(self,
+                 workers: int = 2,
+                 limit: int = 16,
+                 ttl: float = 3600.0,
+                 max_results: int = 64,
+                 max_bytes: int = 64 * 1024 * 1024,
+                 start_method: str = 'spawn',
+                 clock=time.monotonic):
+        self.workers = workers
+        self.limit = limit
+        self.ttl = ttl
+        self.max_results = max_results
+        self.max_bytes = max_bytes
+        self.start_method = start_method
+        self.clock = clock
+
+        self.jobs = OrderedDict()
+        self.pool = None
+        self.manager = None
+        self.lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self.jobs)
+
+    def stats(self) -> dict:
+        """ Method to count the jobs per status and the bytes of the retained results.
+
+        Returns:
+            dict: number of jobs by status and 'bytes'.
+        """
+        with self.lock:
+            jobs = list(self.jobs.values())
+        for job in jobs:
+            job.sync()
+        states = [x.status for x in jobs]
+        return {**{state: states.count(state) for state in STATES}, 'bytes': sum(len(x.result or b'') for x in jobs)}
+
+    def purge(self) -> int:
+        """ Method to drop the finished jobs past their expiry.
+
+        Returns:
+            int: Number of dropped jobs.
+        """
+        now = self.clock()
+        with self.lock:
+            expired = [x.jobID for x in self.jobs.values() if x.expires is not None and x.expires <= now]
+            for jobID in expired:
+                del self.jobs[jobID]
+
+        if expired:
+            Logger.info(f"Dropped [{len(expired)}] expired jobs")
+        return len(expired)
+
+    def retain(self) -> int:
+        """ Method to drop the oldest finished jobs beyond the result limits (caller holds the lock).
+
+        Returns:
+            int: Number of dropped jobs.
+        """
+        finished = sorted((x for x in self.jobs.values() if x.status in FINISHED), key=lambda x: x.finished)
+        size = sum(len(x.result or b'') for x in finished)
+
+        dropped = 0
+        while finished and (len(finished) > self.max_results or size > self.max_bytes):
+            job = finished.pop(0)
+            size -= len(job.result or b'')
+            del self.jobs[job.jobID]
+            dropped += 1
+
+        if dropped:
+            Logger.info(f"Dropped [{dropped}] finished jobs beyond the result limits")
+        return dropped
+
+    def start(self) -> ProcessPoolExecutor:
+        """ Method to start the process pool and the Manager if they are not running yet (caller holds the lock). """
+        context = multiprocessing.get_context(self.start_method)
+        if self.manager is None:
+            self.manager = context.Manager()
+        if self.pool is None:
+            self.pool = ProcessPoolExecutor(max_workers=self.workers, mp_context=context)
+            Logger.info(f"=> Job Queue established with [{self.workers}] processes.")
+        return self.pool
+
+    def submit(self, function, *args, iterations: int = None) -> Job | None:
+        """ Method to queue a solve function.
+
+        Args:
+            function (callable): Module-level solve function, its result is stored as the job result.
+            *args: Picklable arguments of the function.
+            iterations (int, optional): Round cap reported with the progress. Defaults to None.
+
+        Returns:
+            Job | None: new job, None if the queue is full.
+        """
+        self.purge()
+        job = Job(uuid.uuid4().hex, iterations)
+
+        with self.lock:
+            if sum(x.status not in FINISHED for x in self.jobs.values()) >= self.workers + self.limit:
+                Logger.warning(f"Rejected job, [{self.limit}] jobs are queued")
+                return None
+
+            pool = self.start()
+            job.shared = self.manager.dict(iteration=0, cost=None)
+            job.cancelled = self.manager.Event()
+            self.jobs[job.jobID] = job
+            job.future = pool.submit(run_job, job.shared, job.cancelled, function, *args)
+
+        job.future.add_done_callback(lambda future: self.complete(job, future, pool))
+        Logger.info(f"Queued job [{job.jobID}]")
+        return job
+
+    def complete(self, job: Job, future, pool: ProcessPoolExecutor) -> None:
+        """ Method to store the outcome of a job worker (runs on the pool's management thread). """
+        if future.cancelled():
+            self.finish(job, 'cancelled')
+            return
+
+        try:
+            status, result, error = future.result()
+        except BrokenProcessPool as e:
+            # a job worker died, the next submission starts a new pool.
+            Logger.warning(f"Job [{job.jobID}] failed: {e}")
+            status, result, error = 'failed', None, f"Job worker failed: {e}"
+            with self.lock:
+                if self.pool is pool:
+                    self.pool = None
+        except Exception as e:
+            Logger.warning(f"Job [{job.jobID}] failed: {e}")
+            status, result, error = 'failed', None, str(e)
+
+        if result is not None and len(result) > self.max_bytes:
+            Logger.warning(f"Result of job [{job.jobID}] with [{len(result)}] bytes exceeds the result limit")
+            status, result, error = 'failed', None, f"Result of [{len(result)}] bytes exceeds the retained job results"
+        self.finish(job, status, result=result, error=error)
+
+    def finish(self, job: Job, status: str, result: bytes = None, error: str = None) -> None:
+        """ Method to finish a job once, release its shared state and apply the result limits. """
+        with self.lock:
+            if job.status in FINISHED:
+                return
+
+            job.sync()
+            job.shared, job.cancelled = None, None
+            job.result = result
+            job.error = error
+            job.finished = time.time()
+            job.expires = self.clock() + self.ttl
+            job.status = status
+            self.retain()
+        Logger.info(f"Job [{job.jobID}] {status}")
+
+    def get(self, jobID: str) -> Job | None:
+        """ Method to get a job.
+
+        Args:
+            jobID (str): Job ID.
+
+        Returns:
+            Job | None: job or None if unknown, expired or dropped.
+        """
+        self.purge()
+        with self.lock:
+            job = self.jobs.get(jobID)
+        if job is not None:
+            job.sync()
+        return job
+
+    def cancel(self, jobID: str) -> Job | None:
+        """ Method to cancel a job. Jobs still waiting for the pool are cancelled right
+        away. Jobs already handed to a worker stop at the end of their current solver
+        round (or before their first one) and are finished once the worker reports.
+
+        Args:
+            jobID (str): Job ID.
+
+        Returns:
+            Job | None: job or None if unknown, expired or dropped.
+        """
+        job = self.get(jobID)
+        cancelled = None if job is None else job.cancelled
+        if cancelled is None:
+            return job
+
+        # a cancelled future finishes the job through its done callback (complete).
+        cancelled.set()
+        job.future.cancel()
+        Logger.info(f"Cancelling job [{jobID}]")
+        return job
+
+    def shutdown(self) -> None:
+        """ Method to cancel all jobs and stop the pool and the Manager. """
+        with self.lock:
+            pool, self.pool = self.pool, None
+            manager, self.manager = self.manager, None
+            jobs = list(self.jobs.values())
+
+        for job in jobs:
+            cancelled = job.cancelled
+            if cancelled is not None:
+                cancelled.set()
+        if pool is not None:
+            pool.shutdown(wait=True, cancel_futures=True)
+            Logger.info("=> Job Queue shut down.")
+        if manager is not None:
+            manager.shutdown()
+
+
+""" Job Queue """
+
+job_queue = JobQueue(JOB_WORKERS, limit=JOB_QUEUE, ttl=JOB_TTL, max_results=JOB_RESULTS, max_bytes=JOB_BYTES, start_method=WORKER_START_METHOD)
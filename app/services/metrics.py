@@ -0,0 +1,249 @@
+""" File for the in-process Request and Solver Metrics (Prometheus text format) """
+
+import math
+import time
+import threading
+import contextvars
+from contextlib import contextmanager
+
+from app.config.logging_config import create_logger
+
+
+""" Logger Function """
+
+Logger = create_logger()
+Logger.info("Logger initialized.")
+
+
+""" Constants """
+
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0)
+SIZE_BUCKETS = (10, 100, 1_000, 10_000, 100_000, 1_000_000)
+PHASES = ('parse', 'construction', 'costs', 'solve', 'serialization')
+
+# route label of requests that did not match any route (keeps the label set bounded).
+UNMATCHED = 'unmatched'
+
+
+""" Classes """
+
+class Metric:
+    """ Labelled counter, gauge or histogram family. """
+    def __init__(self, name: str, kind: str, description: str, buckets: tuple = None):
+        self.name = name
+        self.kind = kind
+        self.description = description
+        self.buckets = buckets
+
+        self.values = {}
+        self.lock = threading.Lock()
+
+    def inc(self, value: float = 1.0, **labels) -> None:
+        key = tuple(sorted(labels.items()))
+        with self.lock:
+            self.values[key] = self.values.get(key, 0.0) + value
+
+    def set(self, value: float, **labels) -> None:
+        with self.lock:
+            self.values[tuple(sorted(labels.items()))] = value
+
+    def observe(self, value: float, **labels) -> None:
+        """ Method to add an observation to the histogram of the labels.
+
+        Args:
+            value (float): Observed value.
+            **labels: Label values.
+        """
+        key = tuple(sorted(labels.items()))
+        with self.lock:
+            counts, total, count = self.values.get(key, ([0] * len(self.buckets), 0.0, 0))
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    counts[i] += 1
+            self.values[key] = (counts, total + value, count + 1)
+
+    def get(self, **labels) -> float:
+        """ Method to read a counter or gauge (the observation count of histograms). """
+        key = tuple(sorted(labels.items()))
+        with self.lock:
+            if self.kind == 'histogram':
+                return self.values[key][2] if key in self.values else 0
+            return self.values.get(key, 0.0)
+
+    def render(self) -> list[str]:
+        """ Method to render the family in the Prometheus text format.
+
+        Returns:
+            list[str]: lines of the family.
+        """
+        lines = [f"# HELP {self.name} {self.description}", f"# TYPE {self.name} {self.kind}"]
+        with self.lock:
+            values = sorted((key, value if self.kind != 'histogram' else (list(value[0]), *value[1:])) for key, value in self.values.items())
+
+        for key, value in values:
+            if self.kind != 'histogram':
+                lines.append(f"{self.name}{format_labels(key)} {format_value(value)}")
+                continue
+
+            counts, total, count = value
+            for bound, n in zip(self.buckets, counts):
+                lines.append(f"{self.name}_bucket{format_labels(key + (('le', format_value(bound)),))} {n}")
+            lines.append(f"{self.name}_bucket{format_labels(key + (('le', '+Inf'),))} {count}")
+            lines.append(f"{self.name}_sum{format_labels(key)} {format_value(total)}")
+            lines.append(f"{self.name}_count{format_labels(key)} {count}")
+
+        return lines
+
+class RequestMetrics:
+    """ Phase timings and instance sizes collected while handling a single request. """
+    def __init__(self):
+        self.phases = {}
+        self.sizes = {}
+
+    def add_phases(self, phases: dict) -> None:
+        for name, seconds in phases.items():
+            self.phases[name] = self.phases.get(name, 0.0) + seconds
+
+
+""" Formatting """
+
+def format_value(value: float) -> str:
+    if math.isinf(value):
+        return '+Inf' if value > 0 else '-Inf'
+    return repr(int(value)) if float(value).is_integer() else repr(float(value))
+
+def format_labels(key: tuple) -> str:
+    if not key:
+        return ''
+    return '{' + ','.join(f'{name}="{escape(value)}"' for name, value in key) + '}'
+
+def escape(value) -> str:
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+""" Metrics """
+
+REQUESTS = Metric('http_requests_total', 'counter', "Number of handled requests by method, route and status.")
+LATENCY = Metric('http_request_duration_seconds', 'histogram', "Request latency by method and route.", LATENCY_BUCKETS)
+IN_FLIGHT = Metric('http_requests_in_flight', 'gauge', "Number of requests currently being handled.")
+PHASE_DURATION = Metric('solver_phase_duration_seconds', 'histogram', "Time spent per solver phase (parse, construction, costs, solve, serialization).", LATENCY_BUCKETS)
+INSTANCE_SIZE = Metric('solver_instance_size', 'histogram', "Number of Demands and Facilities per solved instance.", SIZE_BUCKETS)
+
+METRICS = (REQUESTS, LATENCY, IN_FLIGHT, PHASE_DURATION, INSTANCE_SIZE)
+IN_FLIGHT.set(0)
+
+CURRENT = contextvars.ContextVar('CURRENT', default=None)
+
+
+""" Instrumentation """
+
+@contextmanager
+def phase(name: str):
+    """ Context manager timing a solver phase of the current request.
+
+    Outside of a request (or collect_phases) the timing is dropped.
+
+    Args:
+        name (str): Phase name, see PHASES.
+    """
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        current = CURRENT.get()
+        if current is not None:
+            current.add_phases({name: time.perf_counter() - start})
+
+def record_instance(demands: int, facilities: int) -> None:
+    """ Function to record the instance size of the current request.
+
+    Args:
+        demands (int): Number of Demands.
+        facilities (int): Number of Facilities.
+    """
+    current = CURRENT.get()
+    if current is not None:
+        current.sizes.update(demands=demands, facilities=facilities)
+
+def record_phases(phases: dict) -> None:
+    """ Function to merge phase timings (e.g. of a pool worker) into the current request. """
+    current = CURRENT.get()
+    if current is not None:
+        current.add_phases(phases)
+
+def current_phases() -> dict:
+    """ Function to return the phase timings collected so far for the current request. """
+    current = CURRENT.get()
+    return dict(current.phases) if current is not None else {}
+
+def collect_phases(function, *args) -> tuple:
+    """ Function to run a solve function and return its phase timings alongside (runs on the solver pool).
+
+    Args:
+        function (callable): Module-level solve function.
+        *args: Arguments of the function.
+
+    Returns:
+        tuple: result of the function and the phase timings in seconds.
+    """
+    metrics = RequestMetrics()
+    token = CURRENT.set(metrics)
+    try:
+        return function(*args), metrics.phases
+    finally:
+        CURRENT.reset(token)
+
+def render(extra: list[tuple[str, str, str, float]] = ()) -> str:
+    """ Function to render all metrics in the Prometheus text format.
+
+    Args:
+        extra (list[tuple[str, str, str, float]], optional): Additional (name, kind, description, value) samples, e.g. cache stats.
+
+    Returns:
+        str: metrics text.
+    """
+    lines = [line for metric in METRICS for line in metric.render()]
+    for name, kind, description, value in extra:
+        lines += [f"# HELP {name} {description}", f"# TYPE {name} {kind}", f"{name} {format_value(value)}"]
+    return '\n'.join(lines) + '\n'
+
+
+""" Middleware """
+
+class MetricsMiddleware:
+    """ ASGI middleware counting requests, timing them per route and tracking the requests in flight. """
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] != 'http':
+            return await self.app(scope, receive, send)
+
+        status = 500
+        metrics = RequestMetrics()
+        token = CURRENT.set(metrics)
+
+        async def send_status(message):
+            nonlocal status
+            if message['type'] == 'http.response.start':
+                status = message['status']
+            await send(message)
+
+        IN_FLIGHT.inc(1)
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_status)
+
+        finally:
+            duration = time.perf_counter() - start
+            IN_FLIGHT.inc(-1)
+            CURRENT.reset(token)
+
+            route = getattr(scope.get('route'), 'path', UNMATCHED)
+            REQUESTS.inc(method=scope['method'], route=route, status=str(status))
+            LATENCY.observe(duration, method=scope['method'], route=route)
+            for name, seconds in metrics.phases.items():
+                PHASE_DURATION.observe(seconds, route=route, phase=name)
+            for kind, size in metrics.sizes.items():
+                INSTANCE_SIZE.observe(size, route=route, kind=kind)
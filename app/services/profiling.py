@@ -0,0 +1,102 @@
+""" File for the opt-in per-request Profiling """
+
+import os
+import json
+import uuid
+import pstats
+import marshal
+import cProfile
+
+from app.model.counters import counting
+from app.services.cache import ResultCache
+from app.config.logging_config import create_logger
+from app.config.settings import PROFILE_ENTRIES, PROFILE_BYTES, PROFILE_TTL
+
+
+""" Logger Function """
+
+Logger = create_logger()
+Logger.info("Logger initialized.")
+
+
+""" Constants """
+
+PSTATS_TYPE = 'application/octet-stream'
+
+
+""" Profiling """
+
+def profile_call(function, *args, top: int = 20) -> tuple:
+    """ Function to run a function under cProfile and the solver counters (runs on the solver pool).
+
+    Args:
+        function (callable): Module-level function.
+        *args: Arguments of the function.
+        top (int, optional): Number of reported functions. Defaults to 20.
+
+    Returns:
+        tuple: result of the function, the report and the raw pstats dump (loadable with pstats / snakeviz).
+    """
+    profiler = cProfile.Profile()
+
+    with counting() as counters:
+        profiler.enable()
+        try:
+            result = function(*args)
+        finally:
+            profiler.disable()
+
+    stats = pstats.Stats(profiler)
+    report = {
+        'total': stats.total_tt,
+        'functions': top_functions(stats, top),
+        'counters': {'distanceEvaluations': 0, 'iterations': 0, 'arrivals': 0, **counters}
+    }
+    return result, report, marshal.dumps(stats.stats)
+
+def top_functions(stats: pstats.Stats, top: int = 20) -> list[dict]:
+    """ Function to summarize the functions with the highest own time.
+
+    Args:
+        stats (pstats.Stats): Profile statistics.
+        top (int, optional): Number of functions. Defaults to 20.
+
+    Returns:
+        list[dict]: function, calls, own and cumulative time in seconds.
+    """
+    rows = sorted(stats.stats.items(), key=lambda x: x[1][2], reverse=True)[:top]
+    return [{
+        'function': function_name(key),
+        'calls': calls,
+        'tottime': tottime,
+        'cumtime': cumtime
+    } for key, (_, calls, tottime, cumtime, _) in rows]
+
+def function_name(key: tuple) -> str:
+    """ Function to format a pstats key as 'package/module.py:line(name)'. """
+    filename, line, name = key
+    if filename == '~':
+        return name
+    return f"{os.path.join(*os.path.normpath(filename).split(os.sep)[-2:])}:{line}({name})"
+
+
+""" Profile Store """
+
+# every profile is stored twice: the JSON report and the raw pstats dump.
+profiles = ResultCache(max_entries=2 * PROFILE_ENTRIES, max_bytes=PROFILE_BYTES, ttl=PROFILE_TTL)
+
+def store_profile(report: dict, raw: bytes) -> str:
+    """ Function to store a profile for later download.
+
+    Args:
+        report (dict): Profile report (see profile_call).
+        raw (bytes): Raw pstats dump.
+
+    Returns:
+        str: profile ID.
+    """
+    profileID = uuid.uuid4().hex
+    profiles.put(f"{profileID}.pstats", raw)
+    profiles.put(profileID, json.dumps(report).encode())
+    Logger.info(f"Stored profile [{profileID}]")
+    return profileID
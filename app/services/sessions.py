@@ -0,0 +1,139 @@
+""" File for the in-process Online Session Store """
+
+import time
+import uuid
+import threading
+from collections import OrderedDict
+
+from app.config.logging_config import create_logger
+from app.config.settings import SESSION_LIMIT, SESSION_TTL
+
+
+""" Logger Function """
+
+Logger = create_logger()
+Logger.info("Logger initialized.")
+
+
+""" Classes """
+
+class Session:
+    """ Single online session holding a solver and its access time. """
+    def __init__(self, sessionID: str, solver, last_access: float):
+        self.sessionID = sessionID
+        self.solver = solver
+        self.last_access = last_access
+        self.lock = threading.Lock()
+
+class SessionStore:
+    """ Bounded session store with idle-TTL and LRU eviction.
+
+    Online sockets hold their solver themselves and only count against the same
+    limit; they cannot be evicted, so new sockets are rejected at the limit.
+    """
+    def __init__(self, limit: int = 1000, ttl: float = 1800.0, clock=time.monotonic):
+        self.limit = limit
+        self.ttl = ttl
+        self.clock = clock
+
+        self.sessions = OrderedDict()
+        self.sockets = 0
+        self.lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self.sessions)
+
+    def purge(self) -> int:
+        """ Method to drop all sessions idle for longer than the TTL.
+
+        Returns:
+            int: Number of dropped sessions.
+        """
+        # sessions are ordered by last access, so expired ones sit at the front.
+        deadline = self.clock() - self.ttl
+        dropped = 0
+        with self.lock:
+            while self.sessions:
+                session = next(iter(self.sessions.values()))
+                if session.last_access > deadline:
+                    break
+                self.sessions.popitem(last=False)
+                dropped += 1
+
+        if dropped:
+            Logger.info(f"Dropped [{dropped}] expired sessions")
+        return dropped
+
+    def create(self, solver) -> Session:
+        """ Method to store a solver under a new session ID.
+
+        Args:
+            solver (OnlineFacilitySolver): Solver instance.
+
+        Returns:
+            Session: new session.
+        """
+        self.purge()
+        session = Session(uuid.uuid4().hex, solver, self.clock())
+
+        with self.lock:
+            while len(self.sessions) >= self.limit:
+                evicted, _ = self.sessions.popitem(last=False)
+                Logger.info(f"Evicted session [{evicted}]")
+            self.sessions[session.sessionID] = session
+
+        return session
+
+    def get(self, sessionID: str) -> Session | None:
+        """ Method to look up a session and refresh its access time.
+
+        Args:
+            sessionID (str): Session ID.
+
+        Returns:
+            Session | None: session or None if unknown or expired.
+        """
+        self.purge()
+        with self.lock:
+            session = self.sessions.get(sessionID)
+            if session is None:
+                return None
+
+            session.last_access = self.clock()
+            self.sessions.move_to_end(sessionID)
+
+        return session
+
+    def connect(self) -> bool:
+        """ Method to count a new online socket.
+
+        Returns:
+            bool: False if the limit of open sockets is reached.
+        """
+        with self.lock:
+            if self.sockets >= self.limit:
+                return False
+            self.sockets += 1
+            return True
+
+    def disconnect(self) -> None:
+        """ Method to release the count of a closed online socket. """
+        with self.lock:
+            self.sockets -= 1
+
+    def delete(self, sessionID: str) -> bool:
+        """ Method to drop a session.
+
+        Args:
+            sessionID (str): Session ID.
+
+        Returns:
+            bool: True if the session existed.
+        """
+        with self.lock:
+            return self.sessions.pop(sessionID, None) is not None
+
+
+""" Session Store """
+
+sessions = SessionStore(limit=SESSION_LIMIT, ttl=SESSION_TTL)
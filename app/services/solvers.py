@@ -0,0 +1,324 @@
+""" File for the Solve Functions run on the solver pool and the job workers """
+
+import io
+import json
+import math
+import orjson
+import numpy as np
+
+from app.model.model import Demand
+from app.model.online_facility import OnlineFacilitySolver
+from app.model.columnar import ColumnarInstance
+from app.model.ensemble import meyerson_ensemble
+from app.services.encoding import ColumnarRequest, JSON_TYPE, NPZ_TYPE, encode_instance, dataset_request, dataset_error
+from app.services.metrics import phase
+
+from app.config.logging_config import create_logger, log_level
+from app.validation.messages import OnlineFacility, OfflineFacility, OnlineBatch, OnlineEnsemble
+from app.validation.messages import DataResponse, ErrorResponse
+
+
+""" Logger Function """
+
+Logger = create_logger()
+Logger.info("Logger initialized.")
+
+
+""" Solve Functions """
+
+def solve_online(data: OnlineFacility, log_lvl: str = "info") -> DataResponse | ErrorResponse:
+    """ Function to run the Meyerson algorithm for an online request (runs on the solver pool).
+
+    Args:
+        data (OnlineFacility): BaseModel containing the needed data.
+        log_lvl (str, optional): Logger Level. Defaults to 'info'.
+
+    Returns:
+        DataResponse: Dict containing msg, code and data.
+    """
+    # applying the request log level to this solve only.
+    with log_level(log_lvl):
+        # building the solver arrays directly from the validated models.
+        try:
+            with phase('construction'):
+                instance = ColumnarInstance.from_models(data.demands, data.facilities)
+                parameter = data.parameter.model_dump()
+            Logger.info("Initialized Arrays")
+
+        except Exception as e:
+            Logger.warning(f"Could not initialize Solver: {e}")
+            return ErrorResponse(msg=f"Could not initialize Solver: {e}")
+
+        # running Meyerson algorithm.
+        try:
+            with phase('costs'):
+                costs = instance.recalculate_costs(parameter['metric'])
+            with phase('solve'):
+                result = instance.meyerson(data.demand.demandID, data.demand.location, parameter, costs=costs)
+            with phase('serialization'):
+                demands, facilities = instance.to_json()
+            Logger.debug("decision=%s", result['decision'])
+            Logger.info("Meyerson Solver completed")
+
+        except Exception as e:
+            Logger.warning(f"Could not run Meyerson algorithm: {e}")
+            return ErrorResponse(msg=f"Could not run Meyerson algorithm: {e}")
+
+        return {
+            "msg": "/online_facility_location successful.",
+            "code": 200,
+            "data": {
+                'demands': demands,
+                'facilities': facilities,
+                'data': {'costs': result['costs'], 'coin': result['coin']}
+            }
+        }
+
+def solve_offline(data: OfflineFacility, log_lvl: str = "info", seed: np.random.SeedSequence = None) -> DataResponse | ErrorResponse:
+    """ Function to run the k-Means Clustering algorithm for an offline request (runs on the solver pool).
+
+    Args:
+        data (OfflineFacility): BaseModel containing the needed data.
+        log_lvl (str, optional): Logger Level. Defaults to 'info'.
+        seed (np.random.SeedSequence, optional): Seed of a single restart (see solve_restart). Defaults to None.
+
+    Returns:
+        DataResponse: Dict containing msg, code and data.
+    """
+    # applying the request log level to this solve only.
+    with log_level(log_lvl):
+        # building the solver arrays directly from the validated models.
+        try:
+            with phase('construction'):
+                instance = ColumnarInstance.from_models(data.demands, data.facilities)
+                parameter = data.parameter.model_dump()
+            Logger.info("Initialized Arrays")
+
+        except Exception as e:
+            Logger.warning(f"Could not initialize Solver: {e}")
+            return ErrorResponse(msg=f"Could not initialize Solver: {e}")
+
+        # running Clustering algorithm.
+        try:
+            with phase('costs'):
+                costs = instance.recalculate_costs(parameter['metric'])
+            with phase('solve'):
+                result = instance.cluster(parameter, costs, seed)
+            with phase('serialization'):
+                demands, facilities = instance.to_json()
+            Logger.debug("result=%s", result)
+            Logger.info("Clustering Solver completed")
+
+        except Exception as e:
+            Logger.warning(f"Could not run Clustering algorithm: {e}")
+            return ErrorResponse(msg=f"Could not run Clustering algorithm: {e}")
+
+        return {
+            "msg": "/offline_facility_location successful.",
+            "code": 200,
+            "data": {
+                'demands': demands,
+                'facilities': facilities,
+                'data': result
+            }
+        }
+
+def solve_online_columnar(data: ColumnarRequest, log_lvl: str = "info") -> bytes | ErrorResponse:
+    """ Function to run the Meyerson algorithm for a columnar or binary online request (runs on the solver pool).
+
+    Args:
+        data (ColumnarRequest): Decoded request.
+        log_lvl (str, optional): Logger Level. Defaults to 'info'.
+
+    Returns:
+        bytes | ErrorResponse: encoded response body.
+    """
+    # applying the request log level to this solve only.
+    with log_level(log_lvl):
+        # opening the Demands of a referenced dataset.
+        try:
+            with phase('construction'):
+                data.attach_dataset()
+        except KeyError:
+            return dataset_error(data.dataset)
+
+        try:
+            with phase('costs'):
+                costs = data.instance.recalculate_costs(data.parameter['metric'])
+            with phase('solve'):
+                result = data.instance.meyerson(data.demand.demandID, data.demand.location, data.parameter, costs=costs)
+            Logger.info("Meyerson Solver completed")
+
+        except Exception as e:
+            Logger.warning(f"Could not run Meyerson algorithm: {e}")
+            return ErrorResponse(msg=f"Could not run Meyerson algorithm: {e}")
+
+        with phase('serialization'):
+            return encode_instance("/online_facility_location successful.", data.instance, {'costs': result['costs'], 'coin': result['coin']}, data.encoding)
+
+def solve_offline_columnar(data: ColumnarRequest, log_lvl: str = "info", seed: np.random.SeedSequence = None) -> bytes | ErrorResponse:
+    """ Function to run the k-Means Clustering algorithm on the arrays of a columnar or binary request (runs on the solver pool).
+
+    Args:
+        data (ColumnarRequest): Decoded request.
+        log_lvl (str, optional): Logger Level. Defaults to 'info'.
+        seed (np.random.SeedSequence, optional): Seed of a single restart (see solve_restart). Defaults to None.
+
+    Returns:
+        bytes | ErrorResponse: encoded response body.
+    """
+    # applying the request log level to this solve only.
+    with log_level(log_lvl):
+        # opening the Demands of a referenced dataset.
+        try:
+            with phase('construction'):
+                data.attach_dataset()
+        except KeyError:
+            return dataset_error(data.dataset)
+
+        try:
+            with phase('solve'):
+                result = data.instance.cluster(data.parameter, seed=seed)
+            Logger.info("Clustering Solver completed")
+
+        except Exception as e:
+            Logger.warning(f"Could not run Clustering algorithm: {e}")
+            return ErrorResponse(msg=f"Could not run Clustering algorithm: {e}")
+
+        with phase('serialization'):
+            return encode_instance("/offline_facility_location successful.", data.instance, result, data.encoding)
+
+def solve_restart(function, data: OfflineFacility | ColumnarRequest, log_lvl: str, seed: np.random.SeedSequence) -> tuple:
+    """ Function to run one seeded restart of an offline solve function (runs on the solver pool).
+
+    The API runs one call per seed of restart_seeds concurrently and keeps the cheapest result.
+
+    Args:
+        function (callable): solve_offline or solve_offline_columnar.
+        data (OfflineFacility | ColumnarRequest): Request data.
+        log_lvl (str): Logger Level.
+        seed (np.random.SeedSequence): Seed of the restart.
+
+    Returns:
+        tuple: result of the function and its costs (inf for error responses).
+    """
+    result = function(data, log_lvl, seed)
+    if isinstance(result, dict):
+        return result, result['data']['data']['costs']['current']
+    if not isinstance(result, bytes):
+        return result, math.inf
+
+    # reading the costs back from the encoded result.
+    if data.encoding == NPZ_TYPE:
+        with np.load(io.BytesIO(result)) as arrays:
+            return result, json.loads(str(arrays['data']))['costs']['current']
+    return result, orjson.loads(result)['data']['data']['costs']['current']
+
+def solve_online_batch(data: OnlineBatch, log_lvl: str = "info") -> DataResponse | ErrorResponse:
+    """ Function to run a validated OnlineBatch through one Meyerson solver.
+
+    Args:
+        data (OnlineBatch): BaseModel containing the arrivals, parameter and seed.
+        log_lvl (str, optional): Logger Level. Defaults to 'info'.
+
+    Returns:
+        DataResponse: Dict containing msg, code and data.
+    """
+    # applying the request log level to this solve only.
+    with log_level(log_lvl):
+        # initializing classes from the validated models.
+        with phase('construction'):
+            demands = [Demand().from_request(x) for x in data.demands]
+        Logger.info("Initialized Classes")
+
+        # initializing solver.
+        try:
+            with phase('construction'):
+                solver = OnlineFacilitySolver(
+                    parameter=data.parameter.model_dump(),
+                    seed=data.seed
+                )
+            Logger.info("Initialized Solver")
+
+        except Exception as e:
+            Logger.warning(f"Could not initialize Solver: {e}")
+            return ErrorResponse(msg=f"Could not initialize Solver: {e}")
+
+        # running Meyerson algorithm.
+        try:
+            with phase('solve'):
+                decisions = solver.meyerson_batch(demands)
+            with phase('serialization'):
+                result = solver.current_instance()
+            result.pop('parameter')
+            result['decisions'] = decisions
+            Logger.info(f"Meyerson Solver completed [{len(decisions)}] arrivals")
+
+        except Exception as e:
+            Logger.warning(f"Could not run Meyerson algorithm: {e}")
+            return ErrorResponse(msg=f"Could not run Meyerson algorithm: {e}")
+
+        return {
+            "msg": "/online_facility_location/batch successful.",
+            "code": 200,
+            "data": result
+        }
+
+def solve_online_ensemble(data: OnlineEnsemble, log_lvl: str = "info") -> DataResponse | ErrorResponse:
+    """ Function to run a validated OnlineEnsemble through the batched Meyerson runs.
+
+    Args:
+        data (OnlineEnsemble): BaseModel containing the arrivals, initial Facilities, parameter and ensemble config.
+        log_lvl (str, optional): Logger Level. Defaults to 'info'.
+
+    Returns:
+        DataResponse: Dict containing msg, code and data.
+    """
+    # applying the request log level to this solve only.
+    with log_level(log_lvl):
+        # initializing the arrays from the validated models.
+        with phase('construction'):
+            instance = ColumnarInstance.from_models(data.demands, data.facilities)
+        Logger.info("Initialized Arrays")
+
+        # running the ensemble.
+        try:
+            with phase('solve'):
+                result = meyerson_ensemble(
+                    instance,
+                    data.parameter.model_dump(),
+                    runs=data.runs,
+                    seed=data.seed,
+                    shuffle=data.shuffle,
+                    percentiles=data.percentiles
+                )
+            Logger.info(f"Meyerson Ensemble completed [{data.runs}] runs")
+
+        except Exception as e:
+            Logger.warning(f"Could not run Meyerson ensemble: {e}")
+            return ErrorResponse(msg=f"Could not run Meyerson ensemble: {e}")
+
+        return {
+            "msg": "/online_facility_location/ensemble successful.",
+            "code": 200,
+            "data": result
+        }
+
+
+""" Jobs """
+
+def solve_offline_job(data: OfflineFacility, log_lvl: str = "info") -> dict | ErrorResponse:
+    """ Function to solve an offline request as a job (dataset requests run on the arrays).
+
+    Args:
+        data (OfflineFacility): Validated request data.
+        log_lvl (str, optional): Logger Level. Defaults to 'info'.
+
+    Returns:
+        dict | ErrorResponse: Dict containing msg, code and data.
+    """
+    if data.dataset is None:
+        return solve_offline(data, log_lvl)
+
+    result = solve_offline_columnar(dataset_request(data, JSON_TYPE), log_lvl)
+    return orjson.loads(result) if isinstance(result, bytes) else result
@@ -1,23 +1,206 @@
 """ File containing the default request BaseModels """
 
-from pydantic import BaseModel, Field
-from typing import Optional
+from pydantic import BaseModel, ConfigDict, Field, FiniteFloat, NonNegativeFloat, ValidationInfo, model_validator
+from typing import Annotated, Literal, Optional
+
+
+""" Payload Validation Classes """
+
+Location = tuple[FiniteFloat, FiniteFloat]
+
+class DemandModel(BaseModel):
+    """ BaseModel for validating a Demand Point. """
+    model_config = ConfigDict(extra='forbid')
+
+    demandID: int = Field(..., description="Unique Demand ID")
+    location: Location = Field(..., description="(x, y) location")
+
+class FacilityModel(BaseModel):
+    """ BaseModel for validating a Facility. """
+    model_config = ConfigDict(extra='forbid')
+
+    facilityID: int = Field(..., description="Unique Facility ID")
+    location: Location = Field(..., description="(x, y) location")
+    connection: list[int] = Field(default=[], description="IDs of the served Demand Points")
+    openingCosts: float = Field(default=0.0, ge=0, description="Opening costs of the Facility")
+
+class DemandColumns(BaseModel):
+    """ BaseModel for validating Demand Points as columns. """
+    model_config = ConfigDict(extra='forbid')
+
+    ids: list[int] = Field(default=[], description="Demand IDs")
+    xs: list[FiniteFloat] = Field(default=[], description="x coordinates")
+    ys: list[FiniteFloat] = Field(default=[], description="y coordinates")
+
+    @model_validator(mode='after')
+    def check_columns(self) -> 'DemandColumns':
+        if not len(self.ids) == len(self.xs) == len(self.ys):
+            raise ValueError("Columns ids, xs and ys must have the same length")
+        return self
+
+class FacilityColumns(DemandColumns):
+    """ BaseModel for validating Facilities as columns. Empty optional columns default per Facility. """
+    ids: list[int] = Field(default=[], description="Facility IDs")
+    openingCosts: list[NonNegativeFloat] = Field(default=[], description="Opening costs (default 0.0)")
+    connection: list[list[int]] = Field(default=[], description="IDs of the served Demand Points (default [])")
+
+    @model_validator(mode='after')
+    def check_optional_columns(self) -> 'FacilityColumns':
+        for name in ('openingCosts', 'connection'):
+            if getattr(self, name) and len(getattr(self, name)) != len(self.ids):
+                raise ValueError(f"Column {name} must be empty or match the length of ids")
+        return self
+
+class OnlineParameter(BaseModel):
+    """ BaseModel for validating the config of the Meyerson solver. Unknown keys are ignored. """
+    probability: float = Field(default=1.0, ge=0, description="Probability bias of opening a Facility")
+    openingCosts: float = Field(default=10.0, gt=0, description="Opening costs of new Facilities")
+    costs: float = Field(default=1, description="Cost factor (unused by the solver)")
+    metric: Literal['euclidean', 'manhattan', 'haversine'] = Field(default='euclidean', description="Distance metric, 'haversine' reads locations as (longitude, latitude) and returns km")
+    index: Literal['grid', 'linear'] = Field(default='grid', description="Nearest-Facility index")
+    cellSize: Optional[float] = Field(default=None, gt=0, description="Cell size of the grid index (km for 'haversine')")
+    debugCosts: bool = Field(default=False, description="Cross-check the running costs")
+
+class OfflineParameter(BaseModel):
+    """ BaseModel for validating the config of the k-Means solver. Unknown keys are ignored. """
+    engine: Literal['kmeans', 'ufl'] = Field(default='kmeans', description="k-Means on the requested Facilities or uncapacitated facility location (opens and closes Facilities)")
+    candidates: Literal['facilities', 'demands'] = Field(default='facilities', description="Candidate sites of 'ufl': the requested Facilities, or also every Demand location (at openingCosts)")
+    iterations: int = Field(default=10, ge=0, description="Maximum number of clustering rounds (local search moves for 'ufl')")
+    tolerance: Optional[float] = Field(default=None, ge=0, description="Center shift / cost change to stop at (minimum move saving for 'ufl')")
+    openingCosts: Optional[float] = Field(default=None, ge=0, description="Opening costs of the Meyerson seeding and of the Demand candidates of 'ufl'")
+    probability: float = Field(default=1.0, ge=0, description="Probability bias of the Meyerson seeding")
+    costs: float = Field(default=1, description="Cost factor (unused by the solver)")
+    metric: Literal['euclidean', 'manhattan', 'haversine'] = Field(default='euclidean', description="Distance metric, 'haversine' reads locations as (longitude, latitude) and returns km")
+    mode: Literal['batch', 'minibatch'] = Field(default='batch', description="Full-batch or mini-batch rounds")
+    batchSize: int = Field(default=1024, gt=0, description="Sampled points per mini-batch round")
+    init: Literal['request', 'kmeans++', 'meyerson'] = Field(default='request', description="Facility seeding")
+    restarts: int = Field(default=1, ge=1, description="Number of seeded solves run in parallel, the cheapest is kept (1 without a randomized init or mode, see data.restarts)")
+    seed: Optional[int] = Field(default=None, description="Seed of the randomized modes")
+    debugCosts: bool = Field(default=False, description="Cross-check the running costs")
 
 
 """ Request Validation Classes """
 
-class OnlineFacility(BaseModel):
+class DatasetReference(BaseModel):
+    """ BaseModel mixin for requests that can reference a stored dataset instead of inline demands. """
+    dataset: Optional[str] = Field(default=None, description="Dataset ID from /datasets, replaces demands")
+
+    @model_validator(mode='after')
+    def check_dataset(self) -> 'DatasetReference':
+        if self.dataset is None:
+            if self.demands is None:
+                raise ValueError("Field demands is required without a dataset")
+        elif 'demands' in self.model_fields_set:
+            raise ValueError("Use either demands or a dataset")
+        else:
+            self.demands = DemandColumns() if isinstance(self.demands, DemandColumns) else []
+        return self
+
+def check_geo_location(location: tuple, metric: str, name: str = 'demand') -> None:
+    """ Function to check that a location is a (longitude, latitude) pair under metric 'haversine'.
+
+    Args:
+        location (tuple): Location to check.
+        metric (str): Metric of the request or session.
+        name (str, optional): Field name for the error message. Defaults to 'demand'.
+
+    Raises:
+        ValueError: if the location is outside of longitude [-180, 180] / latitude [-90, 90].
+    """
+    if metric != 'haversine':
+        return
+    longitude, latitude = location
+    if not (-180 <= longitude <= 180 and -90 <= latitude <= 90):
+        raise ValueError(f"Location ({longitude}, {latitude}) in {name} is outside of longitude [-180, 180] / latitude [-90, 90] for metric 'haversine'")
+
+class GeoLocations(BaseModel):
+    """ BaseModel mixin checking that 'haversine' requests hold (longitude, latitude) locations. """
+
+    @model_validator(mode='after')
+    def check_geo_locations(self) -> 'GeoLocations':
+        if self.parameter.metric != 'haversine':
+            return self
+        for name in ('demand', 'demands', 'facilities'):
+            value = getattr(self, name, None)
+            if isinstance(value, DemandColumns):
+                locations = zip(value.xs, value.ys)
+            elif isinstance(value, BaseModel):
+                locations = [value.location]
+            else:
+                locations = (x.location for x in value or [])
+            for location in locations:
+                check_geo_location(location, 'haversine', name)
+        return self
+
+class OnlineFacility(DatasetReference, GeoLocations):
     """ BaseModel for validating an online facility request. """
-    demand: dict = Field(default={'demandID': 2, 'location': (3, -4)}, description="Current Demand Point")
-    demands: list[dict] = Field(default=[{'demandID': 0, 'location': (0, 5)},{'demandID': 1, 'location': (-7, 2)}], description="Previous Demand Points")
-    facilities: list[dict] = Field(default=[{'facilityID': 0, 'location': (0, 5), 'connection': [1, 2], 'openingCosts': 100.0}], description="Current Facilities")
-    parameter: dict = Field(default={'probability': 1.0, "openingCosts": 10.0, 'costs': 1, 'metric': 'euclidean'}, description="Config for the Facility Location Problem.")
+    demand: DemandModel = Field(default={'demandID': 2, 'location': (3, -4)}, validate_default=True, description="Current Demand Point")
+    demands: list[DemandModel] = Field(default=[{'demandID': 0, 'location': (0, 5)},{'demandID': 1, 'location': (-7, 2)}], validate_default=True, description="Previous Demand Points")
+    facilities: list[FacilityModel] = Field(default=[{'facilityID': 0, 'location': (0, 5), 'connection': [1, 2], 'openingCosts': 100.0}], validate_default=True, description="Current Facilities")
+    parameter: OnlineParameter = Field(default_factory=OnlineParameter, description="Config for the Facility Location Problem.")
 
-class OfflineFacility(BaseModel):
+class OfflineFacility(DatasetReference, GeoLocations):
     """ BaseModel for validating an offline facility request. """
-    demands: list[dict] = Field(..., description="Current Demand Points")
-    facilities: list[dict] = Field(..., description="Current Facilities")
-    parameter: dict = Field(default={'iterations': 10, 'costs': 1, "openingCosts": 10.0, 'metric': 'euclidean'}, description="Config for the Facility Location Problem.")
+    demands: Optional[list[DemandModel]] = Field(default=None, description="Current Demand Points (required without a dataset)")
+    facilities: list[FacilityModel] = Field(..., description="Current Facilities")
+    parameter: OfflineParameter = Field(default_factory=OfflineParameter, description="Config for the Facility Location Problem.")
+
+class OnlineColumnar(DatasetReference, GeoLocations):
+    """ BaseModel for validating a columnar online facility request. """
+    demand: DemandModel = Field(default={'demandID': 2, 'location': (3, -4)}, validate_default=True, description="Current Demand Point")
+    demands: DemandColumns = Field(default_factory=DemandColumns, description="Previous Demand Points")
+    facilities: FacilityColumns = Field(default_factory=FacilityColumns, description="Current Facilities")
+    parameter: OnlineParameter = Field(default_factory=OnlineParameter, description="Config for the Facility Location Problem.")
+
+class OfflineColumnar(DatasetReference, GeoLocations):
+    """ BaseModel for validating a columnar offline facility request. """
+    demands: DemandColumns = Field(default_factory=DemandColumns, description="Current Demand Points")
+    facilities: FacilityColumns = Field(default_factory=FacilityColumns, description="Current Facilities")
+    parameter: OfflineParameter = Field(default_factory=OfflineParameter, description="Config for the Facility Location Problem.")
+
+class DatasetUpload(BaseModel):
+    """ BaseModel for validating a dataset upload. """
+    model_config = ConfigDict(extra='forbid')
+
+    demands: list[DemandModel] = Field(..., description="Demand Points of the dataset")
+
+class DatasetColumns(BaseModel):
+    """ BaseModel for validating a columnar dataset upload. """
+    model_config = ConfigDict(extra='forbid')
+
+    demands: DemandColumns = Field(..., description="Demand Points of the dataset")
+
+class OnlineSession(GeoLocations):
+    """ BaseModel for validating an online session request. """
+    demands: list[DemandModel] = Field(default=[], description="Previous Demand Points")
+    facilities: list[FacilityModel] = Field(default=[], description="Current Facilities")
+    parameter: OnlineParameter = Field(default_factory=OnlineParameter, description="Config for the Facility Location Problem.")
+
+class OnlineDemand(BaseModel):
+    """ BaseModel for validating a single demand of an online session (against the session's metric given as context). """
+    demand: DemandModel = Field(default={'demandID': 2, 'location': (3, -4)}, validate_default=True, description="Current Demand Point")
+
+    @model_validator(mode='after')
+    def check_session_metric(self, info: ValidationInfo) -> 'OnlineDemand':
+        if info.context:
+            check_geo_location(self.demand.location, info.context.get('metric'))
+        return self
+
+class OnlineBatch(GeoLocations):
+    """ BaseModel for validating a batch of online demand arrivals. """
+    demands: list[DemandModel] = Field(default=[{'demandID': 0, 'location': (0, 5)}, {'demandID': 1, 'location': (-7, 2)}], validate_default=True, description="Demand Points in arrival order")
+    parameter: OnlineParameter = Field(default_factory=OnlineParameter, description="Config for the Facility Location Problem.")
+    seed: Optional[int] = Field(default=None, description="Seed for reproducible coin flips")
+
+class OnlineEnsemble(GeoLocations):
+    """ BaseModel for validating a Monte-Carlo ensemble of online demand arrivals. """
+    demands: list[DemandModel] = Field(default=[{'demandID': 0, 'location': (0, 5)}, {'demandID': 1, 'location': (-7, 2)}], validate_default=True, description="Demand Points in arrival order")
+    facilities: list[FacilityModel] = Field(default=[], description="Initially open Facilities (their connections are ignored)")
+    parameter: OnlineParameter = Field(default_factory=OnlineParameter, description="Config for the Facility Location Problem.")
+    runs: int = Field(default=100, ge=1, le=10000, description="Number of independently seeded runs")
+    seed: Optional[int] = Field(default=None, description="Seed of the ensemble (spawns the seed of every run)")
+    shuffle: bool = Field(default=False, description="Draw a random arrival order per run")
+    percentiles: list[Annotated[float, Field(ge=0, le=100)]] = Field(default=[5, 25, 50, 75, 95], description="Reported percentiles of the costs and Facility counts")
 
 
 """ Response Validation Classes """
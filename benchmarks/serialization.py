@@ -0,0 +1,81 @@
+""" Benchmark of the response serialization of large offline results """
+
+import time
+import argparse
+import numpy as np
+from pydantic import TypeAdapter
+from fastapi.responses import JSONResponse
+
+from app.model.model import Demand, Facility
+from app.model.offline_facility import OfflineFacilitySolver
+from app.services.encoding import NumpyJSONResponse
+from app.validation.messages import DataResponse, ErrorResponse
+
+
+""" Constants """
+
+SIZES = (1_000, 10_000, 100_000)
+FACILITIES = 20
+REPEATS = 5
+
+
+""" Functions """
+
+def offline_result(size: int, seed: int = 0) -> dict:
+    """ Function to solve a random offline instance and return the route result.
+
+    Args:
+        size (int): Number of Demand points.
+        seed (int, optional): Seed of the instance. Defaults to 0.
+
+    Returns:
+        dict: msg, code and data as returned by the solve function.
+    """
+    rng = np.random.default_rng(seed)
+    demands = [Demand(i, tuple(x)) for i, x in enumerate(rng.uniform(0, 1000, size=(size, 2)).tolist())]
+    facilities = [Facility(i, tuple(x), openingCosts=10.0) for i, x in enumerate(rng.uniform(0, 1000, size=(FACILITIES, 2)).tolist())]
+
+    solver = OfflineFacilitySolver(demands, facilities, {'iterations': 10, 'metric': 'euclidean'})
+    solver.calculate_costs()
+    solver.cluster_algorithm()
+    result = solver.current_instance()
+    result.pop('parameter')
+
+    return {"msg": "/offline_facility_location successful.", "code": 200, "data": result}
+
+def response_model_body(result: dict, adapter: TypeAdapter) -> bytes:
+    """ Function to render a result like a route with response_model (validate, encode, json.dumps). """
+    value = adapter.validate_python(result)
+    return JSONResponse(adapter.dump_python(value, mode='json')).body
+
+def numpy_body(result: dict) -> bytes:
+    """ Function to render a result with NumpyJSONResponse. """
+    return NumpyJSONResponse(result).body
+
+def timeit(function, *args, repeats: int = REPEATS) -> float:
+    """ Function to return the best wall time of repeated calls in milliseconds. """
+    best = np.inf
+    for _ in range(repeats):
+        start = time.perf_counter()
+        function(*args)
+        best = min(best, time.perf_counter() - start)
+    return best * 1000
+
+
+""" Benchmark """
+
+if __name__ == "__main__":
+    # Terminal: python -m benchmarks.serialization --sizes 1000 10000 100000
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--sizes', type=int, nargs='+', default=SIZES)
+    parser.add_argument('--repeats', type=int, default=REPEATS)
+    args = parser.parse_args()
+
+    adapter = TypeAdapter(DataResponse | ErrorResponse)
+    print(f"{'demands':>10} {'response_model [ms]':>20} {'NumpyJSONResponse [ms]':>24} {'speedup':>8} {'bytes':>12}")
+
+    for size in args.sizes:
+        result = offline_result(size)
+        baseline = timeit(response_model_body, result, adapter, repeats=args.repeats)
+        optimized = timeit(numpy_body, result, repeats=args.repeats)
+        print(f"{size:>10} {baseline:>20.2f} {optimized:>24.2f} {baseline / optimized:>7.1f}x {len(numpy_body(result)):>12}")
@@ -0,0 +1,276 @@
+""" Benchmark Suite of the Solvers and Endpoints """
+
+import os
+import sys
+import json
+import time
+import logging
+import platform
+import argparse
+import itertools
+import tracemalloc
+import numpy as np
+from fastapi.testclient import TestClient
+
+from app.api import app
+from app.model.model import Demand, Facility
+from app.model.online_facility import OnlineFacilitySolver
+from app.model.offline_facility import OfflineFacilitySolver
+from app.services.execution import solver_pool
+from app.services.cache import offline_cache
+
+
+""" Constants """
+
+DEMANDS = (1_000, 10_000)
+FACILITIES = (10, 50)
+ITERATIONS = (10,)
+METRICS = ('euclidean', 'manhattan')
+CASES = ('offline', 'online', 'costs', 'offline_endpoint', 'online_endpoint')
+REPEATS = 3
+THRESHOLD = 0.25
+# memory growth below this (MiB) is allocator noise and never a regression.
+MEMORY_FLOOR = 1.0
+BASELINE = os.path.join(os.path.dirname(__file__), 'baseline.json')
+
+# side length of the square the instances are drawn from.
+EXTENT = 1000.0
+
+
+""" Instances """
+
+def create_instance(demands: int, facilities: int, seed: int = 0) -> tuple[np.ndarray, np.ndarray]:
+    """ Function to draw a seeded instance of Demand points around Facility-sized clusters.
+
+    Args:
+        demands (int): Number of Demand points.
+        facilities (int): Number of Facilities.
+        seed (int, optional): Seed of the instance. Defaults to 0.
+
+    Returns:
+        tuple[np.ndarray, np.ndarray]: (N, 2) Demand and (K, 2) Facility locations.
+    """
+    rng = np.random.default_rng(seed)
+    clusters = rng.uniform(0, EXTENT, size=(facilities, 2))
+    points = clusters[rng.integers(0, facilities, size=demands)] + rng.normal(0, EXTENT / 20, size=(demands, 2))
+    centers = rng.uniform(0, EXTENT, size=(facilities, 2))
+    return np.round(points, 3), np.round(centers, 3)
+
+def create_objects(points: np.ndarray, centers: np.ndarray, connect: bool = False) -> tuple[list[Demand], list[Facility]]:
+    """ Function to create the Demand and Facility instances (optionally connected round-robin). """
+    demands = [Demand(i, tuple(x)) for i, x in enumerate(points.tolist())]
+    facilities = [Facility(i, tuple(x), openingCosts=EXTENT / 10) for i, x in enumerate(centers.tolist())]
+
+    if connect:
+        for i, demand in enumerate(demands):
+            facilities[i % len(facilities)].add_demand(demand)
+
+    return demands, facilities
+
+def create_payload(points: np.ndarray, centers: np.ndarray, parameter: dict) -> dict:
+    """ Function to create the JSON payload of the calculation endpoints. """
+    return {
+        'demands': [{'demandID': i, 'location': x} for i, x in enumerate(points.tolist())],
+        'facilities': [{'facilityID': i, 'location': x, 'connection': [], 'openingCosts': EXTENT / 10} for i, x in enumerate(centers.tolist())],
+        'parameter': parameter
+    }
+
+
+""" Cases """
+
+def offline_case(points: np.ndarray, centers: np.ndarray, iterations: int, metric: str, client: TestClient):
+    parameter = {'iterations': iterations, 'metric': metric}
+
+    def run(demands: list[Demand], facilities: list[Facility]) -> None:
+        solver = OfflineFacilitySolver(demands, facilities, parameter)
+        solver.calculate_costs()
+        solver.cluster_algorithm()
+
+    return (lambda: create_objects(points, centers)), run
+
+def online_case(points: np.ndarray, centers: np.ndarray, iterations: int, metric: str, client: TestClient):
+    parameter = {'probability': 1.0, 'openingCosts': EXTENT / 10, 'metric': metric}
+
+    def run(demands: list[Demand], facilities: list[Facility]) -> None:
+        OnlineFacilitySolver(facilities=facilities, parameter=parameter, seed=0).meyerson_batch(demands)
+
+    return (lambda: create_objects(points, centers)), run
+
+def costs_case(points: np.ndarray, centers: np.ndarray, iterations: int, metric: str, client: TestClient):
+    parameter = {'iterations': iterations, 'metric': metric}
+
+    def setup() -> tuple[OfflineFacilitySolver]:
+        return (OfflineFacilitySolver(*create_objects(points, centers, connect=True), parameter),)
+
+    return setup, lambda solver: solver.recalculate_costs()
+
+def offline_endpoint_case(points: np.ndarray, centers: np.ndarray, iterations: int, metric: str, client: TestClient):
+    payload = create_payload(points, centers, {'iterations': iterations, 'metric': metric})
+
+    def setup() -> tuple:
+        # timing the solves, not the result cache.
+        offline_cache.clear()
+        return ()
+
+    def run() -> None:
+        response = client.post("/offline_facility_location", json=payload)
+        assert response.json()['code'] == 200
+
+    return setup, run
+
+def online_endpoint_case(points: np.ndarray, centers: np.ndarray, iterations: int, metric: str, client: TestClient):
+    payload = create_payload(points, centers, {'probability': 1.0, 'openingCosts': EXTENT / 10, 'metric': metric})
+    payload = {'demands': payload['demands'], 'parameter': payload['parameter'], 'seed': 0}
+
+    def run() -> None:
+        response = client.post("/online_facility_location/batch", json=payload)
+        assert response.json()['code'] == 200
+
+    return (lambda: ()), run
+
+# cases and whether they depend on the number of iterations.
+CASE_FUNCTIONS = {
+    'offline': (offline_case, True),
+    'online': (online_case, False),
+    'costs': (costs_case, False),
+    'offline_endpoint': (offline_endpoint_case, True),
+    'online_endpoint': (online_endpoint_case, False)
+}
+
+
+""" Measurement """
+
+def measure(setup, run, repeats: int = REPEATS) -> dict:
+    """ Function to time a case and trace its peak memory in an extra run.
+
+    Args:
+        setup (callable): Function returning fresh arguments of run (not timed).
+        run (callable): Function to measure.
+        repeats (int, optional): Number of timed runs. Defaults to REPEATS.
+
+    Returns:
+        dict: median and best wall time in seconds and the traced peak memory in MiB.
+    """
+    times = []
+    for _ in range(repeats):
+        args = setup()
+        start = time.perf_counter()
+        run(*args)
+        times.append(time.perf_counter() - start)
+
+    # tracing slows the run down, so the peak memory is taken separately.
+    args = setup()
+    tracemalloc.start()
+    run(*args)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return {'median': float(np.median(times)), 'best': float(np.min(times)), 'peak_mb': peak / 2 ** 20}
+
+def run_suite(demands: list[int], facilities: list[int], iterations: list[int], metrics: list[str], cases: list[str], repeats: int = REPEATS) -> dict:
+    """ Function to run all cases over the grid of instance sizes.
+
+    Returns:
+        dict: results by case key, e.g. 'offline/n=1000/k=10/it=10/euclidean'.
+    """
+    client = TestClient(app)
+    results = {}
+
+    for n, k, metric in itertools.product(demands, facilities, metrics):
+        points, centers = create_instance(n, k)
+
+        for case in cases:
+            function, iterative = CASE_FUNCTIONS[case]
+            for it in (iterations if iterative else [None]):
+                key = f"{case}/n={n}/k={k}/it={it if it is not None else '-'}/{metric}"
+                setup, run = function(points, centers, it, metric, client)
+
+                # warming up imports, pools and caches.
+                run(*setup())
+
+                result = measure(setup, run, repeats)
+                result['throughput'] = n / result['median']
+                results[key] = result
+                print(f"{key:<45} {result['median'] * 1000:>10.1f} ms {result['throughput']:>12.0f} demands/s {result['peak_mb']:>8.1f} MiB")
+
+    return results
+
+def compare(results: dict, baseline: dict, threshold: float = THRESHOLD, memory_floor: float = MEMORY_FLOOR) -> list[str]:
+    """ Function to compare results with a baseline.
+
+    Args:
+        results (dict): Current results by case key.
+        baseline (dict): Baseline results by case key.
+        threshold (float, optional): Allowed relative slowdown / memory growth. Defaults to THRESHOLD.
+        memory_floor (float, optional): Ignored absolute memory growth in MiB. Defaults to MEMORY_FLOOR.
+
+    Returns:
+        list[str]: regression messages.
+    """
+    regressions = []
+    for key, result in results.items():
+        reference = baseline.get(key)
+        if reference is None:
+            continue
+
+        for metric in ('median', 'peak_mb'):
+            ratio = result[metric] / reference[metric] if reference[metric] > 0 else 1.0
+            if metric == 'peak_mb' and result[metric] - reference[metric] < memory_floor:
+                continue
+            if ratio > 1 + threshold:
+                regressions.append(f"{key}: {metric} {reference[metric]:.4g} -> {result[metric]:.4g} ({ratio:.2f}x)")
+
+    return regressions
+
+
+""" Benchmark """
+
+if __name__ == "__main__":
+    # Terminal: python -m benchmarks.suite [--update-baseline]
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--demands', type=int, nargs='+', default=DEMANDS)
+    parser.add_argument('--facilities', type=int, nargs='+', default=FACILITIES)
+    parser.add_argument('--iterations', type=int, nargs='+', default=ITERATIONS)
+    parser.add_argument('--metrics', nargs='+', default=METRICS, choices=METRICS)
+    parser.add_argument('--cases', nargs='+', default=CASES, choices=CASES)
+    parser.add_argument('--repeats', type=int, default=REPEATS)
+    parser.add_argument('--threshold', type=float, default=THRESHOLD, help="Allowed relative regression (0.25 = 25%%)")
+    parser.add_argument('--memory-floor', type=float, default=MEMORY_FLOOR, help="Ignored peak memory growth in MiB")
+    parser.add_argument('--baseline', default=BASELINE, help="Baseline file to compare with")
+    parser.add_argument('--output', default=None, help="File to write the results to")
+    parser.add_argument('--update-baseline', action='store_true', help="Write the results to the baseline file")
+    parser.add_argument('--processes', type=int, default=0, help="Solver pool processes of the endpoint cases (0 = in-process)")
+    args = parser.parse_args()
+
+    # in-process solves keep the endpoint timings and peak memory comparable.
+    solver_pool.processes = args.processes
+    logging.getLogger('httpx').setLevel(logging.WARNING)
+
+    results = run_suite(args.demands, args.facilities, args.iterations, args.metrics, args.cases, args.repeats)
+    report = {
+        'environment': {'python': platform.python_version(), 'numpy': np.__version__, 'machine': platform.machine()},
+        'results': results
+    }
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as file:
+            json.dump(report, file, indent=2)
+
+    if args.update_baseline:
+        with open(args.baseline, 'w', encoding='utf-8') as file:
+            json.dump(report, file, indent=2)
+        print(f"Baseline written to [{args.baseline}]")
+        sys.exit(0)
+
+    if not os.path.exists(args.baseline):
+        print(f"No baseline at [{args.baseline}], run with --update-baseline first")
+        sys.exit(0)
+
+    with open(args.baseline, encoding='utf-8') as file:
+        baseline = json.load(file)
+
+    regressions = compare(results, baseline['results'], args.threshold, args.memory_floor)
+    for regression in regressions:
+        print(f"REGRESSION {regression}")
+    print(f"{len(regressions)} regressions over a threshold of [{args.threshold:.0%}]")
+    sys.exit(1 if regressions else 0)
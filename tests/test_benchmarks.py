@@ -0,0 +1,27 @@
+from benchmarks.suite import compare, run_suite
+
+
+""" Test """
+
+class TestBenchmarkSuite:
+    """ Unit Test for the Benchmark Suite """
+
+    def test_compare(self) -> None:
+        """ Testing the regression threshold against a baseline """
+        baseline = {'offline/n=10': {'median': 1.0, 'peak_mb': 2.0}}
+
+        assert compare({'offline/n=10': {'median': 1.2, 'peak_mb': 2.0}}, baseline, threshold=0.25) == []
+        assert len(compare({'offline/n=10': {'median': 1.3, 'peak_mb': 3.6}}, baseline, threshold=0.25)) == 2
+        assert compare({'online/n=10': {'median': 9.0, 'peak_mb': 9.0}}, baseline) == []
+
+        # sub-MiB growth is allocator noise, whatever its ratio.
+        small = {'costs/n=10': {'median': 1.0, 'peak_mb': 0.0015}}
+        assert compare({'costs/n=10': {'median': 1.0, 'peak_mb': 0.01}}, small, threshold=0.25) == []
+        assert len(compare({'costs/n=10': {'median': 1.0, 'peak_mb': 1.5}}, small, threshold=0.25)) == 1
+
+    def test_run_suite(self) -> None:
+        """ Testing a small grid of all cases """
+        results = run_suite([50], [3], [2], ['manhattan'], ['offline', 'online', 'costs', 'offline_endpoint', 'online_endpoint'], repeats=1)
+
+        assert len(results) == 5
+        assert all(x['median'] > 0 and x['throughput'] > 0 for x in results.values())
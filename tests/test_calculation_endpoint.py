@@ -1,11 +1,21 @@
+import asyncio
 import pytest
 from fastapi import status
 from fastapi.testclient import TestClient
 from app.api import app
+from app.model.progress import report
+from app.services.execution import SolverPool
 
 
 """ Test """
 
+def spin_rounds() -> None:
+    """ Solve function reporting rounds until it is stopped """
+    i = 0
+    while True:
+        i += 1
+        report(i, 0.0)
+
 @pytest.fixture
 def client():
     """ Generate Test Client """
@@ -54,7 +64,7 @@ class TestFacilityLocationEndpoint:
             "facilities": [{"facilityID": 0, "location": [0, 0], "connection": [1], "openingCosts": 10.0}],
             "parameter": {
                 "probability": 1.0,
-                "openingCosts": 0.0,
+                "openingCosts": 0.5,
                 "costs": 10,
                 "metric": "euclidean"
             }
@@ -71,9 +81,9 @@ class TestFacilityLocationEndpoint:
         assert data["code"] == 200
         data = data['data']
 
-        assert data['data']['costs']['current'] == 10
+        assert data['data']['costs']['current'] == 10.5
         assert data['data']['costs']['previous'] == 10
-        assert data['data']['costs']['delta'] == 0
+        assert data['data']['costs']['delta'] == 0.5
 
         assert len(data['demands']) == 2
         assert len(data['facilities']) == 2
@@ -140,3 +150,343 @@ class TestFacilityLocationEndpoint:
 
         assert len(data['demands']) == 2
         assert len(data['facilities']) == 1
+
+    def test_invalid_payload(self, client):
+        """Testing the 422 response for malformed demands, facilities and parameters"""
+        payload = {
+            "demands": [{"demandID": 1, "location": [0, 0]}],
+            "facilities": [{"facilityID": 0, "location": [0, 0], "connection": [1], "openingCosts": 10.0}],
+            "parameter": {"iterations": 10, "metric": "euclidean"}
+        }
+        assert client.post("/offline_facility_location", json=payload).status_code == status.HTTP_200_OK
+
+        invalid = [
+            {**payload, "demands": [{"demandID": 1}]},
+            {**payload, "demands": [{"demandID": 1, "location": [0, 0, 0]}]},
+            {**payload, "facilities": [{"facilityID": 0, "location": [0, 0], "openingCosts": -1.0}]},
+            {**payload, "parameter": {"iterations": 10, "metric": "chebyshev"}},
+            {**payload, "parameter": {"iterations": -1}}
+        ]
+        for data in invalid:
+            assert client.post("/offline_facility_location", json=data).status_code == 422
+
+        online = {"demand": {"demandID": "a", "location": [0, 0]}, "demands": [], "facilities": []}
+        assert client.post("/online_facility_location", json=online).status_code == 422
+
+        online = {"demand": {"demandID": 2, "location": [0, 0]}, "demands": [], "facilities": [], "parameter": {"openingCosts": 0.0}}
+        assert client.post("/online_facility_location", json=online).status_code == 422
+
+    def test_offline_two_clusters(self, client):
+        """Testing POST /offline_facility_location endpoint"""
+        payload = {
+            "demands": [
+                {"demandID": 1, "location": [0, 0]}, {"demandID": 2, "location": [2, 0]},
+                {"demandID": 3, "location": [10, 10]}, {"demandID": 4, "location": [10, 12]}
+            ],
+            "facilities": [
+                {"facilityID": 0, "location": [1, 1], "connection": [], "openingCosts": 10.0},
+                {"facilityID": 1, "location": [9, 9], "connection": [], "openingCosts": 10.0}
+            ],
+            "parameter": {
+                "iterations": 5,
+                "openingCosts": 10.0,
+                "costs": 10,
+                "metric": "manhattan"
+            }
+        }
+        response = client.post("/offline_facility_location", json=payload)
+
+        assert response.status_code == status.HTTP_200_OK
+        data = response.json()['data']
+
+        assert data['facilities'][0]['location'] == [1.0, 0.0]
+        assert data['facilities'][0]['connection'] == [1, 2]
+        assert data['facilities'][1]['location'] == [10.0, 11.0]
+        assert data['facilities'][1]['connection'] == [3, 4]
+        assert data['data']['costs']['current'] == 24
+
+    def test_offline_ufl(self, client):
+        """Testing POST /offline_facility_location endpoint with the UFL engine"""
+        payload = {
+            "demands": [{"demandID": i, "location": [100 * (i % 2) + i % 5, i % 3]} for i in range(20)],
+            "facilities": [
+                {"facilityID": 7, "location": [2, 1], "connection": [], "openingCosts": 5.0},
+                {"facilityID": 8, "location": [50, 50], "connection": [], "openingCosts": 5.0}
+            ],
+            "parameter": {"engine": "ufl", "candidates": "demands", "openingCosts": 10.0, "iterations": 50}
+        }
+        response = client.post("/offline_facility_location", json=payload)
+
+        assert response.status_code == status.HTTP_200_OK
+        data = response.json()['data']
+
+        # the remote Facility is closed and a Demand site opens at the right cluster.
+        ids = [x['facilityID'] for x in data['facilities']]
+        assert 7 in ids and 8 not in ids and len(ids) == 2
+        assert max(ids) >= 9
+        assert sorted(x for f in data['facilities'] for x in f['connection']) == list(range(20))
+        assert data['data']['trace'][-1] == pytest.approx(data['data']['costs']['current'])
+
+        columns = {
+            "demands": {"ids": [x['demandID'] for x in payload['demands']], "xs": [x['location'][0] for x in payload['demands']], "ys": [x['location'][1] for x in payload['demands']]},
+            "facilities": {"ids": [7, 8], "xs": [2, 50], "ys": [1, 50], "openingCosts": [5.0, 5.0]},
+            "parameter": payload['parameter']
+        }
+        response = client.post("/offline_facility_location", json=columns, headers={"Content-Type": "application/vnd.facility.columnar+json", "Accept": "application/json"})
+        assert response.json()['data']['facilities'] == data['facilities']
+        assert data['data']['memory']['budgetBytes'] > 0
+
+        # a demands x candidates matrix above the memory budget is solved on partly cached tiles.
+        payload['demands'] = [{"demandID": i, "location": [i % 50, i // 50]} for i in range(2100)]
+        payload['parameter']['iterations'] = 5
+        response = client.post("/offline_facility_location", json=payload).json()
+        assert response['code'] == 200
+        memory = response['data']['data']['memory']
+        assert memory['cachedTiles'] < memory['tiles']
+        assert memory['peakBytes'] <= memory['budgetBytes']
+        assert sorted(x for f in response['data']['facilities'] for x in f['connection']) == list(range(2100))
+
+    def test_haversine(self, client):
+        """Testing the haversine metric on (longitude, latitude) locations"""
+        payload = {
+            "demands": [
+                {"demandID": 1, "location": [179.5, 0]}, {"demandID": 2, "location": [-179.5, 0]},
+                {"demandID": 3, "location": [13.4, 52.5]}, {"demandID": 4, "location": [13.4, 52.6]}
+            ],
+            "facilities": [
+                {"facilityID": 0, "location": [170, 5], "connection": [], "openingCosts": 10.0},
+                {"facilityID": 1, "location": [10, 50], "connection": [], "openingCosts": 10.0}
+            ],
+            "parameter": {"iterations": 5, "metric": "haversine"}
+        }
+        data = client.post("/offline_facility_location", json=payload).json()['data']
+
+        assert abs(data['facilities'][0]['location'][0]) == pytest.approx(180.0)
+        assert data['facilities'][0]['connection'] == [1, 2]
+        assert data['facilities'][1]['location'] == pytest.approx([13.4, 52.55], abs=1e-3)
+        assert data['data']['costs']['current'] == pytest.approx(20 + 2 * 55.6 + 2 * 5.56, abs=0.1)
+
+        # the online solver uses the spherical index.
+        payload = {
+            "demands": [{"demandID": i, "location": [13.4 + i / 100, 52.5]} for i in range(20)],
+            "parameter": {"probability": 1.0, "openingCosts": 5.0, "metric": "haversine"},
+            "seed": 0
+        }
+        data = client.post("/online_facility_location/batch", json=payload).json()['data']
+        assert len(data['decisions']) == 20
+        assigned = [x['distance'] for x in data['decisions'] if not x['opened']]
+        opened = sum(x['opened'] for x in data['decisions'])
+        assert data['data']['costs']['current'] == pytest.approx(5.0 * opened + sum(assigned))
+        assert data['decisions'][1]['distance'] == pytest.approx(0.6769, abs=1e-3)
+
+        # (x, y) locations outside of the longitude / latitude ranges are rejected.
+        payload['demands'][3]['location'] = [13.4, 95.0]
+        response = client.post("/online_facility_location/batch", json=payload)
+        assert response.status_code == 422
+        assert "latitude" in response.json()['detail'][0]['msg']
+        payload['parameter']['metric'] = 'euclidean'
+        assert client.post("/online_facility_location/batch", json=payload).json()['code'] == 200
+
+        columns = {
+            "demands": {"ids": [0], "xs": [200.0], "ys": [0.0]},
+            "facilities": {"ids": [0], "xs": [0.0], "ys": [0.0]},
+            "parameter": {"metric": "haversine"}
+        }
+        response = client.post("/offline_facility_location", json=columns, headers={"Content-Type": "application/vnd.facility.columnar+json"})
+        assert response.status_code == 422
+
+    def test_online_batch(self, client):
+        """Testing POST /online_facility_location/batch endpoint"""
+        payload = {
+            "demands": [{"demandID": i, "location": [i * 7 % 50, i * 13 % 50]} for i in range(40)],
+            "parameter": {
+                "probability": 1.0,
+                "openingCosts": 60.0,
+                "costs": 1,
+                "metric": "euclidean"
+            },
+            "seed": 11
+        }
+        first = client.post("/online_facility_location/batch", json=payload).json()
+        second = client.post("/online_facility_location/batch", json=payload).json()
+
+        assert first["code"] == 200
+        data = first['data']
+
+        assert len(data['decisions']) == 40
+        assert data['decisions'][0]['opened']
+        assert sum(x['opened'] for x in data['decisions']) == len(data['facilities'])
+        assert all(0 <= x['probability'] <= 1 for x in data['decisions'])
+        assert first['data'] == second['data']
+
+    def test_online_batch_ndjson(self, client):
+        """Testing POST /online_facility_location/batch endpoint with an NDJSON stream"""
+        lines = [
+            '{"parameter": {"probability": 1.0, "openingCosts": 1000000.0, "metric": "manhattan"}, "seed": 1}',
+            '{"demandID": 1, "location": [0, 0]}',
+            '{"demandID": 2, "location": [3, 4]}'
+        ]
+        response = client.post(
+            "/online_facility_location/batch",
+            content="\n".join(lines),
+            headers={"Content-Type": "application/x-ndjson"}
+        )
+
+        assert response.status_code == status.HTTP_200_OK
+        data = response.json()['data']
+
+        assert [x['opened'] for x in data['decisions']] == [True, False]
+        assert data['data']['costs']['current'] == 1000007
+
+    def test_online_batch_invalid(self, client):
+        """Testing POST /online_facility_location/batch endpoint with an invalid stream"""
+        response = client.post(
+            "/online_facility_location/batch",
+            content='{"demandID": 1, "location": [0, 0]}\nnot json',
+            headers={"Content-Type": "application/x-ndjson"}
+        )
+
+        assert response.status_code == 422
+
+    def test_online_ensemble(self, client):
+        """Testing POST /online_facility_location/ensemble endpoint"""
+        payload = {
+            "demands": [{"demandID": i, "location": [i * 7 % 50, i * 13 % 50]} for i in range(40)],
+            "parameter": {"probability": 1.0, "openingCosts": 60.0},
+            "runs": 20,
+            "seed": 3,
+            "shuffle": True,
+            "percentiles": [10, 90]
+        }
+        first = client.post("/online_facility_location/ensemble", json=payload).json()
+        second = client.post("/online_facility_location/ensemble", json=payload).json()
+
+        assert first["code"] == 200
+        data = first['data']
+
+        assert data['runs'] == 20
+        assert set(data['costs']['percentiles']) == {'10', '90'}
+        assert data['costs']['min'] <= data['costs']['mean'] <= data['costs']['max']
+        assert data['best']['costs'] == data['costs']['min']
+        assert len(data['best']['facilities']) >= 1
+        assert sum(len(x['connection']) for x in data['best']['facilities']) == 40
+        assert first['data'] == second['data']
+
+        # several groups of runs in one worker, the first 20 runs are the same seeds.
+        larger = client.post("/online_facility_location/ensemble", json={**payload, "runs": 150}).json()['data']
+        assert larger['runs'] == 150
+        assert larger['costs']['min'] <= data['costs']['min']
+        assert sum(len(x['connection']) for x in larger['best']['facilities']) == 40
+
+        response = client.post("/online_facility_location/ensemble", json={**payload, "runs": 0})
+        assert response.status_code == 422
+
+    def test_offline_convergence(self, client):
+        """Testing POST /offline_facility_location endpoint early stopping"""
+        payload = {
+            "demands": [{"demandID": i, "location": [i % 7, i // 7]} for i in range(49)],
+            "facilities": [
+                {"facilityID": 0, "location": [0, 0], "connection": [], "openingCosts": 10.0},
+                {"facilityID": 1, "location": [6, 6], "connection": [], "openingCosts": 10.0}
+            ],
+            "parameter": {
+                "iterations": 100,
+                "openingCosts": 10.0,
+                "costs": 10,
+                "metric": "euclidean"
+            }
+        }
+        data = client.post("/offline_facility_location", json=payload).json()['data']['data']
+
+        assert 1 < data['iterations'] < 100
+        assert len(data['trace']) == data['iterations']
+        assert data['trace'][-1] == pytest.approx(data['costs']['current'])
+        assert data['trace'] == sorted(data['trace'], reverse=True)
+
+        payload['parameter']['tolerance'] = 1e6
+        data = client.post("/offline_facility_location", json=payload).json()['data']['data']
+
+        assert data['iterations'] == 1
+
+    def test_offline_restarts(self, client):
+        """Testing the restarts fanned out across the solver pool against the sequential solve"""
+        from app.model.columnar import ColumnarInstance
+        from app.validation.messages import OfflineFacility
+        payload = {
+            "demands": [{"demandID": i, "location": [(i * 37) % 101, (i * 59) % 97]} for i in range(120)],
+            "facilities": [{"facilityID": j, "location": [0, 0], "openingCosts": 5.0} for j in range(4)],
+            "parameter": {"iterations": 20, "init": "kmeans++", "restarts": 4, "seed": 3}
+        }
+        data = client.post("/offline_facility_location", json=payload).json()['data']
+        assert data['data']['restarts'] == 4
+
+        # the cheapest restart matches the one-after-another solve with the same seeds.
+        request = OfflineFacility.model_validate(payload)
+        instance = ColumnarInstance.from_models(request.demands, request.facilities)
+        expected = instance.cluster(request.parameter.model_dump())
+        assert data['data']['costs'] == pytest.approx(expected['costs'])
+        assert [x['location'] for x in data['facilities']] == instance.centers.tolist()
+
+        # restarts of a deterministic solve collapse to one and report it.
+        payload['parameter'].update(init="request", restarts=3)
+        data = client.post("/offline_facility_location", json=payload).json()['data']
+        assert data['data']['restarts'] == 1
+
+    def test_solver_timeout(self, client, monkeypatch):
+        """Testing the per-request solver timeout"""
+        from app.services.execution import solver_pool
+        monkeypatch.setattr(solver_pool, "timeout", 0)
+
+        payload = {
+            "demands": [{"demandID": 1, "location": [0, 0]}],
+            "facilities": [{"facilityID": 0, "location": [0, 0], "connection": [], "openingCosts": 10.0}],
+            "parameter": {"iterations": 10, "metric": "euclidean"}
+        }
+        response = client.post("/offline_facility_location", json=payload)
+
+        assert response.status_code == status.HTTP_504_GATEWAY_TIMEOUT
+        assert response.json()['code'] == 504
+
+    def test_timeout_frees_worker(self):
+        """Testing that a timed-out solve stops and frees its worker"""
+        pool = SolverPool(1, timeout=0.5)
+        try:
+            with pytest.raises(asyncio.TimeoutError):
+                asyncio.run(pool.run(spin_rounds))
+
+            # the single worker takes the next solve instead of spinning on.
+            assert asyncio.run(pool.run(abs, -3, timeout=10)) == 3
+        finally:
+            pool.shutdown(wait=False)
+
+    def test_lifespan_pool(self):
+        """Testing the solver pool lifecycle on app lifespan events"""
+        from app.services.execution import solver_pool
+
+        with TestClient(app) as client:
+            assert solver_pool.pool is not None
+            assert client.get("/ping").json() == "pong"
+
+        assert solver_pool.pool is None
+
+    def test_offline_cache(self, client):
+        """Testing the /offline_facility_location result cache"""
+        from app.services.cache import offline_cache
+
+        payload = {
+            "demands": [{"demandID": 1, "location": [0, 0]}, {"demandID": 2, "location": [4, 2]}],
+            "facilities": [{"facilityID": 0, "location": [1, 1], "connection": [], "openingCosts": 3.0}],
+            "parameter": {"iterations": 3, "metric": "manhattan", "costs": 1}
+        }
+        hits = offline_cache.hits
+        first = client.post("/offline_facility_location", json=payload)
+        second = client.post("/offline_facility_location", json={**payload, "parameter": {"costs": 1, "metric": "manhattan", "iterations": 3}})
+
+        assert first.headers['X-Cache'] == 'MISS'
+        assert second.headers['X-Cache'] == 'HIT'
+        assert offline_cache.hits == hits + 1
+        assert first.json() == second.json()
+
+        # randomized solves without a seed bypass the cache.
+        payload['parameter']['init'] = 'kmeans++'
+        assert 'X-Cache' not in client.post("/offline_facility_location", json=payload).headers
@@ -0,0 +1,98 @@
+import io
+import os
+import json
+import numpy as np
+import pytest
+from fastapi import status
+from fastapi.testclient import TestClient
+from app.api import app
+from app.services.datasets import DatasetStore, datasets
+
+
+""" Test """
+
+@pytest.fixture
+def client(tmp_path, monkeypatch):
+    """ Generate Test Client with an empty dataset store """
+    monkeypatch.setattr(datasets, 'directory', str(tmp_path))
+    return TestClient(app)
+
+@pytest.fixture
+def demands():
+    """ Generate random demands """
+    rng = np.random.default_rng(3)
+    return [{"demandID": i, "location": x} for i, x in enumerate(rng.integers(0, 100, size=(50, 2)).tolist())]
+
+class TestDatasetEndpoint:
+    """ Unit Test for the Dataset Endpoints """
+
+    def test_offline_dataset(self, client, demands):
+        """Testing an offline request referencing an uploaded dataset"""
+        facilities = [{"facilityID": 0, "location": [10, 10], "openingCosts": 10.0}, {"facilityID": 1, "location": [90, 90], "openingCosts": 10.0}]
+        parameter = {"iterations": 10, "metric": "manhattan"}
+        expected = client.post("/offline_facility_location", json={"demands": demands, "facilities": facilities, "parameter": parameter}).json()
+
+        response = client.post("/datasets", json={"demands": demands})
+        assert response.status_code == status.HTTP_200_OK
+        info = response.json()['data']
+        assert info['demands'] == 50 and info['bytes'] > 50 * 24
+
+        # the stored arrays are opened memory-mapped.
+        ids, points = datasets.open(info['datasetID'])
+        assert isinstance(points, np.memmap) and points.shape == (50, 2)
+
+        data = client.post("/offline_facility_location", json={"dataset": info['datasetID'], "facilities": facilities, "parameter": parameter}).json()
+        assert data['data']['demands'] == expected['data']['demands']
+        assert data['data']['facilities'] == expected['data']['facilities']
+        assert data['data']['data']['costs'] == pytest.approx(expected['data']['data']['costs'])
+
+    def test_online_dataset(self, client, demands):
+        """Testing an online request referencing an uploaded dataset (columnar and .npz uploads)"""
+        buffer = io.BytesIO()
+        np.savez(buffer, **{"demands.ids": np.arange(50), "demands.xs": np.array([x['location'][0] for x in demands]), "demands.ys": np.array([x['location'][1] for x in demands])})
+        npz = client.post("/datasets", content=buffer.getvalue(), headers={"Content-Type": "application/x-npz"}).json()['data']
+        columns = {"ids": list(range(50)), "xs": [x['location'][0] for x in demands], "ys": [x['location'][1] for x in demands]}
+        columnar = client.post("/datasets", content=json.dumps({"demands": columns}), headers={"Content-Type": "application/vnd.facility.columnar+json"}).json()['data']
+
+        payload = {"demand": {"demandID": 50, "location": [3, 4]}, "facilities": [], "parameter": {"probability": 1.0, "openingCosts": 10.0}}
+        expected = client.post("/online_facility_location", json={**payload, "demands": demands}).json()
+        for info in (npz, columnar):
+            data = client.post("/online_facility_location", json={**payload, "dataset": info['datasetID']}).json()
+            assert data['data']['demands'] == expected['data']['demands']
+            assert data['data']['data']['costs'] == expected['data']['data']['costs']
+
+    def test_invalid_dataset(self, client, demands):
+        """Testing unknown, deleted and conflicting dataset references"""
+        datasetID = client.post("/datasets", json={"demands": demands}).json()['data']['datasetID']
+        assert client.get(f"/datasets/{datasetID}").json()['data']['demands'] == 50
+
+        conflict = {"dataset": datasetID, "demands": demands, "facilities": []}
+        assert client.post("/offline_facility_location", json=conflict).status_code == 422
+        assert client.post("/offline_facility_location", json={"facilities": []}).status_code == 422
+        assert client.post("/datasets", json={"demands": [{"demandID": 1}]}).status_code == 422
+
+        assert client.delete(f"/datasets/{datasetID}").json()['code'] == 200
+        assert client.delete(f"/datasets/{datasetID}").json()['code'] == 404
+        assert client.get("/datasets/unknown").json()['code'] == 404
+        assert client.post("/offline_facility_location", json={"dataset": datasetID, "facilities": []}).json()['code'] == 404
+
+    def test_store_eviction(self, tmp_path):
+        """Testing the dataset limit of the store"""
+        store = DatasetStore(str(tmp_path), limit=2)
+        first = store.create(np.arange(3), np.zeros((3, 2)))
+        second = store.create(np.arange(4), np.ones((4, 2)))
+        third = store.create(np.arange(5), np.ones((5, 2)))
+
+        assert len(store) == 2
+        assert store.info(first) is None
+        assert store.info(second)['demands'] == 4 and store.info(third)['demands'] == 5
+        assert store.path("not-an-id") is None
+
+        # staging directories of crashed uploads are swept, running uploads are kept.
+        stale, running = tmp_path / '.upload-stale', tmp_path / '.upload-running'
+        stale.mkdir()
+        running.mkdir()
+        os.utime(stale, (0, 0))
+        store.evict()
+        assert not stale.exists() and running.exists()
+        assert len(store) == 2
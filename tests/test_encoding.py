@@ -0,0 +1,162 @@
+import io
+import json
+import numpy as np
+import pytest
+from fastapi.testclient import TestClient
+from app.api import app
+from app.services.encoding import NumpyJSONResponse
+from app.validation.messages import ErrorResponse
+
+
+""" Test """
+
+COLUMNAR = "application/vnd.facility.columnar+json"
+NPZ = "application/x-npz"
+
+@pytest.fixture
+def client():
+    """ Generate Test Client """
+    return TestClient(app)
+
+@pytest.fixture
+def payload():
+    """ Generate a random offline instance """
+    rng = np.random.default_rng(5)
+    points = rng.integers(0, 100, size=(60, 2)).tolist()
+    return {
+        "demands": [{"demandID": i, "location": x} for i, x in enumerate(points)],
+        "facilities": [
+            {"facilityID": 0, "location": [10, 10], "connection": [0, 1, 2, 99], "openingCosts": 10.0},
+            {"facilityID": 1, "location": [50, 50], "connection": [3, 3], "openingCosts": 10.0},
+            {"facilityID": 2, "location": [90, 90], "connection": [], "openingCosts": 10.0}
+        ],
+        "parameter": {"iterations": 20, "metric": "manhattan"}
+    }
+
+def to_columns(payload: dict) -> dict:
+    demands, facilities = payload['demands'], payload['facilities']
+    return {
+        "demands": {"ids": [x['demandID'] for x in demands], "xs": [x['location'][0] for x in demands], "ys": [x['location'][1] for x in demands]},
+        "facilities": {
+            "ids": [x['facilityID'] for x in facilities],
+            "xs": [x['location'][0] for x in facilities],
+            "ys": [x['location'][1] for x in facilities],
+            "openingCosts": [x['openingCosts'] for x in facilities],
+            "connection": [x['connection'] for x in facilities]
+        },
+        "parameter": payload['parameter']
+    }
+
+def to_npz(columns: dict) -> bytes:
+    arrays = {f"{group}.{key}": np.array(value) for group in ('demands', 'facilities') for key, value in columns[group].items() if key != 'connection'}
+    arrays['facilities.connection'] = np.array([x for row in columns['facilities']['connection'] for x in row], dtype=np.int64)
+    arrays['facilities.connectionCounts'] = np.array([len(row) for row in columns['facilities']['connection']], dtype=np.int64)
+    arrays['parameter'] = np.array(json.dumps(columns['parameter']))
+
+    buffer = io.BytesIO()
+    np.savez(buffer, **arrays)
+    return buffer.getvalue()
+
+class TestEncoding:
+    """ Unit Test for the columnar and binary encodings """
+
+    def test_offline_encodings(self, client, payload):
+        """ Testing that all encodings solve the offline instance alike """
+        expected = client.post("/offline_facility_location", json=payload).json()
+        columns = to_columns(payload)
+
+        # default request, columnar response.
+        response = client.post("/offline_facility_location", json=payload, headers={"Accept": COLUMNAR})
+        assert response.headers['content-type'] == COLUMNAR
+        data = response.json()['data']
+        assert data['facilities']['connection'] == [x['connection'] for x in expected['data']['facilities']]
+        assert data['data']['costs'] == pytest.approx(expected['data']['data']['costs'])
+        assert data['data']['iterations'] == expected['data']['data']['iterations']
+
+        # columnar request, default response.
+        response = client.post("/offline_facility_location", content=json.dumps(columns), headers={"Content-Type": COLUMNAR, "Accept": "application/json"})
+        data = response.json()['data']
+        assert data['facilities'] == expected['data']['facilities']
+        assert data['data']['costs'] == pytest.approx(expected['data']['data']['costs'])
+
+        # binary request and response.
+        response = client.post("/offline_facility_location", content=to_npz(columns), headers={"Content-Type": NPZ})
+        assert response.headers['content-type'] == NPZ
+        with np.load(io.BytesIO(response.content)) as archive:
+            counts = archive['facilities.connectionCounts']
+            assert counts.tolist() == [len(x['connection']) for x in expected['data']['facilities']]
+            assert archive['facilities.xs'].tolist() == [x['location'][0] for x in expected['data']['facilities']]
+            assert json.loads(str(archive['data']))['costs'] == pytest.approx(expected['data']['data']['costs'])
+
+    def test_offline_restarts(self, client, payload):
+        """ Testing that the restarts of encoded requests keep the same cheapest solve """
+        payload['parameter'].update(init="kmeans++", restarts=3, seed=4)
+        expected = client.post("/offline_facility_location", json=payload).json()['data']['data']
+        columns = to_columns(payload)
+
+        response = client.post("/offline_facility_location", content=json.dumps(columns), headers={"Content-Type": COLUMNAR})
+        assert response.json()['data']['data']['costs'] == pytest.approx(expected['costs'])
+
+        response = client.post("/offline_facility_location", content=to_npz(columns), headers={"Content-Type": NPZ})
+        with np.load(io.BytesIO(response.content)) as archive:
+            data = json.loads(str(archive['data']))
+            assert data['restarts'] == 3
+            assert data['costs'] == pytest.approx(expected['costs'])
+
+    def test_online_columnar(self, client):
+        """ Testing a columnar online request """
+        payload = {
+            "demand": {"demandID": 2, "location": [3, 4]},
+            "demands": {"ids": [1], "xs": [0], "ys": [0]},
+            "facilities": {"ids": [0], "xs": [0], "ys": [0], "openingCosts": [10.0], "connection": [[1]]},
+            "parameter": {"probability": 1.0, "openingCosts": 1000000.0, "metric": "euclidean"}
+        }
+        response = client.post("/online_facility_location", content=json.dumps(payload), headers={"Content-Type": COLUMNAR})
+        data = response.json()['data']
+
+        assert data['demands']['ids'] == [1, 2]
+        assert data['facilities']['connection'] == [[1, 2]]
+        assert data['data']['costs']['current'] == 15
+
+    def test_invalid_encodings(self, client, payload):
+        """ Testing the 422 response for malformed columnar and binary bodies """
+        columns = to_columns(payload)
+        columns['demands']['xs'] = columns['demands']['xs'][:-1]
+        response = client.post("/offline_facility_location", content=json.dumps(columns), headers={"Content-Type": COLUMNAR})
+        assert response.status_code == 422
+
+        response = client.post("/offline_facility_location", content=b"not an archive", headers={"Content-Type": NPZ})
+        assert response.status_code == 422
+
+        # connection counts not adding up to the connections.
+        with np.load(io.BytesIO(to_npz(to_columns(payload)))) as archive:
+            arrays = dict(archive)
+        arrays['facilities.connectionCounts'] = np.array([4, 2, 1])
+        buffer = io.BytesIO()
+        np.savez(buffer, **arrays)
+        response = client.post("/offline_facility_location", content=buffer.getvalue(), headers={"Content-Type": NPZ})
+        assert response.status_code == 422
+
+        # haversine locations outside of longitude / latitude.
+        columns = to_columns(payload)
+        columns['demands']['ys'][0] = -120.0
+        columns['parameter'] = {**columns['parameter'], 'metric': 'haversine'}
+        response = client.post("/offline_facility_location", content=to_npz(columns), headers={"Content-Type": NPZ})
+        assert response.status_code == 422
+
+    def test_numpy_response(self):
+        """ Testing the NumPy-aware JSON response """
+        content = {
+            'costs': np.float64(1.5),
+            'iterations': np.int64(3),
+            'location': (np.float64(1.0), 2),
+            'trace': np.array([3.0, 2.0]),
+            'error': ErrorResponse(msg="error")
+        }
+        assert json.loads(NumpyJSONResponse(content).body) == {
+            'costs': 1.5,
+            'iterations': 3,
+            'location': [1.0, 2],
+            'trace': [3.0, 2.0],
+            'error': {'msg': "error", 'code': 400, 'data': None}
+        }
@@ -0,0 +1,120 @@
+import time
+import numpy as np
+import pytest
+from fastapi import status
+from fastapi.testclient import TestClient
+from app.api import app
+from app.model.progress import report
+from app.services.jobs import JobQueue
+
+
+""" Test """
+
+@pytest.fixture
+def client():
+    """ Generate Test Client """
+    return TestClient(app)
+
+def poll(client, jobID: str, timeout: float = 30.0) -> dict:
+    """ Poll a job until it is finished """
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        job = client.get(f"/jobs/{jobID}").json()['data']
+        if job['status'] in ('completed', 'failed', 'cancelled'):
+            return job
+        time.sleep(0.05)
+    raise TimeoutError(jobID)
+
+def rounds(n: int = 10000) -> dict:
+    """ Solve function reporting n rounds (runs on the job pool) """
+    for i in range(1, n + 1):
+        report(i, 1.0 / i)
+        time.sleep(0.001)
+    return {"msg": "done", "code": 200, "data": list(range(n))}
+
+def wait(queue: JobQueue, jobID: str, states: tuple, timeout: float = 30.0):
+    """ Wait until a job reached one of the states """
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        job = queue.get(jobID)
+        if job.status in states:
+            return job
+        time.sleep(0.01)
+    raise TimeoutError(jobID)
+
+class TestJobsEndpoint:
+    """ Unit Test for the asynchronous Job Endpoints """
+
+    def test_offline_job(self, client):
+        """Testing POST /jobs/offline_facility_location against the synchronous endpoint"""
+        rng = np.random.default_rng(5)
+        payload = {
+            "demands": [{"demandID": i, "location": x} for i, x in enumerate(rng.integers(0, 100, size=(200, 2)).tolist())],
+            "facilities": [{"facilityID": i, "location": x, "openingCosts": 10.0} for i, x in enumerate(rng.integers(0, 100, size=(5, 2)).tolist())],
+            "parameter": {"iterations": 20, "metric": "euclidean"}
+        }
+        expected = client.post("/offline_facility_location", json=payload).json()
+
+        response = client.post("/jobs/offline_facility_location", json=payload)
+        assert response.status_code == status.HTTP_200_OK
+        accepted = response.json()
+        assert accepted['code'] == 202 and accepted['data']['status'] in ('queued', 'running', 'completed')
+
+        job = poll(client, accepted['data']['jobID'])
+        assert job['status'] == 'completed' and job['error'] is None
+        assert job['progress']['iterations'] == 20
+        assert job['progress']['iteration'] == len(job['result']['data']['data']['trace']) - 1
+        assert job['progress']['cost'] == pytest.approx(job['result']['data']['data']['trace'][-1])
+        assert job['result']['data']['facilities'] == expected['data']['facilities']
+
+    def test_unknown_job(self, client):
+        """Testing unknown jobs and invalid submissions"""
+        assert client.get("/jobs/unknown").json()['code'] == 404
+        assert client.delete("/jobs/unknown").json()['code'] == 404
+        assert client.post("/jobs/offline_facility_location", json={"facilities": []}).status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
+
+    def test_job_queue(self):
+        """Testing the queue limit, cooperative cancellation and the result expiry"""
+        now = [0.0]
+        queue = JobQueue(workers=1, limit=1, ttl=60.0, clock=lambda: now[0])
+
+        # the progress of the job process is shared with the queue.
+        running = queue.submit(rounds)
+        wait(queue, running.jobID, ('running',))
+        queued = queue.submit(rounds)
+        assert queued.status == 'queued'
+        assert queue.submit(rounds) is None
+
+        # the queued job never starts a round, the running one stops between two rounds.
+        queue.cancel(queued.jobID)
+        queue.cancel(running.jobID)
+        wait(queue, running.jobID, ('cancelled',))
+        assert wait(queue, queued.jobID, ('cancelled',)).progress['iteration'] == 0
+        assert running.result is None
+        assert 0 < running.progress['iteration'] < 10000
+        assert queue.stats()['cancelled'] == 2
+
+        # finished jobs expire after the ttl.
+        now[0] = 61.0
+        assert queue.get(running.jobID) is None and len(queue) == 0
+        queue.shutdown()
+
+    def test_job_retention(self):
+        """Testing the limits of the retained job results"""
+        queue = JobQueue(workers=1, limit=4, max_results=2, max_bytes=1000)
+        try:
+            jobs = [queue.submit(rounds, 5) for _ in range(3)]
+            for job in jobs:
+                wait(queue, job.jobID, ('completed',))
+
+            # only the latest finished jobs are kept.
+            assert queue.get(jobs[0].jobID) is None
+            assert queue.get(jobs[2].jobID).to_json()['result']['data'] == list(range(5))
+            assert queue.stats()['completed'] == 2 and 0 < queue.stats()['bytes'] <= 1000
+
+            # a result above the byte limit is not stored.
+            large = wait(queue, queue.submit(rounds, 500).jobID, ('completed', 'failed'))
+            assert large.status == 'failed' and large.result is None and 'bytes' in large.error
+
+        finally:
+            queue.shutdown()
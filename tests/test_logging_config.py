@@ -0,0 +1,64 @@
+import logging
+import contextvars
+
+from app.config.logging_config import create_logger, log_level, LOG_LEVEL
+from app.model.model import Demand, Facility
+from app.services.solvers import solve_online_batch
+from app.validation.messages import OnlineBatch
+
+
+""" Test """
+
+class Counter:
+    """ Object counting how often it is formatted """
+    def __init__(self):
+        self.calls = 0
+
+    def __str__(self) -> str:
+        self.calls += 1
+        return "counter"
+
+
+class TestLoggingConfig:
+    """ Unit Test for the request-scoped Logger """
+
+    def test_context_level(self) -> None:
+        """ Testing that setLevel only changes the level of the current context """
+        logger = create_logger()
+
+        def request(level: str) -> int:
+            logger.setLevel(level.upper())
+            return logger.getEffectiveLevel()
+
+        assert contextvars.copy_context().run(request, "debug") == logging.DEBUG
+        assert contextvars.copy_context().run(request, "error") == logging.ERROR
+        assert LOG_LEVEL.get() == logging.INFO
+
+        with log_level("warning"):
+            assert not logger.isEnabledFor(logging.INFO)
+        assert logger.isEnabledFor(logging.INFO)
+
+    def test_solve_level(self) -> None:
+        """ Testing that a solve with its own log level restores the level of the worker """
+        data = OnlineBatch(demands=[{"demandID": 1, "location": [0, 0]}], parameter={"openingCosts": 5.0}, seed=1)
+        assert solve_online_batch(data, "debug")['code'] == 200
+        assert LOG_LEVEL.get() == logging.INFO
+
+    def test_lazy_formatting(self, caplog) -> None:
+        """ Testing that disabled hot-path messages are never formatted """
+        logger = create_logger()
+        counter = Counter()
+
+        with caplog.at_level(logging.DEBUG):
+            logger.debug("value=%s", counter)
+            assert counter.calls == 0 and not caplog.records
+
+            with log_level("debug"):
+                logger.debug("value=%s", counter)
+            assert counter.calls > 0 and len(caplog.records) == 1
+
+            # the solver hot path stays silent at the default level.
+            facility = Facility(1, (0, 0))
+            facility.add_demand(Demand(1, (1, 1)))
+            facility.reset_demand()
+            assert len(caplog.records) == 1
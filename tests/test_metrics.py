@@ -0,0 +1,77 @@
+import re
+import pytest
+from fastapi.testclient import TestClient
+from app.api import app
+from app.services.metrics import Metric, PHASES
+
+
+""" Test """
+
+@pytest.fixture
+def client():
+    """ Generate Test Client """
+    return TestClient(app)
+
+def sample(text: str, name: str, **labels) -> float:
+    """ Read a single sample of the Prometheus text format """
+    for line in text.splitlines():
+        match = re.fullmatch(rf'{name}(?:\{{(.*)\}})? (\S+)', line)
+        if match and dict(re.findall(r'(\w+)="([^"]*)"', match.group(1) or '')) == labels:
+            return float(match.group(2))
+    return 0.0
+
+class TestMetrics:
+    """ Unit Test for the /health and /metrics endpoints """
+
+    def test_health(self, client):
+        """ Testing GET /health endpoint """
+        response = client.get("/health")
+        assert response.status_code == 200
+
+        data = response.json()['data']
+        assert data['status'] == "ok"
+        assert data['inFlight'] == 1
+        assert set(data['cache']) == {'entries', 'bytes', 'hits', 'misses'}
+
+    def test_request_metrics(self, client):
+        """ Testing the request, phase and instance size metrics of a solved request """
+        payload = {
+            "demands": [{"demandID": i, "location": [i, i % 7]} for i in range(50)],
+            "facilities": [{"facilityID": 0, "location": [0, 0], "openingCosts": 1.0}, {"facilityID": 1, "location": [40, 5], "openingCosts": 1.0}],
+            "parameter": {"iterations": 5, "seed": 3, "init": "kmeans++"}
+        }
+        before = client.get("/metrics").text
+        assert client.post("/offline_facility_location", json=payload).json()['code'] == 200
+        client.get("/does_not_exist")
+
+        response = client.get("/metrics")
+        assert response.headers['content-type'].startswith("text/plain")
+        text = response.text
+
+        route = "/offline_facility_location"
+        labels = {'method': "POST", 'route': route, 'status': "200"}
+        assert sample(text, 'http_requests_total', **labels) == sample(before, 'http_requests_total', **labels) + 1
+        assert sample(text, 'http_requests_total', method="GET", route="unmatched", status="404") >= 1
+        assert sample(text, 'http_request_duration_seconds_count', method="POST", route=route) >= 1
+        assert sample(text, 'http_requests_in_flight') == 1
+
+        # phases of the route and of the pool worker.
+        for name in PHASES:
+            assert sample(text, 'solver_phase_duration_seconds_count', phase=name, route=route) >= 1
+        assert sample(text, 'solver_instance_size_sum', kind="demands", route=route) >= 50
+        assert 'result_cache_misses_total' in text
+
+    def test_histogram(self):
+        """ Testing the cumulative buckets of a histogram """
+        metric = Metric('latency', 'histogram', "Latency.", (0.1, 1.0))
+        for value in (0.05, 0.5, 5.0):
+            metric.observe(value, route="/")
+
+        assert metric.render()[2:] == [
+            'latency_bucket{route="/",le="0.1"} 1',
+            'latency_bucket{route="/",le="1"} 2',
+            'latency_bucket{route="/",le="+Inf"} 3',
+            'latency_sum{route="/"} 5.55',
+            'latency_count{route="/"} 3'
+        ]
+        assert metric.get(route="/") == 3
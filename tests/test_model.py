@@ -0,0 +1,34 @@
+import logging
+from app.model.model import Demand, Facility
+from app.validation.messages import FacilityModel
+
+
+""" Test """
+
+class TestFacility:
+    """ Unit Test for the Facility Class """
+
+    def test_duplicate_demand(self, caplog) -> None:
+        """ Testing the duplicate Demand warning """
+        facility = Facility(0, (0, 0))
+        demand = Demand(1, (1, 1))
+
+        assert facility.add_demand(demand)
+        with caplog.at_level(logging.WARNING):
+            assert not facility.add_demand(Demand(1, (2, 2)))
+
+        assert "already served" in caplog.text
+        assert facility.to_json()['connection'] == [1]
+
+        facility.reset_demand()
+        assert not facility.check_demand(demand)
+
+    def test_from_request_index(self) -> None:
+        """ Testing Facility.from_request with a demandID index """
+        demands = [Demand(i, (i, i)) for i in range(5)]
+        index = {x.demandID: x for x in demands}
+        data = FacilityModel(facilityID=3, location=(0, 0), connection=[4, 1, 9], openingCosts=1.0)
+
+        facility = Facility().from_request(data, index)
+        assert facility.to_json()['connection'] == [4, 1]
+        assert Facility().from_request(data, demands).to_json()['connection'] == [4, 1]
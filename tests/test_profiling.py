@@ -0,0 +1,92 @@
+import pstats
+import pytest
+from fastapi.testclient import TestClient
+from app.api import app
+from app.routes import calculation
+
+
+""" Test """
+
+@pytest.fixture
+def client():
+    """ Generate Test Client """
+    return TestClient(app)
+
+@pytest.fixture
+def payload():
+    """ Generate an offline instance """
+    return {
+        "demands": [{"demandID": i, "location": [i, (i * 7) % 13]} for i in range(40)],
+        "facilities": [{"facilityID": 0, "location": [0, 0], "openingCosts": 1.0}, {"facilityID": 1, "location": [30, 5], "openingCosts": 1.0}],
+        "parameter": {"iterations": 5}
+    }
+
+class TestProfiling:
+    """ Unit Test for the per-request profiling """
+
+    def test_disabled(self, client, payload, monkeypatch):
+        """ Testing that profiling is rejected unless enabled """
+        monkeypatch.setattr(calculation, 'PROFILING', False)
+        data = client.post("/offline_facility_location?profile=inline", json=payload).json()
+        assert data['code'] == 403
+
+        response = client.post("/offline_facility_location?profile=everything", json=payload)
+        assert response.status_code == 422
+
+    def test_inline(self, client, payload, monkeypatch):
+        """ Testing the inline profile report of an offline request """
+        monkeypatch.setattr(calculation, 'PROFILING', True)
+        expected = client.post("/offline_facility_location", json=payload).json()
+
+        response = client.post("/offline_facility_location?profile=inline", json=payload)
+        assert response.headers.get('x-cache') is None
+        data = response.json()
+        assert data['data'] == expected['data']
+
+        report = data['profile']
+        assert report['profileID'] == response.headers['x-profile-id']
+        assert report['functions'] and report['total'] > 0
+        assert {'parse', 'construction', 'costs', 'solve'} <= set(report['phases'])
+        assert report['counters']['iterations'] == expected['data']['data']['iterations']
+        assert report['counters']['distanceEvaluations'] >= 40 * 2 * report['counters']['iterations']
+
+    def test_store(self, client, monkeypatch, tmp_path):
+        """ Testing the stored profile and its pstats download """
+        monkeypatch.setattr(calculation, 'PROFILING', True)
+        payload = {
+            "demands": [{"demandID": i, "location": [i, i]} for i in range(10)],
+            "parameter": {"probability": 1.0, "openingCosts": 5.0},
+            "seed": 1
+        }
+        response = client.post("/online_facility_location/batch?profile=store", json=payload)
+        assert 'profile' not in response.json()
+        profileID = response.headers['x-profile-id']
+
+        report = client.get(f"/profiles/{profileID}").json()['data']
+        assert report['counters']['arrivals'] == 10
+
+        # the download loads as a regular .prof file.
+        path = tmp_path / "profile.prof"
+        path.write_bytes(client.get(f"/profiles/{profileID}/pstats").content)
+        assert any(name == 'meyerson_batch' for _, _, name in pstats.Stats(str(path)).stats)
+
+        assert client.get("/profiles/unknown").json()['code'] == 404
+
+    def test_online_index(self, client, monkeypatch, tmp_path):
+        """ Testing that /online_facility_location finds the nearest Facility through the grid index """
+        monkeypatch.setattr(calculation, 'PROFILING', True)
+        payload = {
+            "demand": {"demandID": 5, "location": [3, 4]},
+            "demands": [{"demandID": i, "location": [i, i]} for i in range(5)],
+            "facilities": [{"facilityID": 0, "location": [0, 0], "connection": [0, 1, 2]}, {"facilityID": 1, "location": [4, 4], "connection": [3, 4]}],
+            "parameter": {"probability": 0.0, "openingCosts": 5.0}
+        }
+        response = client.post("/online_facility_location?profile=store", json=payload)
+        assert response.json()['data']['facilities'][1]['connection'] == [3, 4, 5]
+
+        path = tmp_path / "profile.prof"
+        path.write_bytes(client.get(f"/profiles/{response.headers['x-profile-id']}/pstats").content)
+        stats = pstats.Stats(str(path)).stats
+        assert any(name == 'nearest' and file.endswith('index.py') for file, _, name in stats)
+        assert not any(name == 'pairwise_distances' and caller[2] == 'meyerson'
+                       for (_, _, name), (*_, callers) in stats.items() for caller in callers)
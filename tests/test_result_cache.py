@@ -0,0 +1,39 @@
+from app.services.cache import ResultCache
+from app.validation.messages import OfflineFacility
+
+
+""" Test """
+
+class TestResultCache:
+    """ Unit Test for the Result Cache """
+
+    def test_canonical_key(self) -> None:
+        """ Testing that the key ignores the parameter order """
+        first = OfflineFacility(demands=[], facilities=[], parameter={'iterations': 1, 'metric': 'euclidean'})
+        second = OfflineFacility(demands=[], facilities=[], parameter={'metric': 'euclidean', 'iterations': 1})
+        third = OfflineFacility(demands=[], facilities=[], parameter={'metric': 'manhattan', 'iterations': 1})
+
+        assert ResultCache.key(first) == ResultCache.key(second)
+        assert ResultCache.key(first) != ResultCache.key(third)
+
+    def test_limits(self) -> None:
+        """ Testing the byte-size cap, the LRU eviction and the TTL """
+        now = [0.0]
+        cache = ResultCache(max_entries=3, max_bytes=10, ttl=5.0, clock=lambda: now[0])
+
+        cache.put('a', b'1234')
+        cache.put('b', b'1234')
+        assert cache.get('a') == b'1234'
+
+        # the byte cap evicts the least recently used entry.
+        cache.put('c', b'1234')
+        assert cache.get('b') is None
+        assert cache.size == 8
+
+        # oversized results are not stored.
+        cache.put('d', b'x' * 11)
+        assert cache.get('d') is None
+
+        now[0] = 5.0
+        assert cache.get('a') is None
+        assert cache.stats() == {'entries': 1, 'bytes': 4, 'hits': 1, 'misses': 3}
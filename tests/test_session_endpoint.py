@@ -0,0 +1,185 @@
+import pytest
+from fastapi import status, WebSocketDisconnect
+from fastapi.testclient import TestClient
+from app.api import app
+from app.services.sessions import SessionStore, sessions
+
+
+""" Test """
+
+@pytest.fixture
+def client():
+    """ Generate Test Client """
+    return TestClient(app)
+
+class TestSessionEndpoint:
+    """ Unit Test for the Online Session Endpoints """
+
+    def test_session_demands(self, client):
+        """Testing POST /online_sessions and /online_sessions/{sessionID}/demand endpoints"""
+        payload = {
+            "parameter": {
+                "probability": 1.0,
+                "openingCosts": 1000000.0,
+                "costs": 1,
+                "metric": "euclidean"
+            }
+        }
+        response = client.post("/online_sessions", json=payload)
+
+        assert response.status_code == status.HTTP_200_OK
+        data = response.json()
+        assert data["code"] == 200
+        sessionID = data['data']['sessionID']
+
+        response = client.post(f"/online_sessions/{sessionID}/demand", json={"demand": {"demandID": 1, "location": [0, 0]}})
+        data = response.json()['data']
+
+        assert data['decision']['opened']
+        assert data['decision']['facilityID'] == 0
+        assert data['costs']['current'] == 1000000
+
+        response = client.post(f"/online_sessions/{sessionID}/demand", json={"demand": {"demandID": 2, "location": [3, 4]}})
+        data = response.json()['data']
+
+        assert not data['decision']['opened']
+        assert data['decision']['facilityID'] == 0
+        assert data['decision']['distance'] == 5
+        assert data['costs']['delta'] == 5
+
+        response = client.get(f"/online_sessions/{sessionID}")
+        data = response.json()['data']
+
+        assert len(data['demands']) == 2
+        assert data['facilities'][0]['connection'] == [1, 2]
+
+        response = client.delete(f"/online_sessions/{sessionID}")
+        assert response.json()['code'] == 200
+
+        response = client.get(f"/online_sessions/{sessionID}")
+        assert response.json()['code'] == 404
+
+    def test_session_initial_state(self, client):
+        """Testing POST /online_sessions endpoint with previous points"""
+        payload = {
+            "demands": [{"demandID": 1, "location": [0, 0]}],
+            "facilities": [{"facilityID": 0, "location": [0, 0], "connection": [1], "openingCosts": 10.0}],
+            "parameter": {
+                "probability": 1.0,
+                "openingCosts": 10.0,
+                "costs": 1,
+                "metric": "euclidean"
+            }
+        }
+        data = client.post("/online_sessions", json=payload).json()['data']
+
+        assert data['costs']['current'] == 10
+
+    def test_unknown_session(self, client):
+        """Testing POST /online_sessions/{sessionID}/demand endpoint with an unknown session"""
+        response = client.post("/online_sessions/unknown/demand", json={"demand": {"demandID": 1, "location": [0, 0]}})
+        assert response.json()['code'] == 404
+
+    def test_session_socket(self, client):
+        """Testing the /online_sessions/ws WebSocket"""
+        payload = {
+            "demands": [{"demandID": 1, "location": [0, 0]}],
+            "facilities": [{"facilityID": 0, "location": [0, 0], "connection": [1], "openingCosts": 1000000.0}],
+            "parameter": {
+                "probability": 1.0,
+                "openingCosts": 1000000.0,
+                "costs": 1,
+                "metric": "euclidean"
+            }
+        }
+        with client.websocket_connect("/online_sessions/ws") as websocket:
+            websocket.send_json(payload)
+            data = websocket.receive_json()
+            assert data['code'] == 200 and data['data']['costs']['current'] == 1000000
+
+            websocket.send_json({"demand": {"demandID": 2, "location": [3, 4]}})
+            data = websocket.receive_json()['data']
+            assert data['decision'] == {'demandID': 2, 'facilityID': 0, 'opened': False, 'coin': False, 'probability': 0.0, 'distance': 5.0}
+            assert data['costs']['delta'] == 5
+
+            # invalid messages keep the connection and the solver state.
+            websocket.send_text('{"demand": {"demandID": "x"}}')
+            assert websocket.receive_json()['code'] == 422
+            websocket.send_json({"demand": {"demandID": 3, "location": [6, 8]}})
+            data = websocket.receive_json()['data']
+            assert data['decision']['facilityID'] == 0 and data['decision']['distance'] == 10
+            assert data['costs']['current'] == 1000015
+
+    def test_session_geo_locations(self, client):
+        """Testing that demands of a haversine session and socket are checked against longitude / latitude"""
+        payload = {"parameter": {"probability": 1.0, "openingCosts": 1000.0, "metric": "haversine"}}
+        sessionID = client.post("/online_sessions", json=payload).json()['data']['sessionID']
+
+        response = client.post(f"/online_sessions/{sessionID}/demand", json={"demand": {"demandID": 1, "location": [200, 0]}})
+        assert response.status_code == 422
+        response = client.post(f"/online_sessions/{sessionID}/demand", json={"demand": {"demandID": 1, "location": [13.4, 52.5]}})
+        assert response.json()['code'] == 200
+        client.delete(f"/online_sessions/{sessionID}")
+
+        with client.websocket_connect("/online_sessions/ws") as websocket:
+            websocket.send_json(payload)
+            assert websocket.receive_json()['code'] == 200
+
+            websocket.send_json({"demand": {"demandID": 1, "location": [0, 95]}})
+            assert websocket.receive_json()['code'] == 422
+            websocket.send_json({"demand": {"demandID": 1, "location": [2.35, 48.86]}})
+            data = websocket.receive_json()
+            assert data['code'] == 200 and data['data']['decision']['opened']
+
+    def test_session_socket_invalid(self, client):
+        """Testing the /online_sessions/ws WebSocket with an invalid first message"""
+        with client.websocket_connect("/online_sessions/ws") as websocket:
+            websocket.send_json({"parameter": {"metric": "unknown"}})
+            assert websocket.receive_json()['code'] == 422
+
+    def test_session_socket_limits(self, client, monkeypatch):
+        """Testing the socket limit and the idle timeout of the /online_sessions/ws WebSocket"""
+        monkeypatch.setattr(sessions, 'limit', 1)
+        monkeypatch.setattr(sessions, 'ttl', 0.2)
+
+        with client.websocket_connect("/online_sessions/ws") as websocket:
+            websocket.send_json({})
+            assert websocket.receive_json()['code'] == 200
+
+            # a second socket exceeds the limit.
+            with client.websocket_connect("/online_sessions/ws") as rejected:
+                assert rejected.receive_json()['code'] == 429
+                with pytest.raises(WebSocketDisconnect) as closed:
+                    rejected.receive_json()
+                assert closed.value.code == 1013
+
+            # the idle socket is closed and released.
+            with pytest.raises(WebSocketDisconnect) as closed:
+                websocket.receive_json()
+            assert closed.value.code == 1001
+        assert sessions.sockets == 0
+
+class TestSessionStore:
+    """ Unit Test for the Session Store """
+
+    def test_ttl_and_lru(self) -> None:
+        """ Testing idle-TTL and LRU eviction """
+        now = [0.0]
+        store = SessionStore(limit=2, ttl=10.0, clock=lambda: now[0])
+
+        first = store.create('first')
+        second = store.create('second')
+        now[0] = 5.0
+        assert store.get(first.sessionID).solver == 'first'
+
+        # the least recently used session is evicted.
+        third = store.create('third')
+        assert store.get(second.sessionID) is None
+        assert len(store) == 2
+
+        # idle sessions expire.
+        now[0] = 8.0
+        assert store.get(third.sessionID) is not None
+        now[0] = 16.0
+        assert store.get(first.sessionID) is None
+        assert store.get(third.sessionID) is not None
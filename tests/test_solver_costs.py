@@ -0,0 +1,181 @@
+import random
+import itertools
+import pytest
+import numpy as np
+from app.model.model import Demand, Facility
+from app.model.online_facility import OnlineFacilitySolver
+from app.model.offline_facility import OfflineFacilitySolver, restart_count
+from app.model.columnar import ColumnarInstance
+from app.model.ensemble import meyerson_runs, meyerson_ensemble
+from app.model.ufl import LocalSearchEngine
+from app.validation.messages import DemandModel, FacilityModel
+
+
+""" Test """
+
+class TestSolverCosts:
+    """ Unit Test for the running cost totals """
+
+    @pytest.mark.parametrize("metric", ["euclidean", "manhattan"])
+    def test_online_running_costs(self, metric) -> None:
+        """ Testing the Meyerson running costs against a full recompute """
+        rng = random.Random(3)
+        solver = OnlineFacilitySolver(parameter={'probability': 1.0, 'openingCosts': 25.0, 'metric': metric})
+
+        for i in range(200):
+            solver.meyerson_algorithm(Demand(i, (rng.uniform(-50, 50), rng.uniform(-50, 50))))
+            assert solver.costs['current'] == pytest.approx(sum(solver.recalculate_costs()))
+
+    @pytest.mark.parametrize("metric", ["euclidean", "haversine"])
+    def test_online_arrays(self, metric) -> None:
+        """ Testing the array Meyerson step against the object solver """
+        rng = random.Random(5)
+        parameter = {'probability': 1.0, 'openingCosts': 300.0, 'metric': metric}
+
+        for seed in range(30):
+            demands = [DemandModel(demandID=i, location=(rng.uniform(-20, 20), rng.uniform(-20, 20))) for i in range(rng.randint(0, 12))]
+            facilities = [FacilityModel(facilityID=j, location=(rng.uniform(-20, 20), rng.uniform(-20, 20)), openingCosts=5.0,
+                                        connection=rng.sample(range(15), rng.randint(0, 4))) for j in range(rng.randint(0, 3))]
+            demand = DemandModel(demandID=rng.choice([99, 1]), location=(rng.uniform(-20, 20), rng.uniform(-20, 20)))
+
+            instances = [Demand().from_request(x) for x in demands]
+            index = {x.demandID: x for x in instances}
+            solver = OnlineFacilitySolver(instances, [Facility().from_request(x, index) for x in facilities], parameter, seed=seed)
+            solver.calculate_costs()
+            decision = solver.meyerson_algorithm(Demand().from_request(demand))
+
+            instance = ColumnarInstance.from_models(demands, facilities)
+            result = instance.meyerson(demand.demandID, demand.location, parameter, random.Random(seed))
+            assert result['decision'] == pytest.approx(decision)
+            assert result['costs'] == pytest.approx(solver.costs)
+            assert instance.to_json() == ([x.to_json() for x in solver.demands], [x.to_json() for x in solver.facilities])
+
+    def test_online_initial_costs(self) -> None:
+        """ Testing the running costs of a solver built from request data """
+        demands = [Demand(1, (0, 0)), Demand(2, (3, 4))]
+        facilities = [Facility(0, (0, 0), demands=list(demands), openingCosts=10.0)]
+        solver = OnlineFacilitySolver(demands, facilities, {'probability': 1.0, 'openingCosts': 10.0, 'metric': 'euclidean'})
+
+        assert solver.calculate_costs()['current'] == 15.0
+
+    def test_offline_running_costs(self) -> None:
+        """ Testing the k-Means running costs against a full recompute """
+        rng = random.Random(5)
+        demands = [Demand(i, (rng.uniform(-50, 50), rng.uniform(-50, 50))) for i in range(100)]
+        facilities = [Facility(i, (rng.uniform(-50, 50), rng.uniform(-50, 50)), openingCosts=5.0) for i in range(4)]
+        solver = OfflineFacilitySolver(demands, facilities, {'iterations': 5, 'metric': 'euclidean', 'debugCosts': True})
+        solver.cluster_algorithm()
+
+        assert solver.costs['current'] == pytest.approx(sum(solver.recalculate_costs()))
+
+    def test_offline_minibatch(self) -> None:
+        """ Testing the mini-batch mode on well separated clusters """
+        rng = random.Random(9)
+        centers = [(-100, -100), (0, 100), (100, -100)]
+        demands = [Demand(i, (centers[i % 3][0] + rng.gauss(0, 3), centers[i % 3][1] + rng.gauss(0, 3))) for i in range(3000)]
+        facilities = [Facility(i, (x + 20, y - 20), openingCosts=5.0) for i, (x, y) in enumerate(centers)]
+        parameter = {'iterations': 50, 'metric': 'euclidean', 'mode': 'minibatch', 'batchSize': 128, 'seed': 1}
+        solver = OfflineFacilitySolver(demands, facilities, parameter)
+        solver.cluster_algorithm()
+
+        assert solver.iterations == 50
+        assert sum(len(x.demands) for x in solver.facilities) == 3000
+        for facility, (x, y) in zip(solver.facilities, centers):
+            assert abs(facility.location[0] - x) < 2 and abs(facility.location[1] - y) < 2
+        assert solver.costs['current'] == pytest.approx(sum(solver.recalculate_costs()))
+
+    @pytest.mark.parametrize("init", ["kmeans++", "meyerson"])
+    def test_offline_seeding_restarts(self, init) -> None:
+        """ Testing seeded initializations with restarts """
+        rng = random.Random(13)
+        centers = [(-100, -100), (0, 100), (100, -100), (100, 100)]
+        demands = [Demand(i, (centers[i % 4][0] + rng.gauss(0, 2), centers[i % 4][1] + rng.gauss(0, 2))) for i in range(400)]
+        parameter = {'iterations': 20, 'metric': 'euclidean', 'init': init, 'restarts': 3, 'seed': 2, 'openingCosts': 50.0}
+
+        costs = []
+        for _ in range(2):
+            facilities = [Facility(i, (0, 0), openingCosts=5.0) for i in range(4)]
+            solver = OfflineFacilitySolver(list(demands), facilities, parameter)
+            solver.cluster_algorithm()
+            costs.append(solver.costs['current'])
+
+        assert costs[0] == costs[1]
+        assert costs[0] < 20 + 400 * 4
+        assert costs[0] == pytest.approx(sum(solver.recalculate_costs()))
+
+    def test_offline_deterministic_restarts(self) -> None:
+        """ Testing that restarts of a deterministic solve collapse to one """
+        assert restart_count({'restarts': 5}) == 1
+        assert restart_count({'restarts': 5, 'init': 'kmeans++'}) == 5
+        assert restart_count({'restarts': 5, 'mode': 'minibatch'}) == 5
+        assert restart_count({'restarts': 5, 'init': 'kmeans++', 'engine': 'ufl'}) == 1
+
+    @pytest.mark.parametrize("shuffle", [False, True])
+    def test_online_ensemble(self, shuffle) -> None:
+        """ Testing the batched Meyerson runs against single runs and the best run's instance """
+        rng = np.random.default_rng(17)
+        instance = ColumnarInstance(np.arange(150), rng.uniform(-50, 50, (150, 2)), [100], [[0, 0]], [7.0])
+        parameter = {'probability': 1.0, 'openingCosts': 25.0, 'metric': 'euclidean'}
+        seeds = np.random.SeedSequence(4).spawn(70)
+
+        # every run only depends on its own seed.
+        batched = meyerson_runs(instance.points, instance.centers, parameter, seeds, shuffle=shuffle)
+        single = meyerson_runs(instance.points, instance.centers, parameter, [seeds[69]], shuffle=shuffle)
+        assert batched['costs'][69] == single['costs'][0]
+        assert batched['facilities'][69] == single['facilities'][0]
+
+        result = meyerson_ensemble(instance, parameter, runs=70, seed=4, shuffle=shuffle)
+        assert result['costs']['min'] == pytest.approx(7.0 + batched['costs'].min())
+        assert result['costs']['min'] <= result['costs']['percentiles']['50'] <= result['costs']['max']
+
+        # the replayed best run is a consistent instance.
+        best = result['best']
+        solved = ColumnarInstance.from_models([DemandModel(**x) for x in best['demands']], [FacilityModel(**x) for x in best['facilities']])
+        assert sum(solved.recalculate_costs()) == pytest.approx(best['costs'])
+        assert sorted(best['order']) == list(range(150))
+        assert best['facilities'][0]['facilityID'] == 100
+
+    @pytest.mark.parametrize("metric", ["euclidean", "haversine"])
+    def test_offline_ufl(self, metric) -> None:
+        """ Testing the UFL engine against the exhaustive optimum and the running costs """
+        rng = np.random.default_rng(21)
+        points, sites, costs = rng.uniform(-20, 20, (40, 2)), rng.uniform(-20, 20, (8, 2)), rng.uniform(5, 60, 8)
+        engine = LocalSearchEngine(points, sites, costs, metric=metric)
+        engine.run(100)
+
+        distances = engine.distance_matrix()
+        optimum = min(costs[list(x)].sum() + distances[:, list(x)].min(axis=1).sum()
+                      for r in range(1, 9) for x in itertools.combinations(range(8), r))
+        assert engine.cost == pytest.approx(optimum)
+        assert all(b < a for a, b in zip(engine.trace, engine.trace[1:]))
+
+        demands = [Demand(i, tuple(x)) for i, x in enumerate(points.tolist())]
+        facilities = [Facility(10 + i, tuple(x), openingCosts=c) for i, (x, c) in enumerate(zip(sites.tolist(), costs.tolist()))]
+        solver = OfflineFacilitySolver(demands, facilities, {'engine': 'ufl', 'iterations': 100, 'metric': metric, 'debugCosts': True})
+        solver.cluster_algorithm()
+
+        assert solver.costs['current'] == pytest.approx(optimum)
+        assert solver.costs['current'] == pytest.approx(sum(solver.recalculate_costs()))
+        assert sum(len(x.demands) for x in solver.facilities) == 40
+        assert {x.facilityID for x in solver.facilities} == {10 + i for i in np.flatnonzero(engine.open)}
+
+        # the cached tiles, the temporaries and the swap savings stay within the budget.
+        assert engine.memory()['peakBytes'] <= engine.memory()['budgetBytes']
+        assert engine.memory()['cachedTiles'] == engine.memory()['tiles']
+
+        # a budget below the full matrix recomputes the tiles beyond the cache.
+        tiled = LocalSearchEngine(points, sites, costs, metric=metric, budget=40 * 8 * 8)
+        tiled.run(100)
+        assert 0 < tiled.memory()['cachedTiles'] < tiled.memory()['tiles']
+        assert tiled.memory()['peakBytes'] <= tiled.memory()['budgetBytes']
+        assert tiled.cost == pytest.approx(engine.cost)
+        assert tiled.open.tolist() == engine.open.tolist()
+
+        # without room for the swap savings a round only tries add and drop moves.
+        small = LocalSearchEngine(points[:8], sites, costs, metric=metric, budget=2 * 8 * 8 * 8)
+        small.open[:] = True
+        small.connect()
+        assert small.gains()[2] is None
+        assert small.nearest == pytest.approx(small.distance_matrix().min(axis=1))
+        small.run(100)
+        assert small.memory()['peakBytes'] <= small.memory()['budgetBytes']
@@ -0,0 +1,106 @@
+import random
+import pytest
+import numpy as np
+from app.model.index import GridIndex, LinearIndex, SphereIndex, create_index
+from app.model.engine import ClusterEngine
+from app.model.distance import NearestKernel, pairwise_distances
+from app.model.model import Demand, Facility
+
+
+""" Test """
+
+class TestSpatialIndex:
+    """ Unit Test for the Nearest-Facility Indices """
+
+    @pytest.mark.parametrize("metric", ["euclidean", "manhattan"])
+    @pytest.mark.parametrize("cell_size", [0.5, 3.0, 50.0])
+    def test_grid_matches_linear_scan(self, metric, cell_size) -> None:
+        """ Testing GridIndex against a linear calculate_distance scan """
+        rng = random.Random(7)
+        grid = GridIndex(metric, cell_size=cell_size)
+        facilities = []
+
+        for i in range(300):
+            location = (rng.randint(-40, 40), rng.randint(-40, 40))
+            demand = Demand(i, location)
+
+            if facilities:
+                distances = [x.calculate_distance(demand, metric=metric) for x in facilities]
+                expected = min(range(len(distances)), key=lambda k: distances[k])
+                key, distance = grid.nearest(location)
+
+                assert key == expected
+                assert distance == distances[expected]
+
+            if rng.random() < 0.3:
+                facilities.append(Facility(len(facilities), location))
+                grid.insert(location)
+
+    @pytest.mark.parametrize("cell_size", [20.0, 300.0, 20000.0])
+    def test_sphere_matches_linear_scan(self, cell_size) -> None:
+        """ Testing SphereIndex against a linear haversine scan incl. the poles and the antimeridian """
+        rng = random.Random(11)
+        sphere = SphereIndex(cell_size=cell_size)
+        facilities = []
+
+        for i in range(300):
+            location = (rng.choice([rng.uniform(-180, 180), rng.uniform(170, 180), -180.0]), rng.choice([rng.uniform(-90, 90), rng.uniform(40, 50), 90.0]))
+            demand = Demand(i, location)
+
+            if facilities:
+                distances = [x.calculate_distance(demand, metric='haversine') for x in facilities]
+                expected = min(range(len(distances)), key=lambda k: distances[k])
+                key, distance = sphere.nearest(location)
+
+                assert distance == distances[expected]
+                assert distances[key] == distances[expected]
+
+            if rng.random() < 0.3:
+                facilities.append(Facility(len(facilities), location))
+                sphere.insert(location)
+
+    def test_haversine(self) -> None:
+        """ Testing the great-circle distance and the spherical k-Means centroid """
+        berlin, paris = Demand(0, (13.405, 52.52)), Facility(0, (2.3522, 48.8566))
+        assert paris.calculate_distance(berlin, metric='haversine') == pytest.approx(877.46, abs=0.01)
+        assert Facility(0, (179.5, 0.0)).calculate_distance(Demand(0, (-179.5, 0.0)), metric='haversine') == pytest.approx(111.19, abs=0.01)
+
+        # the centroid of points around the antimeridian stays on it.
+        engine = ClusterEngine(np.array([[179.0, 10.0], [-179.0, 10.0], [179.0, 12.0], [-179.0, 12.0]]), np.array([[0.0, 0.0]]), metric='haversine')
+        engine.run(5)
+        assert abs(engine.centers[0, 0]) == pytest.approx(180.0)
+        assert engine.centers[0, 1] == pytest.approx(11.0, abs=0.01)
+
+    def test_create_index(self) -> None:
+        """ Testing index selection from the parameter """
+        assert isinstance(create_index({'index': 'linear'}), LinearIndex)
+        assert not isinstance(create_index({'index': 'linear'}), GridIndex)
+        assert create_index({'probability': 0.5, 'openingCosts': 10.0}).cell_size == 20.0
+        assert isinstance(create_index({}, metric='haversine'), SphereIndex)
+
+    @pytest.mark.parametrize("metric", ["euclidean", "manhattan", "haversine"])
+    def test_nearest_kernel(self, metric) -> None:
+        """ Testing the tiled nearest-center kernel against the full distance matrix """
+        rng = np.random.default_rng(8)
+        points, centers = rng.uniform(-60, 60, (500, 2)), rng.uniform(-60, 60, (37, 2))
+        distances = pairwise_distances(points, centers, metric)
+
+        # a budget of 7 rows per tile.
+        kernel = NearestKernel(metric, budget=7 * 2 * 8 * 37)
+        labels, minimum = kernel.nearest(points, centers)
+        assert kernel.memory()['tileRows'] == 7
+        assert np.array_equal(labels, np.argmin(distances, axis=1))
+        assert np.allclose(minimum, distances.min(axis=1), rtol=0, atol=1e-9)
+
+        # the scratch buffers are reused across calls.
+        scratch = kernel.scratch
+        kernel.nearest(points[:100], centers + 1.0)
+        assert kernel.scratch is scratch
+        assert kernel.memory()['peakBytes'] == scratch.nbytes + labels.nbytes + minimum.nbytes
+
+        # the k-Means rounds do not depend on the tiling.
+        tiled = ClusterEngine(points, centers[:5].copy(), metric=metric, budget=1024)
+        tiled.run(5)
+        full = ClusterEngine(points, centers[:5].copy(), metric=metric)
+        full.run(5)
+        assert np.array_equal(tiled.labels, full.labels) and tiled.trace == full.trace
@@ -1,4 +1,4 @@
-import React, { useState, useCallback, useEffect } from 'react'
+import React, { useState, useCallback, useEffect, useRef } from 'react'
 import Cookies from 'universal-cookie';
 import ZoomMap from '../Components/ZoomMap/ZoomMap'
 import ExpandableMetric from '../Components/ExpandableMetric/ExpandableMetric'
@@ -6,7 +6,7 @@ import InfoModal from '../Components/InfoModal/InfoModal'
 import FacilityLocation from '../Components/FacilityLocation/FacilityLocation'
 import DemandPoint from '../Components/DemandPoint/DemandPoint'
 import WelcomeModal from '../Components/WelcomeModal/WelcomeModal'
-import { onlineFacilityLocation, offlineFacilityLocation } from '../api/api'
+import { openOnlineSocket, openOnlineSession, offlineFacilityLocation } from '../api/api'
 import './Webpage.css'
 
 const Webpage = () => {
@@ -24,6 +24,22 @@ const Webpage = () => {
   const [demands, setDemands] = useState([])
   const [facilities, setFacilities] = useState([])
   const [connections, setConnections] = useState([])
+  const socketRef = useRef(null)
+
+  // closing the online socket, the next demand opens a new one.
+  const resetSocket = useCallback(() => {
+    if (socketRef.current !== null) {
+      socketRef.current.close()
+      socketRef.current = null
+    }
+  }, [])
+
+  // starting a new online solver whenever the solver config changes.
+  useEffect(() => {
+    resetSocket()
+  }, [optimizationModel, probability, openingCosts, metric])
+
+  useEffect(() => resetSocket, [])
 
   const handleAddPoint = useCallback(async (pointType, location) => {
     try {
@@ -36,14 +52,60 @@ const Webpage = () => {
         let result
         if (optimizationModel === 'online') {
           console.log("sending online (demand) request.")
-          result = await onlineFacilityLocation(
-            newDemand,
-            demands,
-            facilities,
-            { probability, openingCosts, metric, iterations }
-          )
+          // a lost solver (closed or idle-expired socket) is recreated and the same demand retried once.
+          for (let attempt = 0; result === undefined; attempt++) {
+            if (socketRef.current === null) {
+              const parameter = { probability, openingCosts, metric, iterations }
+              try {
+                socketRef.current = await openOnlineSocket(demands, facilities, parameter)
+              } catch (error) {
+                // falling back to the REST session API when the socket cannot be opened.
+                console.warn('Online socket unavailable, using a REST session:', error)
+                socketRef.current = await openOnlineSession(demands, facilities, parameter)
+              }
+            }
+
+            try {
+              result = await socketRef.current.send(newDemand)
+            } catch (error) {
+              resetSocket()
+              if (attempt > 0) {
+                throw error
+              }
+            }
+          }
           console.log("Received Online results.")
           console.log(result)
+
+          if (result.data) {
+            // applying the decision locally instead of receiving the whole instance.
+            const decision = result.data.decision
+            const updatedFacilities = decision.opened
+              ? [...facilities, {
+                  facilityID: decision.facilityID,
+                  location: newDemand.location,
+                  connection: [newDemand.demandID],
+                  openingCosts: openingCosts
+                }]
+              : facilities.map((x) => x.facilityID === decision.facilityID
+                ? { ...x, connection: [...x.connection, newDemand.demandID] }
+                : x)
+
+            setDemands([...demands, newDemand])
+            setFacilities(updatedFacilities)
+            setConnections(updatedFacilities)
+
+            setCurrentCoin(result.data.coin ? 'HEADS' : 'TAILS')
+            setCoinFlips((prev) => [
+              (result.data.coin ? '●' : '✕'),
+              ...prev.slice(0, 15),
+            ])
+
+            setCosts(result.data.costs.current)
+            setPreviousCosts(result.data.costs.previous)
+            setCostChange(result.data.costs.delta)
+          }
+          return
         } else {
           console.log("sending offline (demand) request.")
           result = await offlineFacilityLocation(
@@ -83,6 +145,7 @@ const Webpage = () => {
           openingCosts: openingCosts
         }
         setFacilities((prev) => [...prev, newFacility])
+        resetSocket()
 
         if (optimizationModel === 'offline') {
           let result
@@ -115,9 +178,10 @@ const Webpage = () => {
     } finally {
       console.log(demands);
     }
-  }, [demands, facilities, optimizationModel, probability, costs])
+  }, [demands, facilities, optimizationModel, probability, openingCosts, metric, iterations, resetSocket])
 
   const handleRemovePoint = useCallback((pointType, id) => {
+    resetSocket()
     if (pointType === 'demand') {
       setDemands((prev) => prev.filter((d) => d.demandID !== id))
     } else if (pointType === 'facility') {
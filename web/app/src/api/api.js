@@ -93,3 +93,145 @@ export const offlineFacilityLocation = async (demands, facilities, parameter) =>
   }
   return await apiPost('/offline_facility_location', payload)
 }
+
+
+/**
+ * Sends a DELETE request to the API
+ * @param {string} endpoint - The API endpoint
+ * @returns {Promise<any>} The response data
+ */
+export const apiDelete = async (endpoint) => {
+  try {
+    const response = await fetch(`${API_BASE_URL}${endpoint}`, {
+      method: 'DELETE',
+      headers: {
+        'Content-Type': 'application/json',
+      },
+    })
+    const data = await response.json()
+    return data
+  } catch (error) {
+    console.error(`DELETE request failed for ${endpoint}:`, error)
+    throw error
+  }
+}
+
+/**
+ * Create a server-side online facility location session
+ * @param {array} demands - List of previously placed demand points
+ * @param {array} facilities - List of placed facility points
+ * @param {object} parameter - Optimization parameters
+ * @returns {Promise<object>} Session ID and current costs
+ */
+export const createOnlineSession = async (demands, facilities, parameter) => {
+  const payload = {
+    demands,
+    facilities,
+    parameter,
+  }
+  return await apiPost('/online_sessions', payload)
+}
+
+/**
+ * Run a single demand through the Meyerson algorithm of a session
+ * @param {string} sessionID - Session ID from createOnlineSession
+ * @param {object} demand - The newly placed demand point
+ * @returns {Promise<object>} Decision for the demand and current costs
+ */
+export const onlineSessionDemand = async (sessionID, demand) => {
+  return await apiPost(`/online_sessions/${sessionID}/demand`, { demand })
+}
+
+/**
+ * Close an online facility location session
+ * @param {string} sessionID - Session ID from createOnlineSession
+ * @returns {Promise<object>} Closed session ID
+ */
+export const deleteOnlineSession = async (sessionID) => {
+  return await apiDelete(`/online_sessions/${sessionID}`)
+}
+
+/**
+ * Open a REST session with the same send(demand) and close() shape as openOnlineSocket
+ * @param {array} demands - List of previously placed demand points
+ * @param {array} facilities - List of placed facility points
+ * @param {object} parameter - Optimization parameters
+ * @returns {Promise<object>} Session with send(demand) and close(), resolved once the solver is initialized
+ */
+export const openOnlineSession = async (demands, facilities, parameter) => {
+  const created = await createOnlineSession(demands, facilities, parameter)
+  if (created.code !== 200) {
+    throw new Error(created.msg)
+  }
+  const sessionID = created.data.sessionID
+
+  return {
+    send: async (demand) => {
+      const result = await onlineSessionDemand(sessionID, demand)
+      // an expired session is reported like a closed socket, the caller recreates it.
+      if (result.code === 404) {
+        throw new Error(result.msg)
+      }
+      return result
+    },
+    close: () => {
+      deleteOnlineSession(sessionID).catch(() => {})
+    },
+  }
+}
+
+const API_WS_URL = API_BASE_URL.replace(/^http/, 'ws')
+
+/**
+ * Open a WebSocket keeping one online facility location solver alive
+ * @param {array} demands - List of previously placed demand points
+ * @param {array} facilities - List of placed facility points
+ * @param {object} parameter - Optimization parameters
+ * @returns {Promise<object>} Socket with send(demand) and close(), resolved once the solver is initialized
+ */
+export const openOnlineSocket = (demands, facilities, parameter) => {
+  return new Promise((resolve, reject) => {
+    const websocket = new WebSocket(`${API_WS_URL}/online_sessions/ws`)
+    // replies arrive in request order, the first one answers the initialization.
+    const pending = [{ resolve: () => resolve(socket), reject, initialize: true }]
+
+    const socket = {
+      /**
+       * Run a single demand through the Meyerson algorithm of the socket
+       * @param {object} demand - The newly placed demand point
+       * @returns {Promise<object>} Decision for the demand and current costs
+       */
+      send: (demand) => new Promise((resolveDemand, rejectDemand) => {
+        if (websocket.readyState !== WebSocket.OPEN) {
+          rejectDemand(new Error('Online socket is closed'))
+          return
+        }
+        pending.push({ resolve: resolveDemand, reject: rejectDemand })
+        websocket.send(JSON.stringify({ demand }))
+      }),
+      close: () => websocket.close(),
+    }
+
+    websocket.onopen = () => {
+      websocket.send(JSON.stringify({ demands, facilities, parameter }))
+    }
+    websocket.onmessage = (event) => {
+      const data = JSON.parse(event.data)
+      const request = pending.shift()
+      if (request === undefined) {
+        return
+      }
+      if (request.initialize && data.code !== 200) {
+        request.reject(new Error(data.msg))
+        return
+      }
+      request.resolve(data)
+    }
+    websocket.onclose = () => {
+      pending.splice(0).forEach((x) => x.reject(new Error('Online socket is closed')))
+    }
+    websocket.onerror = (error) => {
+      console.error('Online socket failed:', error)
+    }
+  })
+}